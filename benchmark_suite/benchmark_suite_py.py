@@ -0,0 +1,238 @@
+import io
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from web_scraping import web_scraping_py
+from data_transformation import data_transformation_py
+from data_loading import data_loading_py
+from data_analysis import data_analysis_py, benchmark_relatorio
+from benchmark_suite.dados_sinteticos import gerar_pdf_tabela, gerar_pagina_html, servidor_local, BLOCOS_HTML
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Arquivo com os resultados da última execução
+RESULTADOS_PATH = os.path.join(SCRIPT_DIR, "resultados_benchmark.json")
+
+# Tamanho dos dados sintéticos: páginas e linhas por página do Anexo I, e a base contábil
+PAGINAS_PDF = 100
+LINHAS_POR_PAGINA = 30
+OPERADORAS = 500
+CONTAS = 20
+TRIMESTRES = 8
+
+# Execuções de cada medição; o valor comparado é o menor tempo, o menos sujeito a ruído da máquina
+REPETICOES = 3
+
+# Quanto uma medição pode ficar mais lenta que a referência antes de contar como regressão (20%)
+LIMITE_REGRESSAO = 0.20
+
+# Diferença mínima, em segundos, para contar como regressão: etapas de poucos milissegundos oscilam mais que 20%
+TOLERANCIA_ABSOLUTA = 0.02
+
+
+def medir(funcao, repeticoes=REPETICOES, preparar=None):
+    """
+    Mede o tempo de uma função, sem as mensagens que ela imprime.
+    
+    Parâmetros:
+    - funcao: Função sem argumentos medida.
+    - repeticoes: Quantidade de execuções.
+    - preparar: Função opcional chamada antes de cada execução, fora da medição.
+    
+    Retorna:
+    - Dicionário com o menor tempo, a mediana (em segundos) e a quantidade de execuções.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        with redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+    return {"minimo": min(tempos), "mediana": statistics.median(tempos), "repeticoes": repeticoes}
+
+
+def _recriar_pasta(caminho):
+    shutil.rmtree(caminho, ignore_errors=True)
+    os.makedirs(caminho)
+
+
+def executar_suite(pasta, paginas=PAGINAS_PDF, linhas_por_pagina=LINHAS_POR_PAGINA, blocos_html=BLOCOS_HTML,
+                   operadoras=OPERADORAS, contas=CONTAS, trimestres=TRIMESTRES, repeticoes=REPETICOES):
+    """
+    Gera os dados sintéticos, serve os arquivos num servidor HTTP local e mede cada etapa dos pipelines.
+    
+    São medidos a descoberta dos links na página, o download dos anexos, a extração da tabela do
+    Anexo I, a gravação e a compactação do CSV, a compactação dos PDFs e os relatórios de maiores
+    despesas, tanto pelo banco (carga + consultas num SQLite) quanto direto dos CSVs.
+    
+    Parâmetros:
+    - pasta: Pasta de trabalho, onde os dados sintéticos e as saídas são gravados.
+    - paginas, linhas_por_pagina: Tamanho do Anexo I sintético.
+    - blocos_html: Tamanho da página sintética do gov.br.
+    - operadoras, contas, trimestres: Tamanho da base contábil sintética.
+    - repeticoes: Execuções de cada medição.
+    
+    Retorna:
+    - Dicionário com os parâmetros, o ambiente e as medições de cada etapa.
+    """
+    parametros = {
+        "paginas": paginas, "linhas_por_pagina": linhas_por_pagina, "blocos_html": blocos_html,
+        "operadoras": operadoras, "contas": contas, "trimestres": trimestres,
+    }
+    medicoes = {}
+
+    # Anexos: o Anexo I com a tabela e um Anexo II menor, publicados numa página grande
+    anexo_i = gerar_pdf_tabela(os.path.join(pasta, "Anexo_I.pdf"), paginas, linhas_por_pagina)
+    anexo_ii = gerar_pdf_tabela(os.path.join(pasta, "Anexo_II.pdf"), max(1, paginas // 10), linhas_por_pagina)
+    links = {"Anexo I": "/arquivos/Anexo_I.pdf", "Anexo II": "/arquivos/Anexo_II.pdf"}
+    arquivos = {"/rol.html": gerar_pagina_html(links, blocos_html).encode("utf-8")}
+    for caminho, href in ((anexo_i, links["Anexo I"]), (anexo_ii, links["Anexo II"])):
+        with open(caminho, "rb") as f:
+            arquivos[href] = f.read()
+
+    downloads = os.path.join(pasta, "downloads")
+    with servidor_local(arquivos) as (url, _):
+        pagina = f"{url}/rol.html"
+        medicoes["obter_conteudo"] = medir(lambda: web_scraping_py.obter_conteudo(pagina), repeticoes)
+        with redirect_stdout(io.StringIO()):
+            html = web_scraping_py.obter_conteudo(pagina)
+            encontrados = web_scraping_py.extrair_links_pdfs(html, url)
+        medicoes["extrair_links_pdfs"] = medir(lambda: web_scraping_py.extrair_links_pdfs(html, url), repeticoes)
+        medicoes["descobrir_links_pdfs"] = medir(lambda: web_scraping_py.descobrir_links_pdfs(html, url), repeticoes)
+
+        def baixar():
+            for anexo, link in encontrados.items():
+                web_scraping_py.baixar_pdf(link, os.path.join(downloads, web_scraping_py.PDF_NAMES[anexo]), condicional=False)
+        medicoes["baixar_pdf"] = medir(baixar, repeticoes, preparar=lambda: _recriar_pasta(downloads))
+
+    pdfs = [os.path.join(downloads, nome) for nome in sorted(os.listdir(downloads))]
+    zip_pdfs = os.path.join(pasta, "Anexos.zip")
+    medicoes["compactar_pdfs"] = medir(lambda: web_scraping_py.compactar_pdfs(pdfs, zip_pdfs), repeticoes)
+
+    medicoes["extrair_tabela_pdf"] = medir(lambda: data_transformation_py.extrair_tabela_pdf(pdfs[0]), repeticoes)
+    with redirect_stdout(io.StringIO()):
+        df = data_transformation_py.extrair_tabela_pdf(pdfs[0])
+    if len(df) != paginas * linhas_por_pagina:
+        raise Exception(f"A extração devolveu {len(df)} linhas; eram esperadas {paginas * linhas_por_pagina}.")
+    csv_path = os.path.join(pasta, "dados_rol_procedimentos.csv")
+    medicoes["salvar_csv"] = medir(lambda: data_transformation_py.salvar_csv(df, csv_path), repeticoes)
+    medicoes["compactar_csv"] = medir(
+        lambda: data_transformation_py.compactar_csv(csv_path, os.path.join(pasta, "Teste.zip")), repeticoes)
+
+    # Relatórios de maiores despesas: carga no banco + consultas SQL, e o cálculo direto dos CSVs
+    dados = os.path.join(pasta, "dados")
+    os.makedirs(dados)
+    with redirect_stdout(io.StringIO()):
+        benchmark_relatorio.gerar_dados_sinteticos(dados, operadoras, contas, trimestres)
+    banco = os.path.join(pasta, "benchmark.db")
+
+    def limpar_banco():
+        for caminho in (banco, os.path.join(dados, "manifesto_carga.json")):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+    medicoes["relatorios_sql"] = medir(
+        lambda: benchmark_relatorio.executar_sql(data_loading_py.conexao_sqlite(banco), dados), repeticoes, preparar=limpar_banco)
+    medicoes["relatorios_csv"] = medir(
+        lambda: data_analysis_py.maiores_despesas(dados, os.path.join(dados, "Relatorio_cadop.csv")), repeticoes)
+
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "parametros": parametros,
+        "medicoes": medicoes,
+    }
+
+
+def salvar_resultados(resultados, caminho=RESULTADOS_PATH):
+    """Grava os resultados em JSON."""
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+def carregar_resultados(caminho):
+    """Lê resultados gravados por salvar_resultados."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def comparar_resultados(resultados, referencia, limite=LIMITE_REGRESSAO, tolerancia=TOLERANCIA_ABSOLUTA):
+    """
+    Compara os resultados com uma execução de referência.
+    
+    Parâmetros:
+    - resultados: Resultados da execução atual.
+    - referencia: Resultados de referência (por exemplo, os da última versão aprovada).
+    - limite: Fração que uma medição pode ficar mais lenta antes de contar como regressão.
+    - tolerancia: Diferença mínima, em segundos, para contar como regressão.
+    
+    Retorna:
+    - Lista de (etapa, segundos na referência, segundos agora) das etapas que pioraram além do limite.
+    """
+    if resultados["parametros"] != referencia["parametros"]:
+        raise Exception("A referência foi gerada com outros parâmetros; as medições não são comparáveis.")
+    regressoes = []
+    for etapa, medicao in resultados["medicoes"].items():
+        anterior = referencia["medicoes"].get(etapa)
+        if anterior and medicao["minimo"] > max(anterior["minimo"] * (1 + limite), anterior["minimo"] + tolerancia):
+            regressoes.append((etapa, anterior["minimo"], medicao["minimo"]))
+    return regressoes
+
+
+def main(saida=RESULTADOS_PATH, referencia=None, limite=LIMITE_REGRESSAO, **parametros):
+    """
+    Executa a suíte, grava os resultados e os compara com a referência, se houver. Sem o arquivo
+    de referência (a primeira execução), os resultados só são gravados.
+    
+    Retorna:
+    - 0 se não houve regressão, ou 1 se alguma etapa ficou mais lenta que o limite.
+    """
+    anteriores = carregar_resultados(referencia) if referencia and os.path.exists(referencia) else None
+    with tempfile.TemporaryDirectory() as pasta:
+        resultados = executar_suite(pasta, **parametros)
+    salvar_resultados(resultados, saida)
+
+    for etapa, medicao in resultados["medicoes"].items():
+        linha = f"{etapa:<22} {medicao['minimo'] * 1000:10.1f} ms (mediana {medicao['mediana'] * 1000:.1f} ms)"
+        if anteriores and etapa in anteriores["medicoes"]:
+            linha += f" | referência {anteriores['medicoes'][etapa]['minimo'] * 1000:.1f} ms"
+        print(linha)
+    print(f"Resultados gravados em {saida}")
+
+    if not anteriores:
+        return 0
+    regressoes = comparar_resultados(resultados, anteriores, limite)
+    for etapa, antes, depois in regressoes:
+        print(f"Regressão em {etapa}: {antes * 1000:.1f} ms -> {depois * 1000:.1f} ms (+{(depois / antes - 1) * 100:.0f}%)")
+    if not regressoes:
+        print(f"Nenhuma etapa ficou mais de {limite * 100:.0f}% mais lenta que a referência.")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede as etapas dos pipelines com dados sintéticos servidos localmente.")
+    parser.add_argument("--saida", default=RESULTADOS_PATH, help="Arquivo JSON com os resultados desta execução.")
+    parser.add_argument("--referencia", default=None,
+                        help="Resultados de uma execução anterior; sai com código 1 se alguma etapa piorar além do limite.")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO)
+    parser.add_argument("--paginas", type=int, default=PAGINAS_PDF)
+    parser.add_argument("--linhas-por-pagina", type=int, default=LINHAS_POR_PAGINA)
+    parser.add_argument("--blocos-html", type=int, default=BLOCOS_HTML)
+    parser.add_argument("--operadoras", type=int, default=OPERADORAS)
+    parser.add_argument("--contas", type=int, default=CONTAS)
+    parser.add_argument("--trimestres", type=int, default=TRIMESTRES)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    args = parser.parse_args()
+    sys.exit(main(args.saida, args.referencia, args.limite, paginas=args.paginas, linhas_por_pagina=args.linhas_por_pagina,
+                  blocos_html=args.blocos_html, operadoras=args.operadoras, contas=args.contas,
+                  trimestres=args.trimestres, repeticoes=args.repeticoes))
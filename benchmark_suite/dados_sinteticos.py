@@ -0,0 +1,165 @@
+import time
+import mimetypes
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Blocos de conteúdo da página sintética (cerca de 400 KB, um pouco maior que a página real do Rol)
+BLOCOS_HTML = 2000
+
+
+def gerar_pdf_tabela(caminho, paginas, linhas_por_pagina=3, paginas_alteradas=(),
+                     paginas_sem_tabela=(), paginas_largas=()):
+    """
+    Gera um PDF sintético com uma tabela (grade de linhas + texto) por página,
+    no mesmo formato do Anexo I, para testar a extração com o pdfplumber real.
+    As páginas em paginas_alteradas recebem outro texto, simulando uma nova versão do PDF;
+    as em paginas_sem_tabela têm só texto; e as em paginas_largas usam outra grade de colunas.
+    """
+    colunas = ["PROCEDIMENTO", "RN", "OD", "AMB"]
+    x0, y0, altura = 50, 750, 20
+
+    conteudos = []
+    for p in range(paginas):
+        if p in paginas_sem_tabela:
+            conteudos.append(f"BT /F1 12 Tf {x0} {y0} Td (Legenda da pagina {p}) Tj ET".encode("latin-1"))
+            continue
+        larguras = [260, 60, 60, 60] if p in paginas_largas else [200, 60, 60, 60]
+        rotulo = "Novo" if p in paginas_alteradas else "Proc"
+        linhas = [colunas] + [[f"{rotulo} {p}-{i}", "RN", "OD", "AMB" if i % 2 else ""] for i in range(linhas_por_pagina)]
+        ops = []
+        for r in range(len(linhas) + 1):
+            ops.append(f"{x0} {y0 - r * altura} m {x0 + sum(larguras)} {y0 - r * altura} l S")
+        x = x0
+        for largura in larguras + [0]:
+            ops.append(f"{x} {y0} m {x} {y0 - len(linhas) * altura} l S")
+            x += largura
+        for r, linha in enumerate(linhas):
+            x = x0
+            for celula, largura in zip(linha, larguras):
+                if celula:
+                    ops.append(f"BT /F1 9 Tf {x + 3} {y0 - (r + 1) * altura + 6} Td ({celula}) Tj ET")
+                x += largura
+        conteudos.append("\n".join(ops).encode("latin-1"))
+
+    saida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+
+    def adicionar(corpo):
+        offsets.append(len(saida))
+        saida.extend(f"{len(offsets)} 0 obj\n".encode() + corpo + b"\nendobj\n")
+
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(paginas))
+    adicionar(b"<< /Type /Catalog /Pages 2 0 R >>")
+    adicionar(f"<< /Type /Pages /Kids [{kids}] /Count {paginas} >>".encode())
+    adicionar(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for i, stream in enumerate(conteudos):
+        adicionar(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                  f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        adicionar(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+    xref = len(saida)
+    saida.extend(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        saida.extend(f"{offset:010d} 00000 n \n".encode())
+    saida.extend(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+    with open(caminho, "wb") as f:
+        f.write(saida)
+    return caminho
+
+
+@contextmanager
+def servidor_local(arquivos, interromper=(), atraso=0.0, estatisticas=None):
+    """
+    Sobe um servidor HTTP local que serve os arquivos informados (caminho -> bytes),
+    com suporte a ETag, If-None-Match, Range e If-Range.
+    Os caminhos em interromper têm a primeira transferência cortada pela metade.
+    Cada resposta demora atraso segundos; em estatisticas são registrados o pico de
+    requisições simultâneas ("pico") e as conexões abertas ("conexoes").
+    O Content-Type vem da extensão do caminho (textos em UTF-8); caminhos terminados em "/"
+    são servidos como HTML, como as listagens de diretório.
+    Retorna a URL base e a lista de requisições recebidas (caminho, cabeçalhos).
+    """
+    requisicoes = []
+    interrompidos = set()
+    estatisticas = {} if estatisticas is None else estatisticas
+    estatisticas.update(pico=0, ativos=0, conexoes=0)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with lock:
+                estatisticas["conexoes"] += 1
+
+        def do_GET(self):
+            with lock:
+                estatisticas["ativos"] += 1
+                estatisticas["pico"] = max(estatisticas["pico"], estatisticas["ativos"])
+            try:
+                time.sleep(atraso)
+                self.responder()
+            finally:
+                with lock:
+                    estatisticas["ativos"] -= 1
+
+        def responder(self):
+            requisicoes.append((self.path, dict(self.headers)))
+            conteudo = arquivos.get(self.path)
+            if conteudo is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = f'"{hash(conteudo) & 0xffffffff:x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            inicio = 0
+            faixa = self.headers.get("Range")
+            if faixa and self.headers.get("If-Range", etag) == etag:
+                inicio = int(faixa.split("=")[1].split("-")[0])
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {inicio}-{len(conteudo) - 1}/{len(conteudo)}")
+            else:
+                self.send_response(200)
+            tipo = mimetypes.guess_type(self.path)[0] or ("text/html" if self.path.endswith("/") else "application/octet-stream")
+            self.send_header("Content-Type", f"{tipo}; charset=utf-8" if tipo.startswith("text/") else tipo)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(conteudo) - inicio))
+            self.end_headers()
+            if self.path in interromper and self.path not in interrompidos:
+                interrompidos.add(self.path)
+                self.wfile.write(conteudo[inicio:len(conteudo) // 2])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(conteudo[inicio:])
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{servidor.server_address[1]}", requisicoes
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def gerar_pagina_html(links, blocos=BLOCOS_HTML):
+    """
+    Gera uma página parecida com a do gov.br: blocos de notícias e menus, com os links dos anexos
+    (nome do anexo -> href) no meio do conteúdo, como na página real.
+    """
+    bloco = ('<div class="item"><a href="/noticia">Notícia</a><p>Texto qualquer sobre a atualização do Rol</p>'
+             '<ul class="menu"><li><a href="/assuntos">Assuntos</a></li><li><a href="/planos">Planos</a></li></ul></div>')
+    anexos = "".join(f'<p><a class="internal-link" href="{href}">{nome} (PDF)</a></p>' for nome, href in links.items())
+    return ("<html><head><title>Atualização do Rol de Procedimentos</title></head><body>"
+            + bloco * (blocos // 2) + anexos + bloco * (blocos - blocos // 2) + "</body></html>")
@@ -0,0 +1,126 @@
+import os
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+from data_loading import data_loading_py
+from data_analysis import data_analysis_py
+from data_loading.benchmark_consultas import conta_sintetica
+
+# Tamanho da base sintética: operadoras x contas linhas por trimestre
+OPERADORAS = 1000
+CONTAS = 50
+TRIMESTRES = 8
+
+QUERIES_DIR = os.path.join(os.path.dirname(data_loading_py.SCRIPT_DIR), "queries")
+
+
+def gerar_dados_sinteticos(pasta, operadoras=OPERADORAS, contas=CONTAS, trimestres=TRIMESTRES, semente=42):
+    """
+    Gera CSVs trimestrais e um Relatorio_cadop.csv no formato publicado pela ANS.
+    
+    Retorna:
+    - A quantidade de linhas dos CSVs trimestrais.
+    """
+    aleatorio = random.Random(semente)
+    for t in range(trimestres):
+        ano, trimestre = 2023 + t // 4, t % 4 + 1
+        data = data_loading_py.intervalo_trimestre(ano, trimestre)[0].isoformat()
+        with open(os.path.join(pasta, f"{trimestre}T{ano}.csv"), "w", encoding="utf-8") as f:
+            f.write('"DATA";"REG_ANS";"CD_CONTA_CONTABIL";"DESCRICAO";"VL_SALDO_INICIAL";"VL_SALDO_FINAL"\n')
+            for i in range(operadoras):
+                for conta in range(contas):
+                    codigo, descricao = conta_sintetica(i, conta)
+                    inicial = aleatorio.randint(0, 10 ** 9)
+                    final = inicial + aleatorio.randint(-10 ** 6, 10 ** 8)
+                    f.write(f'"{data}";"{300000 + i}";"{codigo}";"{descricao}";'
+                            f'"{inicial // 100},{inicial % 100:02d}";"{final // 100},{final % 100:02d}"\n')
+    with open(os.path.join(pasta, "Relatorio_cadop.csv"), "w", encoding="utf-8") as f:
+        f.write('"Registro_ANS";"CNPJ";"Razao_Social";"Nome_Fantasia";"Modalidade"\n')
+        for i in range(operadoras):
+            f.write(f'"{300000 + i}";"{i:014d}";"OPERADORA {i} S.A.";"PLANO {i}";"Medicina de Grupo"\n')
+    return operadoras * contas * trimestres
+
+
+def executar_sql(conectar, pasta):
+    """
+    Calcula os relatórios pelo caminho com banco: cria as tabelas, carrega os CSVs e roda as consultas.
+    
+    Retorna:
+    - Uma tupla (relatórios, segundos da carga, segundos das consultas).
+    """
+    conexao = conectar()
+    cursor = conexao.cursor()
+    for arquivo in ("criacao_tabela_postgre_demonstracoes_contabeis.sql", "criacao_tabela_contas.sql", "query_criacao_tabela_empresas.sql"):
+        for comando in data_loading_py.ler_consultas(os.path.join(QUERIES_DIR, arquivo)):
+            cursor.execute(comando)
+    conexao.commit()
+
+    inicio = time.perf_counter()
+    data_loading_py.carregar_trimestres(conectar, pasta, os.path.join(pasta, "manifesto_carga.json"))
+    operadoras = data_analysis_py.ler_operadoras(os.path.join(pasta, "Relatorio_cadop.csv"))
+    linhas = [[registro, f"{i:014d}", razao, fantasia] for i, (registro, nomes) in enumerate(operadoras.items()) for razao, fantasia in nomes]
+    data_loading_py.copiar_linhas(conexao, linhas, tabela="Empresas", colunas=("Registro_ANS", "CNPJ", "Razao_Social", "Nome_Fantasia"))
+    conexao.commit()
+    carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    relatorios = []
+    for consulta in data_loading_py.ler_consultas():
+        if isinstance(conexao, sqlite3.Connection):
+            consulta = data_loading_py.adaptar_para_sqlite(consulta)
+        cursor.execute(consulta)
+        relatorios.append(cursor.fetchall())
+    consultas = time.perf_counter() - inicio
+    conexao.close()
+    return relatorios, carga, consultas
+
+
+def mesmos_relatorios(relatorios, relatorios_sql):
+    """Compara os relatórios; os totais são arredondados em centavos porque o SQLite soma em ponto flutuante."""
+    def arredondar(relatorio):
+        return [tuple(linha[:3]) + (round(float(linha[3]), 2),) for linha in relatorio]
+    return [arredondar(r) for r in relatorios] == [arredondar(r) for r in relatorios_sql]
+
+
+def executar_benchmark(conectar=None, operadoras=OPERADORAS, contas=CONTAS, trimestres=TRIMESTRES):
+    """
+    Compara o cálculo direto dos CSVs (data_analysis_py) com a carga no banco seguida das consultas SQL.
+    
+    Parâmetros:
+    - conectar: Função que abre uma conexão com um banco vazio; None usa um SQLite temporário.
+    - operadoras, contas, trimestres: Tamanho da base sintética.
+    
+    Retorna:
+    - Dicionário com os tempos, em segundos, de cada caminho.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        total = gerar_dados_sinteticos(pasta, operadoras, contas, trimestres)
+        print(f"Base sintética gerada: {total} linhas.")
+
+        inicio = time.perf_counter()
+        relatorios = data_analysis_py.maiores_despesas(pasta, os.path.join(pasta, "Relatorio_cadop.csv"))
+        sem_banco = time.perf_counter() - inicio
+
+        conectar = conectar or data_loading_py.conexao_sqlite(os.path.join(pasta, "benchmark.db"))
+        relatorios_sql, carga, consultas = executar_sql(conectar, pasta)
+        if not mesmos_relatorios(relatorios, relatorios_sql):
+            raise Exception("Os relatórios calculados dos CSVs são diferentes dos calculados pelo banco.")
+
+    print(f"Sem banco: {sem_banco:.2f}s | Com banco: carga {carga:.2f}s + consultas {consultas:.2f}s "
+          f"= {carga + consultas:.2f}s")
+    return {"sem_banco": sem_banco, "carga": carga, "consultas": consultas}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara os relatórios calculados dos CSVs com o caminho pelo banco.")
+    parser.add_argument("--dsn", default=None,
+                        help="Banco PostgreSQL VAZIO usado no teste (padrão: um banco SQLite temporário).")
+    parser.add_argument("--operadoras", type=int, default=OPERADORAS)
+    parser.add_argument("--contas", type=int, default=CONTAS)
+    parser.add_argument("--trimestres", type=int, default=TRIMESTRES)
+    args = parser.parse_args()
+    conectar = data_loading_py.conexao_postgres(args.dsn) if args.dsn else None
+    executar_benchmark(conectar, args.operadoras, args.contas, args.trimestres)
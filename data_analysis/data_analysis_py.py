@@ -0,0 +1,215 @@
+import os
+import heapq
+import calendar
+import argparse
+import time
+import pandas as pd
+import numpy as np
+from datetime import date
+from decimal import Decimal
+from data_loading import data_loading_py
+
+# Pasta com os CSVs trimestrais e caminho do cadastro de operadoras (CADOP)
+DADOS_DIR = data_loading_py.DADOS_DIR
+CADOP_PATH = os.path.join(DADOS_DIR, "Relatorio_cadop.csv")
+
+# Código da conta dos relatórios de maiores despesas, o mesmo das consultas SQL
+CONTA_DESPESAS = data_loading_py.CONTA_DESPESAS
+
+# Períodos dos relatórios, em meses antes da data mais recente (3 meses e 1 ano, como nas consultas SQL)
+JANELAS = (3, 12)
+
+# Quantidade de operadoras em cada relatório
+TOP_K = 10
+
+# Linhas lidas por vez de cada CSV
+TAMANHO_BLOCO = 200000
+
+# Casas decimais guardadas nos valores: eles são somados como inteiros (centavos), sem erro de arredondamento
+ESCALA = 2
+
+
+def converter_centavos(serie, escala=ESCALA):
+    """
+    Converte, de forma vetorizada, valores no formato brasileiro ("1.234,56") para inteiros na escala pedida.
+    
+    Parâmetros:
+    - serie: Série de textos; textos vazios viram nulos.
+    - escala: Casas decimais guardadas (2 = centavos).
+    
+    Retorna:
+    - Uma série de inteiros (Int64, com nulos), com o valor multiplicado por 10 ** escala.
+    """
+    texto = serie.fillna("").astype(str).str.strip()
+    com_virgula = texto.str.contains(",", regex=False)
+    texto = texto.where(~com_virgula, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    vazio = texto == ""
+    negativo = texto.str.startswith("-")
+    partes = texto.str.lstrip("+-").str.split(".", n=1, expand=True)
+    inteiro = partes[0].where(partes[0] != "", "0")
+    fracao = partes[1].fillna("") if partes.shape[1] > 1 else pd.Series("", index=texto.index)
+    if (fracao.str.len() > escala).any():
+        raise Exception(f"Valores com mais de {escala} casas decimais; aumente ESCALA.")
+    valores = inteiro.astype(np.int64) * 10 ** escala
+    if escala:
+        valores += fracao.str.ljust(escala, "0").astype(np.int64)
+    valores = valores.where(~negativo, -valores)
+    return valores.astype("Int64").mask(vazio)
+
+
+def subtrair_meses(data, meses):
+    """Subtrai meses de uma data como o PostgreSQL (date - INTERVAL): o dia é limitado ao fim do mês."""
+    mes = data.year * 12 + data.month - 1 - meses
+    ano, mes = divmod(mes, 12)
+    return date(ano, mes + 1, min(data.day, calendar.monthrange(ano, mes + 1)[1]))
+
+
+def acumular_despesas(arquivos, conta=CONTA_DESPESAS, tamanho_bloco=TAMANHO_BLOCO, encoding=data_loading_py.ENCODING):
+    """
+    Lê os CSVs trimestrais em blocos e soma a despesa (saldo final - saldo inicial) da conta por operadora e data.
+    
+    Só as somas parciais ficam em memória: uma por operadora e data, não uma por linha.
+    
+    Parâmetros:
+    - arquivos: Caminhos dos CSVs trimestrais.
+    - conta: Código da conta (CD_CONTA_CONTABIL).
+    - tamanho_bloco: Linhas lidas por vez.
+    - encoding: Codificação dos arquivos.
+    
+    Retorna:
+    - Uma tupla (somas, data_maxima): somas é um dicionário (REG_ANS, data ISO) -> [soma em centavos,
+      linhas com valor], e data_maxima é a maior data entre todas as linhas (de todas as contas).
+    """
+    somas = {}
+    data_maxima = None
+    for caminho in arquivos:
+        blocos = pd.read_csv(
+            caminho, sep=";", quotechar='"', dtype=str, encoding=encoding, na_filter=False,
+            usecols=lambda coluna: coluna.strip().upper() in data_loading_py.COLUNAS, chunksize=tamanho_bloco,
+        )
+        for bloco in blocos:
+            bloco.columns = [coluna.strip().upper() for coluna in bloco.columns]
+            datas = {valor: data_loading_py.converter_data(valor) for valor in bloco["DATA"].unique()}
+            maior = max(datas.values(), default=None)
+            if maior and (data_maxima is None or maior > data_maxima):
+                data_maxima = maior
+
+            bloco = bloco[bloco["CD_CONTA_CONTABIL"].str.strip() == conta]
+            if bloco.empty:
+                continue
+            despesa = converter_centavos(bloco["VL_SALDO_FINAL"]) - converter_centavos(bloco["VL_SALDO_INICIAL"])
+            parcial = pd.DataFrame({
+                "REG_ANS": bloco["REG_ANS"].str.strip(),
+                "DATA": bloco["DATA"].map(datas),
+                "DESPESA": despesa,
+            }).groupby(["REG_ANS", "DATA"], sort=False)["DESPESA"].agg(["sum", "count"])
+            for (reg_ans, data), soma, validas in parcial.itertuples(name=None):
+                atual = somas.setdefault((reg_ans, data), [0, 0])
+                atual[0] += int(soma)
+                atual[1] += int(validas)
+    return somas, data_maxima
+
+
+def ler_operadoras(cadop_path=CADOP_PATH, encoding=data_loading_py.ENCODING):
+    """
+    Lê o cadastro de operadoras (Relatorio_cadop.csv).
+    
+    Retorna:
+    - Dicionário Registro_ANS -> lista de (Razao_Social, Nome_Fantasia), uma entrada por linha do
+      cadastro (como no JOIN com a tabela Empresas, que pode ter mais de uma linha por registro).
+    """
+    cadop = pd.read_csv(
+        cadop_path, sep=";", quotechar='"', dtype=str, encoding=encoding,
+        usecols=["Registro_ANS", "Razao_Social", "Nome_Fantasia"],
+    )
+    cadop = cadop.astype(object).where(cadop.notna(), None)
+    operadoras = {}
+    for registro, razao, fantasia in cadop[["Registro_ANS", "Razao_Social", "Nome_Fantasia"]].itertuples(index=False, name=None):
+        operadoras.setdefault(registro.strip(), []).append((razao, fantasia))
+    return operadoras
+
+
+def _totais_por_operadora(somas, operadoras, desde, escala):
+    """Gera (Registro_ANS, Razao_Social, Nome_Fantasia, total) somando as datas a partir de desde."""
+    totais = {}
+    for (reg_ans, data), (soma, validas) in somas.items():
+        if data >= desde and reg_ans in operadoras:
+            atual = totais.setdefault(reg_ans, [0, 0])
+            atual[0] += soma
+            atual[1] += validas
+    for reg_ans, (soma, validas) in totais.items():
+        # Cada linha do cadastro com o mesmo registro entra de novo na soma, como no JOIN do SQL
+        grupos = {}
+        for nomes in operadoras[reg_ans]:
+            grupos[nomes] = grupos.get(nomes, 0) + 1
+        for (razao, fantasia), vezes in grupos.items():
+            total = Decimal(soma * vezes).scaleb(-escala) if validas else None
+            yield reg_ans, razao, fantasia, total
+
+
+def _chave_ordenacao(linha):
+    """Ordena como o ORDER BY despesa_total DESC do PostgreSQL, em que os nulos vêm primeiro."""
+    return (linha[3] is None, linha[3] if linha[3] is not None else 0)
+
+
+def maiores_despesas(dados_dir=DADOS_DIR, cadop_path=CADOP_PATH, janelas=JANELAS, k=TOP_K,
+                     conta=CONTA_DESPESAS, tamanho_bloco=TAMANHO_BLOCO, escala=ESCALA):
+    """
+    Calcula os relatórios de maiores despesas direto dos CSVs, sem banco de dados.
+    
+    Dá o mesmo resultado das consultas de "desafio - query_maiores_despesas.sql": para cada
+    janela, as k operadoras com a maior soma de saldo final - saldo inicial na conta (escolhida
+    pelo código, como nas consultas), contando
+    as linhas com DATA a partir da data mais recente menos a janela. Os valores são somados
+    como inteiros e retornados como Decimal, como o NUMERIC do banco.
+    
+    Parâmetros:
+    - dados_dir: Pasta com os CSVs trimestrais.
+    - cadop_path: Caminho do Relatorio_cadop.csv.
+    - janelas: Períodos dos relatórios, em meses.
+    - k: Quantidade de operadoras em cada relatório.
+    - conta: Código da conta (CD_CONTA_CONTABIL).
+    - tamanho_bloco: Linhas lidas por vez de cada CSV.
+    - escala: Casas decimais dos valores.
+    
+    Retorna:
+    - Lista com um relatório por janela; cada relatório é uma lista de tuplas
+      (Registro_ANS, Razao_Social, Nome_Fantasia, despesa_total).
+    """
+    try:
+        arquivos = data_loading_py.encontrar_arquivos_trimestrais(dados_dir)
+        somas, data_maxima = acumular_despesas(arquivos, conta, tamanho_bloco)
+        operadoras = ler_operadoras(cadop_path)
+        if data_maxima is None:
+            return [[] for _ in janelas]
+        maxima = date.fromisoformat(data_maxima)
+        relatorios = []
+        for meses in janelas:
+            desde = subtrair_meses(maxima, meses).isoformat()
+            # _totais_por_operadora monta o total de todas as operadoras da janela (é preciso somar todas as datas
+            # antes de saber quem está entre as maiores); heapq.nlargest só evita ordenar a lista inteira
+            relatorios.append(heapq.nlargest(k, _totais_por_operadora(somas, operadoras, desde, escala), key=_chave_ordenacao))
+        return relatorios
+    except Exception as e:
+        raise Exception(f"Erro ao calcular as maiores despesas: {e}")
+
+
+def main(dados_dir=DADOS_DIR, cadop_path=CADOP_PATH, k=TOP_K):
+    """Mostra os relatórios de maiores despesas calculados direto dos CSVs."""
+    inicio = time.perf_counter()
+    relatorios = maiores_despesas(dados_dir, cadop_path, k=k)
+    for meses, relatorio in zip(JANELAS, relatorios):
+        print(f"\nMaiores despesas nos últimos {meses} meses:")
+        for registro, razao, fantasia, total in relatorio:
+            print(f"{registro};{razao};{fantasia};{total}")
+    print(f"\nRelatórios calculados em {time.perf_counter() - inicio:.2f}s.")
+    return relatorios
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcula os relatórios de maiores despesas direto dos CSVs da ANS.")
+    parser.add_argument("--dir", default=DADOS_DIR, help="Pasta com os CSVs trimestrais (1T2023.csv, ...).")
+    parser.add_argument("--cadop", default=CADOP_PATH, help="Caminho do Relatorio_cadop.csv.")
+    parser.add_argument("--top", type=int, default=TOP_K, help="Quantidade de operadoras em cada relatório.")
+    args = parser.parse_args()
+    main(args.dir, args.cadop, args.top)
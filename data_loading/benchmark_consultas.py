@@ -0,0 +1,177 @@
+import os
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+from data_loading import data_loading_py
+
+# Tamanho da base sintética: operadoras x contas x trimestres linhas
+OPERADORAS = 1000
+CONTAS = 20
+TRIMESTRES = 8
+
+# Vezes que cada consulta é executada (vale o menor tempo)
+REPETICOES = 5
+
+# Descrição da conta dos relatórios (data_loading_py.CONTA_DESPESAS), como aparece nos CSVs da ANS
+DESCRICAO_DESPESAS = "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS  DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR "
+
+QUERIES_DIR = os.path.join(os.path.dirname(data_loading_py.SCRIPT_DIR), "queries")
+
+
+# Esquema antigo da tabela: código e descrição da conta em cada linha e valores em TEXT
+DDL_TEXTO = """CREATE TABLE demonstracoes_contabeis (
+    DATA DATE NOT NULL,
+    REG_ANS VARCHAR(50) NOT NULL,
+    CD_CONTA_CONTABIL VARCHAR(50) NOT NULL,
+    DESCRICAO TEXT,
+    VL_SALDO_INICIAL TEXT,
+    VL_SALDO_FINAL TEXT,
+    PRIMARY KEY (DATA, REG_ANS, CD_CONTA_CONTABIL)
+)"""
+
+# Consulta de maiores despesas sobre o esquema antigo, que converte o texto de cada linha
+CONSULTA_TEXTO = """
+WITH dados_convertidos AS (
+    SELECT e.Razao_Social, e.Nome_Fantasia, e.Registro_ANS, dc.DATA,
+        CAST(REPLACE(dc.VL_SALDO_FINAL, ',', '.') AS NUMERIC) AS saldo_final,
+        CAST(REPLACE(dc.VL_SALDO_INICIAL, ',', '.') AS NUMERIC) AS saldo_inicial
+    FROM demonstracoes_contabeis dc
+    JOIN Empresas e ON dc.REG_ANS = e.Registro_ANS
+    WHERE dc.CD_CONTA_CONTABIL = '{conta}'
+        AND dc.DATA >= (SELECT MAX(DATA) FROM demonstracoes_contabeis) - INTERVAL '{intervalo}'
+)
+SELECT Registro_ANS, Razao_Social, Nome_Fantasia, SUM(saldo_final - saldo_inicial) AS despesa_total
+FROM dados_convertidos
+GROUP BY Registro_ANS, Razao_Social, Nome_Fantasia
+ORDER BY despesa_total DESC
+LIMIT 10
+"""
+
+
+def consultas_em_texto():
+    """Retorna as consultas de 3 meses e de 1 ano na forma antiga, sobre o esquema com valores em TEXT."""
+    return [CONSULTA_TEXTO.format(intervalo=intervalo, conta=data_loading_py.CONTA_DESPESAS) for intervalo in ("3 months", "1 year")]
+
+
+def conta_sintetica(operadora, conta):
+    """
+    Código e descrição da conta na base sintética. A conta 0 é a dos relatórios, com a descrição
+    um pouco diferente em parte das operadoras, e a conta 1 tem a mesma descrição com outro código:
+    os relatórios só podem escolher as linhas pelo código.
+    """
+    if conta == 0:
+        return data_loading_py.CONTA_DESPESAS, DESCRICAO_DESPESAS if operadora % 3 else DESCRICAO_DESPESAS.strip() + " - CARTEIRA"
+    if conta == 1:
+        return "4111", DESCRICAO_DESPESAS
+    return str(100 + conta), f"CONTA {conta}"
+
+
+def criar_base_texto(conexao, operadoras=OPERADORAS, contas=CONTAS, trimestres=TRIMESTRES, semente=42):
+    """
+    Cria as tabelas com o esquema antigo (valores em TEXT, com vírgula decimal) e as preenche
+    com dados sintéticos no formato da ANS.
+    """
+    cursor = conexao.cursor()
+    cursor.execute(DDL_TEXTO)
+    for arquivo in ("query_criacao_tabela_empresas.sql", "criacao_tabela_contas.sql"):
+        for comando in data_loading_py.ler_consultas(os.path.join(QUERIES_DIR, arquivo)):
+            cursor.execute(comando)
+
+    aleatorio = random.Random(semente)
+    marcador = data_loading_py._marcador(conexao)
+    cursor.executemany(
+        f"INSERT INTO Empresas (Registro_ANS, CNPJ, Razao_Social, Nome_Fantasia) VALUES ({marcador}, {marcador}, {marcador}, {marcador})",
+        [(str(300000 + i), f"{i:014d}", f"OPERADORA {i} S.A.", f"PLANO {i}") for i in range(operadoras)],
+    )
+
+    def linhas():
+        for t in range(trimestres):
+            ano, trimestre = 2023 + t // 4, t % 4 + 1
+            data = data_loading_py.intervalo_trimestre(ano, trimestre)[0].isoformat()
+            for i in range(operadoras):
+                for conta in range(contas):
+                    codigo, descricao = conta_sintetica(i, conta)
+                    inicial = aleatorio.randint(0, 10 ** 9)
+                    final = inicial + aleatorio.randint(0, 10 ** 8)
+                    yield [data, str(300000 + i), codigo, descricao,
+                           f"{inicial // 100},{inicial % 100:02d}", f"{final // 100},{final % 100:02d}"]
+
+    data_loading_py.copiar_linhas(conexao, linhas(), colunas=data_loading_py.COLUNAS)
+    conexao.commit()
+    return operadoras * contas * trimestres
+
+
+def medir_consulta(conexao, consulta, repeticoes=REPETICOES):
+    """Executa a consulta repetidas vezes e retorna o menor tempo, em segundos, e o resultado."""
+    if isinstance(conexao, sqlite3.Connection):
+        consulta = data_loading_py.adaptar_para_sqlite(consulta)
+    cursor = conexao.cursor()
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        cursor.execute(consulta)
+        resultado = cursor.fetchall()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def _arredondar(resultado):
+    """Arredonda os totais para comparar resultados calculados em NUMERIC e em ponto flutuante."""
+    return [tuple(linha[:-1]) + (round(float(linha[-1]), 2),) for linha in resultado]
+
+
+def executar_benchmark(conectar, operadoras=OPERADORAS, contas=CONTAS, trimestres=TRIMESTRES, repeticoes=REPETICOES):
+    """
+    Mede as consultas de maiores despesas antes e depois da migração do esquema antigo (valores
+    em TEXT e a descrição da conta em cada linha) para o atual (NUMERIC e dimensão de contas).
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma conexão com um banco vazio.
+    - operadoras, contas, trimestres: Tamanho da base sintética.
+    - repeticoes: Vezes que cada consulta é executada.
+    
+    Retorna:
+    - Lista com (consulta, segundos antes, segundos depois) para cada relatório.
+    """
+    conexao = conectar()
+    try:
+        total = criar_base_texto(conexao, operadoras, contas, trimestres)
+        print(f"Base sintética criada: {total} linhas.")
+        consultas = data_loading_py.ler_consultas()
+        antes = [medir_consulta(conexao, consulta, repeticoes) for consulta in consultas_em_texto()]
+        conexao.commit()
+
+        data_loading_py.migrar_para_numerico(conectar)
+        data_loading_py.migrar_para_contas(conectar)
+
+        depois = [medir_consulta(conexao, consulta, repeticoes) for consulta in consultas]
+        resultados = []
+        for nome, (tempo_antes, resultado_antes), (tempo_depois, resultado_depois) in zip(["3 meses", "1 ano"], antes, depois):
+            if _arredondar(resultado_antes) != _arredondar(resultado_depois):
+                raise Exception(f"A consulta de {nome} deu resultados diferentes antes e depois da migração.")
+            print(f"Maiores despesas ({nome}): {tempo_antes * 1000:.1f} ms no esquema antigo, "
+                  f"{tempo_depois * 1000:.1f} ms no atual ({tempo_antes / tempo_depois:.2f}x)")
+            resultados.append((nome, tempo_antes, tempo_depois))
+        return resultados
+    finally:
+        conexao.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede as consultas de maiores despesas antes e depois da migração do esquema.")
+    parser.add_argument("--dsn", default=None,
+                        help="Banco PostgreSQL VAZIO usado no teste (padrão: um banco SQLite temporário).")
+    parser.add_argument("--operadoras", type=int, default=OPERADORAS)
+    parser.add_argument("--contas", type=int, default=CONTAS)
+    parser.add_argument("--trimestres", type=int, default=TRIMESTRES)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as pasta:
+        if args.dsn:
+            conectar = data_loading_py.conexao_postgres(args.dsn)
+        else:
+            conectar = data_loading_py.conexao_sqlite(os.path.join(pasta, "benchmark.db"))
+        executar_benchmark(conectar, args.operadoras, args.contas, args.trimestres, args.repeticoes)
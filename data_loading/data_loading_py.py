@@ -0,0 +1,986 @@
+import io
+import os
+import re
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+
+# Obtendo o diretório onde o script tá localizado
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Pasta com os CSVs trimestrais das demonstrações contábeis (1T2023.csv, 2T2023.csv, ...)
+DADOS_DIR = os.path.join(SCRIPT_DIR, "dados")
+
+# Manifesto com o hash de cada arquivo já carregado no banco
+MANIFESTO_CARGA = os.path.join(DADOS_DIR, "manifesto_carga.json")
+
+# Conexão com o PostgreSQL, no formato aceito pelo psycopg2 (ex.: "dbname=ans user=postgres")
+DSN = os.environ.get("DATABASE_URL", "")
+
+# Quantidade de arquivos carregados ao mesmo tempo, cada um pela sua própria conexão
+NUM_CONEXOES = 4
+
+# Tabela carregada, colunas dos CSVs da ANS (na ordem em que são lidas) e colunas gravadas na tabela,
+# onde o código e a descrição da conta viram a chave inteira da dimensão de contas
+TABELA = "demonstracoes_contabeis"
+COLUNAS = ("DATA", "REG_ANS", "CD_CONTA_CONTABIL", "DESCRICAO", "VL_SALDO_INICIAL", "VL_SALDO_FINAL")
+COLUNAS_TABELA = ("DATA", "REG_ANS", "ID_CONTA", "VL_SALDO_INICIAL", "VL_SALDO_FINAL")
+
+# Dimensão das contas contábeis: (código, descrição normalizada) -> chave inteira
+TABELA_CONTAS = "contas"
+
+# Código da conta dos relatórios de maiores despesas (EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA
+# A SAÚDE MEDICO HOSPITALAR). É o mesmo código filtrado nas consultas de queries/*maiores_despesas*.sql
+CONTA_DESPESAS = "411"
+
+# Resumo das despesas por operadora, trimestre e conta, atualizado a cada trimestre carregado
+TABELA_RESUMO = "despesas_trimestrais"
+
+# Cadastro de operadoras (CADOP): tabela, colunas na ordem de query_criacao_tabela_empresas.sql e chave primária
+TABELA_EMPRESAS = "Empresas"
+COLUNAS_EMPRESAS = (
+    "Registro_ANS", "CNPJ", "Razao_Social", "Nome_Fantasia", "Modalidade", "Logradouro", "Numero",
+    "Complemento", "Bairro", "Cidade", "UF", "CEP", "DDD", "Telefone", "Fax", "Endereco_eletronico",
+    "Representante", "Cargo_Representante", "Regiao_de_Comercializacao", "Data_Registro_ANS",
+)
+CHAVE_EMPRESAS = ("Registro_ANS", "CNPJ")
+
+# Relatorio_cadop.csv e o retrato (hash de cada linha) da última sincronização da tabela Empresas
+CADOP_PATH = os.path.join(DADOS_DIR, "Relatorio_cadop.csv")
+SNAPSHOT_EMPRESAS = os.path.join(DADOS_DIR, "snapshot_empresas.json")
+
+# Colunas de valores, convertidas do formato brasileiro ("1234,56") para o numérico ("1234.56")
+COLUNAS_DECIMAIS = ("VL_SALDO_INICIAL", "VL_SALDO_FINAL")
+
+# Linhas enviadas por lote quando o banco não tem COPY (como o SQLite)
+TAMANHO_LOTE = 10000
+
+# Linhas convertidas por transação na migração das colunas de valores para NUMERIC
+LOTE_MIGRACAO = 50000
+
+# Consultas dos relatórios de maiores despesas, sobre as linhas da tabela e sobre o resumo
+CONSULTAS_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), "queries", "desafio - query_maiores_despesas.sql")
+CONSULTAS_RESUMO_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), "queries", "query_maiores_despesas_resumo.sql")
+
+# Script de criação da tabela, usado ao recriá-la no formato com a dimensão de contas
+CRIACAO_TABELA_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), "queries", "criacao_tabela_postgre_demonstracoes_contabeis.sql")
+
+# Codificação dos CSVs publicados pela ANS (o "-sig" descarta o BOM, se houver)
+ENCODING = "utf-8-sig"
+
+# Nome dos arquivos trimestrais: trimestre, "T" e ano (aceita "2t2023.csv")
+PADRAO_TRIMESTRE = re.compile(r"^([1-4])[tT](\d{4})\.csv$")
+
+# Protege o manifesto quando vários arquivos terminam ao mesmo tempo
+_LOCK_MANIFESTO = threading.Lock()
+
+
+def trimestre_do_arquivo(nome):
+    """
+    Identifica o trimestre de um CSV pelo nome do arquivo.
+    
+    Parâmetros:
+    - nome: Nome (ou caminho) do arquivo, como "1T2023.csv".
+    
+    Retorna:
+    - Uma tupla (ano, trimestre), ou None se o nome não segue o padrão.
+    """
+    encontrado = PADRAO_TRIMESTRE.match(os.path.basename(nome))
+    if not encontrado:
+        return None
+    return int(encontrado.group(2)), int(encontrado.group(1))
+
+
+def intervalo_trimestre(ano, trimestre):
+    """Retorna a primeira data do trimestre e a primeira data do trimestre seguinte."""
+    inicio = date(ano, 3 * (trimestre - 1) + 1, 1)
+    fim = date(ano + 1, 1, 1) if trimestre == 4 else date(ano, 3 * trimestre + 1, 1)
+    return inicio, fim
+
+
+def encontrar_arquivos_trimestrais(dados_dir=DADOS_DIR):
+    """
+    Lista os CSVs trimestrais da pasta, do trimestre mais antigo para o mais recente.
+    
+    Parâmetros:
+    - dados_dir: Pasta onde os CSVs estão.
+    
+    Retorna:
+    - Lista com os caminhos dos arquivos.
+    """
+    arquivos = [nome for nome in os.listdir(dados_dir) if trimestre_do_arquivo(nome)]
+    arquivos.sort(key=trimestre_do_arquivo)
+    return [os.path.join(dados_dir, nome) for nome in arquivos]
+
+
+def calcular_hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """Calcula o SHA-256 do arquivo, lendo-o em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def carregar_manifesto(manifesto_path=MANIFESTO_CARGA):
+    """Carrega o manifesto das cargas já feitas, ou um manifesto vazio se ele não existir."""
+    try:
+        with open(manifesto_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def salvar_manifesto(manifesto, manifesto_path=MANIFESTO_CARGA):
+    """Grava o manifesto de forma atômica."""
+    with open(f"{manifesto_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(f"{manifesto_path}.tmp", manifesto_path)
+
+
+def converter_decimal(valor):
+    """
+    Converte um valor no formato brasileiro para o formato numérico do banco.
+    
+    "1.234,56" e "1234,56" viram "1234.56"; valores vazios viram None (NULL).
+    """
+    valor = valor.strip()
+    if not valor:
+        return None
+    if "," in valor:
+        valor = valor.replace(".", "").replace(",", ".")
+    return valor
+
+
+def normalizar_descricao(descricao):
+    """Normaliza a descrição da conta: espaços repetidos viram um só e os das pontas são removidos."""
+    return " ".join((descricao or "").split())
+
+
+def converter_data(valor):
+    """Converte datas "dd/mm/aaaa" para o formato ISO; datas já em ISO são mantidas."""
+    valor = valor.strip()
+    if len(valor) == 10 and valor[2] == "/" and valor[5] == "/":
+        return f"{valor[6:]}-{valor[3:5]}-{valor[:2]}"
+    return valor
+
+
+def ler_linhas_convertidas(caminho, encoding=ENCODING):
+    """
+    Gera as linhas do CSV trimestral já convertidas, à medida que o arquivo é lido.
+    
+    As colunas são localizadas pelo cabeçalho, então a ordem delas no arquivo não importa.
+    
+    Parâmetros:
+    - caminho: Caminho do CSV (separado por ";").
+    - encoding: Codificação do arquivo.
+    
+    Retorna:
+    - Um gerador de listas com os valores na ordem de COLUNAS.
+    """
+    with open(caminho, "r", encoding=encoding, newline="") as f:
+        leitor = csv.reader(f, delimiter=";", quotechar='"')
+        cabecalho = [coluna.strip().upper() for coluna in next(leitor)]
+        faltando = [coluna for coluna in COLUNAS if coluna not in cabecalho]
+        if faltando:
+            raise Exception(f"Colunas ausentes em {os.path.basename(caminho)}: {', '.join(faltando)}")
+        indices = [cabecalho.index(coluna) for coluna in COLUNAS]
+        decimais = [COLUNAS.index(coluna) for coluna in COLUNAS_DECIMAIS]
+        data = COLUNAS.index("DATA")
+
+        for linha in leitor:
+            if not linha:
+                continue
+            valores = [linha[i] for i in indices]
+            valores[data] = converter_data(valores[data])
+            for i in decimais:
+                valores[i] = converter_decimal(valores[i])
+            yield valores
+
+
+def ler_contas(caminho, encoding=ENCODING):
+    """Retorna o conjunto de contas (código, descrição normalizada) que aparecem no CSV trimestral."""
+    return {(linha[2], normalizar_descricao(linha[3])) for linha in ler_linhas_convertidas(caminho, encoding)}
+
+
+def internar_contas(conectar, contas, tabela_contas=TABELA_CONTAS):
+    """
+    Garante que cada conta tem a sua chave inteira na dimensão de contas.
+    
+    É a etapa que roda antes da carga paralela, numa única transação: as contas novas recebem
+    as próximas chaves livres e as cargas só consultam o dicionário retornado, sem escrever na
+    dimensão ao mesmo tempo.
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma nova conexão DB-API.
+    - contas: Iterável de tuplas (código, descrição normalizada).
+    - tabela_contas: Tabela da dimensão de contas.
+    
+    Retorna:
+    - Dicionário (código, descrição normalizada) -> chave, com todas as contas da dimensão.
+    """
+    conexao = conectar()
+    try:
+        cursor = conexao.cursor()
+        cursor.execute(f"SELECT CD_CONTA_CONTABIL, DESCRICAO, ID_CONTA FROM {tabela_contas}")
+        chaves = {(codigo, descricao): chave for codigo, descricao, chave in cursor.fetchall()}
+        novas = sorted(set(contas) - set(chaves))
+        if novas:
+            proxima = max(chaves.values(), default=0) + 1
+            for i, conta in enumerate(novas):
+                chaves[conta] = proxima + i
+            marcador = _marcador(conexao)
+            cursor.executemany(
+                f"INSERT INTO {tabela_contas} (ID_CONTA, CD_CONTA_CONTABIL, DESCRICAO) VALUES ({marcador}, {marcador}, {marcador})",
+                [(chaves[conta], conta[0], conta[1]) for conta in novas],
+            )
+            print(f"{len(novas)} contas novas em {tabela_contas}.")
+        conexao.commit()
+        return chaves
+    except Exception as e:
+        conexao.rollback()
+        raise Exception(f"Erro ao atualizar a dimensão {tabela_contas}: {e}")
+    finally:
+        conexao.close()
+
+
+def vincular_contas(linhas, contas):
+    """Troca o código e a descrição de cada linha pela chave da conta, na ordem de COLUNAS_TABELA."""
+    for data, reg_ans, codigo, descricao, inicial, final in linhas:
+        yield [data, reg_ans, contas[(codigo, normalizar_descricao(descricao))], inicial, final]
+
+
+class _LeitorCopy:
+    """
+    Expõe um gerador de linhas como o arquivo de texto CSV lido pelo COPY FROM STDIN.
+    
+    O texto é gerado aos poucos, a cada read(), sem montar o arquivo inteiro em memória.
+    """
+
+    def __init__(self, linhas):
+        self.linhas = iter(linhas)
+        self.buffer = io.StringIO()
+        self.escritor = csv.writer(self.buffer, delimiter=";", quotechar='"', lineterminator="\n")
+        self.pendente = ""
+        self.total = 0
+
+    def read(self, tamanho=-1):
+        while tamanho < 0 or len(self.pendente) < tamanho:
+            try:
+                self.escritor.writerow(next(self.linhas))
+            except StopIteration:
+                break
+            self.total += 1
+            if self.buffer.tell() >= 64 * 1024:
+                self.pendente += self.buffer.getvalue()
+                self.buffer.seek(0)
+                self.buffer.truncate()
+        self.pendente += self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        if tamanho < 0:
+            tamanho = len(self.pendente)
+        bloco, self.pendente = self.pendente[:tamanho], self.pendente[tamanho:]
+        return bloco
+
+
+def _marcador(conexao):
+    """Retorna o marcador de parâmetros do driver (o sqlite3 usa "?", os drivers do PostgreSQL "%s")."""
+    return "?" if isinstance(conexao, sqlite3.Connection) else "%s"
+
+
+def copiar_linhas(conexao, linhas, tabela=TABELA, colunas=COLUNAS_TABELA, tamanho_lote=TAMANHO_LOTE):
+    """
+    Envia as linhas para a tabela pelo caminho mais rápido que o driver oferece.
+    
+    Com o psycopg2 (copy_expert) ou o psycopg 3 (cursor.copy), as linhas vão por
+    COPY FROM STDIN; nos demais drivers DB-API, como o sqlite3, por executemany em lotes.
+    
+    Parâmetros:
+    - conexao: Conexão DB-API aberta.
+    - linhas: Iterável de listas com os valores na ordem de colunas.
+    - tabela: Tabela de destino.
+    - colunas: Colunas preenchidas.
+    - tamanho_lote: Linhas por lote no executemany.
+    
+    Retorna:
+    - A quantidade de linhas enviadas.
+    """
+    cursor = conexao.cursor()
+    comando_copy = f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv, DELIMITER ';', QUOTE '\"')"
+
+    if hasattr(cursor, "copy_expert"):
+        leitor = _LeitorCopy(linhas)
+        cursor.copy_expert(comando_copy, leitor)
+        return leitor.total
+
+    if hasattr(cursor, "copy"):
+        leitor = _LeitorCopy(linhas)
+        with cursor.copy(comando_copy) as copy:
+            for bloco in iter(lambda: leitor.read(64 * 1024), ""):
+                copy.write(bloco)
+        return leitor.total
+
+    marcador = _marcador(conexao)
+    comando = f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join([marcador] * len(colunas))})"
+    total = 0
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            cursor.executemany(comando, lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        cursor.executemany(comando, lote)
+        total += len(lote)
+    return total
+
+
+def nome_particao(ano, trimestre, tabela=TABELA):
+    """Retorna o nome da partição do trimestre, como "demonstracoes_contabeis_2023t1"."""
+    return f"{tabela}_{ano}t{trimestre}"
+
+
+def tabela_particionada(conexao, tabela=TABELA):
+    """Verifica se a tabela é particionada (só existe no PostgreSQL)."""
+    if isinstance(conexao, sqlite3.Connection):
+        return False
+    cursor = conexao.cursor()
+    cursor.execute("SELECT COUNT(*) FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", (tabela,))
+    return cursor.fetchone()[0] > 0
+
+
+def criar_particoes(conectar, trimestres, tabela=TABELA):
+    """
+    Cria as partições dos trimestres que ainda não existem.
+    
+    É chamada antes da carga paralela, numa única transação: criar uma partição bloqueia a tabela
+    principal, o que faria as cargas em andamento esperarem umas pelas outras. Numa tabela sem
+    particionamento (ou no SQLite), não faz nada.
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma nova conexão DB-API.
+    - trimestres: Iterável de tuplas (ano, trimestre).
+    - tabela: Tabela particionada.
+    
+    Retorna:
+    - Lista com os nomes das partições criadas.
+    """
+    conexao = conectar()
+    try:
+        if not tabela_particionada(conexao, tabela):
+            return []
+        cursor = conexao.cursor()
+        criadas = []
+        for ano, trimestre in sorted(set(trimestres)):
+            nome = nome_particao(ano, trimestre, tabela)
+            cursor.execute("SELECT to_regclass(%s) IS NULL", (nome,))
+            if cursor.fetchone()[0]:
+                inicio, fim = intervalo_trimestre(ano, trimestre)
+                cursor.execute(
+                    f"CREATE TABLE {nome} PARTITION OF {tabela} FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+                )
+                print(f"Partição {nome} criada ({inicio} a {fim}).")
+                criadas.append(nome)
+        conexao.commit()
+        return criadas
+    except Exception as e:
+        conexao.rollback()
+        raise Exception(f"Erro ao criar as partições de {tabela}: {e}")
+    finally:
+        conexao.close()
+
+
+def particoes_lidas(conexao, consulta):
+    """
+    Executa a consulta com EXPLAIN ANALYZE e lista as tabelas (partições) que foram de fato lidas.
+    
+    Serve para conferir se o particionamento está descartando os trimestres fora do período
+    do relatório. Só funciona no PostgreSQL.
+    
+    Retorna:
+    - Conjunto com os nomes das tabelas lidas.
+    """
+    cursor = conexao.cursor()
+    cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {consulta}")
+    plano = cursor.fetchone()[0]
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    lidas = set()
+    pendentes = [plano[0]["Plan"]]
+    while pendentes:
+        no = pendentes.pop()
+        if "Relation Name" in no and no.get("Actual Loops", 0) > 0:
+            lidas.add(no["Relation Name"])
+        pendentes.extend(no.get("Plans", []))
+    return lidas
+
+
+def _tabela_existe(conexao, nome):
+    """Verifica se a tabela existe no banco."""
+    cursor = conexao.cursor()
+    if isinstance(conexao, sqlite3.Connection):
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (nome,))
+        return cursor.fetchone()[0] > 0
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (nome,))
+    return cursor.fetchone()[0]
+
+
+def atualizar_resumo_trimestre(conexao, ano, trimestre, tabela=TABELA, resumo=TABELA_RESUMO):
+    """
+    Recalcula as linhas do resumo de um único trimestre, a partir das linhas da tabela.
+    
+    Roda na transação de quem chama (a carga do trimestre), de modo que o resumo nunca fica
+    diferente da tabela. Os demais trimestres do resumo não são lidos nem alterados.
+    
+    Parâmetros:
+    - conexao: Conexão DB-API aberta.
+    - ano, trimestre: Trimestre a ser recalculado.
+    - tabela: Tabela com as linhas das demonstrações contábeis.
+    - resumo: Tabela do resumo.
+    
+    Retorna:
+    - A quantidade de linhas gravadas no resumo.
+    """
+    inicio, fim = intervalo_trimestre(ano, trimestre)
+    marcador = _marcador(conexao)
+    cursor = conexao.cursor()
+    cursor.execute(f"DELETE FROM {resumo} WHERE TRIMESTRE = {marcador}", (inicio.isoformat(),))
+    cursor.execute(
+        f"INSERT INTO {resumo} (REG_ANS, TRIMESTRE, ID_CONTA, DESPESA, LINHAS) "
+        f"SELECT REG_ANS, {marcador}, ID_CONTA, SUM(VL_SALDO_FINAL - VL_SALDO_INICIAL), COUNT(*) "
+        f"FROM {tabela} WHERE DATA >= {marcador} AND DATA < {marcador} "
+        f"GROUP BY REG_ANS, ID_CONTA",
+        (inicio.isoformat(), inicio.isoformat(), fim.isoformat()),
+    )
+    return max(cursor.rowcount, 0)
+
+
+def atualizar_resumo(conectar, trimestres=None, tabela=TABELA, resumo=TABELA_RESUMO):
+    """
+    Preenche o resumo dos trimestres informados, um trimestre por transação.
+    
+    Usado para montar o resumo de uma tabela que já estava carregada; depois disso, cada carga
+    atualiza sozinha o resumo do seu trimestre.
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma nova conexão DB-API.
+    - trimestres: Iterável de tuplas (ano, trimestre); None usa todos os trimestres da tabela.
+    - tabela: Tabela com as linhas das demonstrações contábeis.
+    - resumo: Tabela do resumo.
+    
+    Retorna:
+    - A quantidade de linhas gravadas no resumo.
+    """
+    conexao = conectar()
+    try:
+        if trimestres is None:
+            cursor = conexao.cursor()
+            cursor.execute(f"SELECT DISTINCT DATA FROM {tabela}")
+            datas = [date.fromisoformat(str(linha[0])[:10]) for linha in cursor.fetchall()]
+            trimestres = {(data.year, (data.month - 1) // 3 + 1) for data in datas}
+        total = 0
+        for ano, trimestre in sorted(set(trimestres)):
+            linhas = atualizar_resumo_trimestre(conexao, ano, trimestre, tabela, resumo)
+            conexao.commit()
+            print(f"Resumo de {trimestre}T{ano}: {linhas} linhas.")
+            total += linhas
+        return total
+    except Exception as e:
+        conexao.rollback()
+        raise Exception(f"Erro ao atualizar o resumo {resumo}: {e}")
+    finally:
+        conexao.close()
+
+
+def carregar_arquivo(conectar, caminho, contas, substituir=False, tabela=TABELA):
+    """
+    Carrega um CSV trimestral no banco, numa única transação e com conexão própria.
+    
+    Se o banco tiver a tabela de resumo, o resumo do trimestre é recalculado na mesma transação.
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma nova conexão DB-API.
+    - caminho: Caminho do CSV.
+    - contas: Dicionário (código, descrição normalizada) -> chave, gerado por internar_contas.
+    - substituir: Se as linhas já carregadas do trimestre do arquivo devem ser apagadas antes
+      (usado quando o arquivo mudou desde a última carga).
+    - tabela: Tabela de destino.
+    
+    Retorna:
+    - A quantidade de linhas carregadas.
+    """
+    conexao = conectar()
+    try:
+        if substituir:
+            inicio, fim = intervalo_trimestre(*trimestre_do_arquivo(caminho))
+            marcador = _marcador(conexao)
+            conexao.cursor().execute(
+                f"DELETE FROM {tabela} WHERE DATA >= {marcador} AND DATA < {marcador}",
+                (inicio.isoformat(), fim.isoformat()),
+            )
+        total = copiar_linhas(conexao, vincular_contas(ler_linhas_convertidas(caminho), contas), tabela)
+        if _tabela_existe(conexao, TABELA_RESUMO):
+            atualizar_resumo_trimestre(conexao, *trimestre_do_arquivo(caminho), tabela)
+        conexao.commit()
+        return total
+    except Exception:
+        conexao.rollback()
+        raise
+    finally:
+        conexao.close()
+
+
+def carregar_trimestres(conectar, dados_dir=DADOS_DIR, manifesto_path=MANIFESTO_CARGA, num_conexoes=NUM_CONEXOES, tabela=TABELA):
+    """
+    Carrega em paralelo os CSVs trimestrais da pasta que ainda não estão no banco.
+    
+    Cada arquivo é carregado por uma thread com a sua própria conexão. Arquivos cujo hash já
+    está no manifesto são pulados; um arquivo que mudou desde a última carga substitui as
+    linhas do seu trimestre. Antes da carga, as contas novas dos arquivos entram na dimensão
+    de contas e, se a tabela for particionada, as partições dos trimestres novos são criadas.
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma nova conexão DB-API.
+    - dados_dir: Pasta com os CSVs trimestrais.
+    - manifesto_path: Caminho do manifesto das cargas já feitas.
+    - num_conexoes: Quantidade de arquivos carregados ao mesmo tempo.
+    - tabela: Tabela de destino.
+    
+    Retorna:
+    - Um dicionário com os arquivos carregados e pulados, o total de linhas, o tempo e as linhas por segundo.
+    """
+    try:
+        manifesto = carregar_manifesto(manifesto_path)
+        carregados = {registro["sha256"] for registro in manifesto.values()}
+        pendentes = []
+        pulados = []
+        for caminho in encontrar_arquivos_trimestrais(dados_dir):
+            sha = calcular_hash_arquivo(caminho)
+            if sha in carregados:
+                print(f"{os.path.basename(caminho)} já foi carregado, pulando.")
+                pulados.append(caminho)
+            else:
+                pendentes.append((caminho, sha))
+
+        contas = {}
+        if pendentes:
+            conexao = conectar()
+            try:
+                if "ID_CONTA" not in _colunas_tabela(conexao, tabela):
+                    raise Exception(f"A tabela {tabela} ainda guarda o código e a descrição da conta em cada linha; "
+                                    f"rode o carregador com --migrate antes.")
+            finally:
+                conexao.close()
+            criar_particoes(conectar, [trimestre_do_arquivo(caminho) for caminho, _ in pendentes], tabela)
+            contas = internar_contas(conectar, set().union(*(ler_contas(caminho) for caminho, _ in pendentes)))
+
+        def carregar(pendente):
+            caminho, sha = pendente
+            nome = os.path.basename(caminho)
+            inicio = time.perf_counter()
+            linhas = carregar_arquivo(conectar, caminho, contas, substituir=nome in manifesto, tabela=tabela)
+            duracao = time.perf_counter() - inicio
+            print(f"{nome}: {linhas} linhas em {duracao:.2f}s ({linhas / max(duracao, 1e-9):.0f} linhas/s)")
+            with _LOCK_MANIFESTO:
+                manifesto[nome] = {"sha256": sha, "linhas": linhas}
+                salvar_manifesto(manifesto, manifesto_path)
+            return linhas
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(num_conexoes, len(pendentes)))) as executor:
+            total = sum(executor.map(carregar, pendentes))
+        duracao = time.perf_counter() - inicio
+
+        resumo = {
+            "carregados": [caminho for caminho, _ in pendentes],
+            "pulados": pulados,
+            "linhas": total,
+            "segundos": duracao,
+            "linhas_por_segundo": total / duracao if total else 0.0,
+        }
+        print(f"Carga concluída: {len(pendentes)} arquivos, {total} linhas em {duracao:.2f}s "
+              f"({resumo['linhas_por_segundo']:.0f} linhas/s); {len(pulados)} arquivos pulados.")
+        return resumo
+    except Exception as e:
+        raise Exception(f"Erro ao carregar os CSVs trimestrais: {e}")
+
+
+def _colunas_tabela(conexao, tabela):
+    """Retorna os nomes das colunas da tabela, em maiúsculas (o PostgreSQL os devolve em minúsculas)."""
+    cursor = conexao.cursor()
+    cursor.execute(f"SELECT * FROM {tabela} WHERE 1 = 0")
+    return [descricao[0].upper() for descricao in cursor.description]
+
+
+def _tipo_coluna(conexao, tabela, coluna):
+    """Retorna o tipo declarado da coluna, em maiúsculas."""
+    cursor = conexao.cursor()
+    if isinstance(conexao, sqlite3.Connection):
+        cursor.execute(f"PRAGMA table_info({tabela})")
+        tipos = {linha[1].upper(): linha[2].upper() for linha in cursor.fetchall()}
+        return tipos[coluna.upper()]
+    cursor.execute(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+        (tabela.lower(), coluna.lower()),
+    )
+    return cursor.fetchone()[0].upper()
+
+
+def migrar_para_numerico(conectar, tabela=TABELA, colunas=COLUNAS_DECIMAIS, tamanho_lote=LOTE_MIGRACAO):
+    """
+    Converte as colunas de valores da tabela de TEXT ("1234,56") para NUMERIC, em lotes.
+    
+    A migração é feita sem bloquear a tabela durante a conversão:
+    1. Cria uma coluna NUMERIC ao lado de cada coluna de texto (VL_SALDO_INICIAL_NUM, ...).
+    2. Preenche as novas colunas em lotes de tamanho_lote linhas, percorrendo a chave primária;
+       cada lote é uma transação, e o progresso é mostrado ao final de cada um.
+    3. Numa transação curta, converte as linhas gravadas durante o passo 2, apaga as colunas de
+       texto e renomeia as novas colunas com os nomes originais.
+    
+    Se for interrompida, a migração é retomada de onde parou na próxima execução; numa tabela que
+    já está com as colunas em NUMERIC, não faz nada.
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma nova conexão DB-API.
+    - tabela: Tabela a ser migrada.
+    - colunas: Colunas de valores a serem convertidas.
+    - tamanho_lote: Linhas convertidas por transação.
+    
+    Retorna:
+    - A quantidade de linhas convertidas.
+    """
+    conexao = conectar()
+    try:
+        existentes = _colunas_tabela(conexao, tabela)
+        novas = {coluna: f"{coluna}_NUM" for coluna in colunas}
+        if all(nova not in existentes for nova in novas.values()) and all(
+            _tipo_coluna(conexao, tabela, coluna) == "NUMERIC" for coluna in colunas
+        ):
+            print(f"As colunas {', '.join(colunas)} de {tabela} já são NUMERIC.")
+            return 0
+
+        cursor = conexao.cursor()
+        for nova in novas.values():
+            if nova not in existentes:
+                cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {nova} NUMERIC")
+        conexao.commit()
+
+        marcador = _marcador(conexao)
+        chave = "(DATA, REG_ANS, CD_CONTA_CONTABIL)"
+        conversoes = ", ".join(
+            f"{nova} = CAST(REPLACE(NULLIF(TRIM({coluna}), ''), ',', '.') AS NUMERIC)" for coluna, nova in novas.items()
+        )
+        pendentes = " OR ".join(
+            f"({nova} IS NULL AND NULLIF(TRIM({coluna}), '') IS NOT NULL)" for coluna, nova in novas.items()
+        )
+
+        cursor.execute(f"SELECT COUNT(*) FROM {tabela}")
+        total_linhas = cursor.fetchone()[0]
+        convertidas = 0
+        ultima = None
+        inicio = time.perf_counter()
+        while True:
+            depois = f"{chave} > ({marcador}, {marcador}, {marcador})" if ultima else "1 = 1"
+            parametros = tuple(ultima) if ultima else ()
+            cursor.execute(
+                f"SELECT DATA, REG_ANS, CD_CONTA_CONTABIL FROM {tabela} WHERE {depois} "
+                f"ORDER BY DATA, REG_ANS, CD_CONTA_CONTABIL LIMIT 1 OFFSET {tamanho_lote - 1}",
+                parametros,
+            )
+            limite = cursor.fetchone()
+            ate = f" AND {chave} <= ({marcador}, {marcador}, {marcador})" if limite else ""
+            cursor.execute(
+                f"UPDATE {tabela} SET {conversoes} WHERE {depois}{ate} AND ({pendentes})",
+                parametros + (tuple(limite) if limite else ()),
+            )
+            conexao.commit()
+            convertidas += max(cursor.rowcount, 0)
+            duracao = time.perf_counter() - inicio
+            print(f"Migração de {tabela}: {convertidas}/{total_linhas} linhas convertidas "
+                  f"({100 * convertidas / max(total_linhas, 1):.1f}%, {convertidas / max(duracao, 1e-9):.0f} linhas/s)")
+            if not limite:
+                break
+            ultima = limite
+
+        # Troca as colunas numa transação curta, convertendo antes as linhas gravadas durante os lotes
+        if not isinstance(conexao, sqlite3.Connection):
+            cursor.execute(f"LOCK TABLE {tabela} IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(f"UPDATE {tabela} SET {conversoes} WHERE {pendentes}")
+        convertidas += max(cursor.rowcount, 0)
+        for coluna, nova in novas.items():
+            cursor.execute(f"ALTER TABLE {tabela} DROP COLUMN {coluna}")
+            cursor.execute(f"ALTER TABLE {tabela} RENAME COLUMN {nova} TO {coluna}")
+        conexao.commit()
+        print(f"Migração de {tabela} concluída: {convertidas} linhas convertidas em {time.perf_counter() - inicio:.2f}s.")
+        return convertidas
+    except Exception as e:
+        conexao.rollback()
+        raise Exception(f"Erro ao migrar {tabela} para NUMERIC: {e}")
+    finally:
+        conexao.close()
+
+
+def migrar_para_contas(conectar, tabela=TABELA, tabela_contas=TABELA_CONTAS):
+    """
+    Converte uma tabela que guarda o código e a descrição da conta em cada linha para o formato
+    com a chave inteira da dimensão de contas.
+    
+    As contas da tabela entram na dimensão e a tabela é recriada, numa única transação, com o
+    esquema de criacao_tabela_postgre_demonstracoes_contabeis.sql. As colunas de valores já
+    precisam estar em NUMERIC (veja migrar_para_numerico). Numa tabela já convertida, não faz nada.
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma nova conexão DB-API.
+    - tabela: Tabela a ser convertida.
+    - tabela_contas: Tabela da dimensão de contas.
+    
+    Retorna:
+    - A quantidade de linhas convertidas.
+    """
+    conexao = conectar()
+    try:
+        if "ID_CONTA" in _colunas_tabela(conexao, tabela):
+            print(f"A tabela {tabela} já usa a dimensão {tabela_contas}.")
+            return 0
+
+        cursor = conexao.cursor()
+        cursor.execute(f"SELECT DISTINCT CD_CONTA_CONTABIL, DESCRICAO FROM {tabela}")
+        originais = cursor.fetchall()
+        contas = internar_contas(conectar, {(codigo, normalizar_descricao(descricao)) for codigo, descricao in originais}, tabela_contas)
+
+        inicio = time.perf_counter()
+        marcador = _marcador(conexao)
+        if isinstance(conexao, sqlite3.Connection):
+            cursor.execute("BEGIN")  # O sqlite3 não abre transação sozinho antes de comandos DDL
+        cursor.execute(f"ALTER TABLE {tabela} RENAME TO {tabela}_antiga")
+        for comando in ler_consultas(CRIACAO_TABELA_PATH):
+            cursor.execute(comando)
+        cursor.execute("CREATE TEMPORARY TABLE mapa_contas (CD_CONTA_CONTABIL VARCHAR(50), DESCRICAO TEXT, ID_CONTA INT)")
+        cursor.executemany(
+            f"INSERT INTO mapa_contas VALUES ({marcador}, {marcador}, {marcador})",
+            [(codigo, descricao or "", contas[(codigo, normalizar_descricao(descricao))]) for codigo, descricao in originais],
+        )
+        cursor.execute(
+            f"INSERT INTO {tabela} ({', '.join(COLUNAS_TABELA)}) "
+            f"SELECT a.DATA, a.REG_ANS, m.ID_CONTA, a.VL_SALDO_INICIAL, a.VL_SALDO_FINAL FROM {tabela}_antiga a "
+            f"JOIN mapa_contas m ON m.CD_CONTA_CONTABIL = a.CD_CONTA_CONTABIL AND m.DESCRICAO = COALESCE(a.DESCRICAO, '')"
+        )
+        convertidas = max(cursor.rowcount, 0)
+        cursor.execute(f"DROP TABLE {tabela}_antiga")
+        cursor.execute("DROP TABLE mapa_contas")
+        conexao.commit()
+        print(f"Tabela {tabela} convertida para a dimensão {tabela_contas}: {convertidas} linhas, "
+              f"{len(set(contas.values()))} contas, em {time.perf_counter() - inicio:.2f}s.")
+        return convertidas
+    except Exception as e:
+        conexao.rollback()
+        raise Exception(f"Erro ao converter {tabela} para a dimensão {tabela_contas}: {e}")
+    finally:
+        conexao.close()
+
+
+def ler_consultas(caminho=CONSULTAS_PATH):
+    """
+    Lê as consultas de um arquivo .sql, separadas por ";".
+    
+    Retorna:
+    - Lista com o texto de cada consulta, sem as linhas de comentário.
+    """
+    with open(caminho, "r", encoding="utf-8") as f:
+        texto = "\n".join(linha for linha in f.read().splitlines() if not linha.lstrip().startswith("--"))
+    return [consulta.strip() for consulta in texto.split(";") if consulta.strip()]
+
+
+def adaptar_para_sqlite(consulta):
+    """Troca a aritmética de datas do PostgreSQL ("data - INTERVAL '3 months'") pela função DATE do SQLite."""
+    return re.sub(
+        r"(\(SELECT MAX\(\w+\) FROM \w+\)) - INTERVAL '(\d+) (\w+)'",
+        r"DATE(\1, '-\2 \3')",
+        consulta,
+    )
+
+
+def ler_cadop(cadop_path=CADOP_PATH, encoding=ENCODING):
+    """
+    Lê o cadastro de operadoras (Relatorio_cadop.csv), com as colunas na ordem de COLUNAS_EMPRESAS.
+    
+    Textos vazios viram None (NULL) e as datas são convertidas para o formato ISO. Se a mesma
+    chave (Registro_ANS, CNPJ) aparecer mais de uma vez, vale a última linha.
+    
+    Retorna:
+    - Dicionário chave ("Registro_ANS|CNPJ") -> lista de valores.
+    """
+    with open(cadop_path, "r", encoding=encoding, newline="") as f:
+        leitor = csv.reader(f, delimiter=";", quotechar='"')
+        cabecalho = [coluna.strip().upper() for coluna in next(leitor)]
+        faltando = [coluna for coluna in COLUNAS_EMPRESAS if coluna.upper() not in cabecalho]
+        if faltando:
+            raise Exception(f"Colunas ausentes em {os.path.basename(cadop_path)}: {', '.join(faltando)}")
+        indices = [cabecalho.index(coluna.upper()) for coluna in COLUNAS_EMPRESAS]
+        data = COLUNAS_EMPRESAS.index("Data_Registro_ANS")
+        chave = [COLUNAS_EMPRESAS.index(coluna) for coluna in CHAVE_EMPRESAS]
+
+        linhas = {}
+        for linha in leitor:
+            if not linha:
+                continue
+            valores = [linha[i].strip() or None for i in indices]
+            if valores[data]:
+                valores[data] = converter_data(valores[data])
+            if all(valores[i] for i in chave):
+                linhas["|".join(valores[i] for i in chave)] = valores
+        return linhas
+
+
+def calcular_hash_linha(valores):
+    """Calcula o hash dos valores de uma linha, usado para saber se ela mudou desde a última sincronização."""
+    return hashlib.sha256("\x1f".join("" if valor is None else valor for valor in valores).encode("utf-8")).hexdigest()
+
+
+def comparar_cadop(linhas, snapshot):
+    """
+    Compara as linhas do cadastro atual com o retrato da última sincronização.
+    
+    Parâmetros:
+    - linhas: Dicionário chave -> valores, gerado por ler_cadop.
+    - snapshot: Dicionário chave -> hash da última sincronização.
+    
+    Retorna:
+    - Uma tupla (inseridas, alteradas, removidas, hashes): listas de chaves e o novo retrato.
+    """
+    hashes = {chave: calcular_hash_linha(valores) for chave, valores in linhas.items()}
+    inseridas = [chave for chave in hashes if chave not in snapshot]
+    alteradas = [chave for chave, valor in hashes.items() if chave in snapshot and snapshot[chave] != valor]
+    removidas = [chave for chave in snapshot if chave not in hashes]
+    return inseridas, alteradas, removidas, hashes
+
+
+def sincronizar_empresas(conectar, cadop_path=CADOP_PATH, snapshot_path=SNAPSHOT_EMPRESAS, tabela=TABELA_EMPRESAS):
+    """
+    Sincroniza a tabela Empresas com o Relatorio_cadop.csv, aplicando só as diferenças.
+    
+    Cada linha do cadastro é comparada, pelo hash, com o retrato da última sincronização. As
+    linhas novas e alteradas vão para uma tabela temporária (por COPY, quando o driver permite)
+    e entram na tabela com um único INSERT ... ON CONFLICT DO UPDATE; as removidas saem com um
+    único DELETE. Tudo numa transação, e o retrato só é gravado depois do commit. Sem retrato
+    (a primeira sincronização), todas as linhas são tratadas como novas, e as já existentes na
+    tabela são atualizadas.
+    
+    Parâmetros:
+    - conectar: Função sem argumentos que abre uma nova conexão DB-API.
+    - cadop_path: Caminho do Relatorio_cadop.csv.
+    - snapshot_path: Caminho do retrato da última sincronização.
+    - tabela: Tabela do cadastro de operadoras.
+    
+    Retorna:
+    - Dicionário com a quantidade de linhas inseridas, alteradas, removidas e inalteradas.
+    """
+    try:
+        linhas = ler_cadop(cadop_path)
+        snapshot = carregar_manifesto(snapshot_path)
+        inseridas, alteradas, removidas, hashes = comparar_cadop(linhas, snapshot)
+        resumo = {
+            "inseridas": len(inseridas),
+            "alteradas": len(alteradas),
+            "removidas": len(removidas),
+            "inalteradas": len(linhas) - len(inseridas) - len(alteradas),
+        }
+
+        if inseridas or alteradas or removidas:
+            conexao = conectar()
+            try:
+                cursor = conexao.cursor()
+                colunas = ", ".join(COLUNAS_EMPRESAS)
+                chave = ", ".join(CHAVE_EMPRESAS)
+                cursor.execute(f"CREATE TEMPORARY TABLE empresas_alteracoes AS SELECT * FROM {tabela} WHERE 1 = 0")
+                cursor.execute(f"CREATE TEMPORARY TABLE empresas_removidas AS SELECT {chave} FROM {tabela} WHERE 1 = 0")
+                copiar_linhas(conexao, (linhas[c] for c in inseridas + alteradas), "empresas_alteracoes", COLUNAS_EMPRESAS)
+                copiar_linhas(conexao, (c.split("|", 1) for c in removidas), "empresas_removidas", CHAVE_EMPRESAS)
+
+                atualizacoes = ", ".join(f"{coluna} = excluded.{coluna}" for coluna in COLUNAS_EMPRESAS if coluna not in CHAVE_EMPRESAS)
+                cursor.execute(
+                    f"INSERT INTO {tabela} ({colunas}) SELECT {colunas} FROM empresas_alteracoes WHERE TRUE "
+                    f"ON CONFLICT ({chave}) DO UPDATE SET {atualizacoes}"
+                )
+                cursor.execute(f"DELETE FROM {tabela} WHERE ({chave}) IN (SELECT {chave} FROM empresas_removidas)")
+                cursor.execute("DROP TABLE empresas_alteracoes")
+                cursor.execute("DROP TABLE empresas_removidas")
+                conexao.commit()
+            except Exception:
+                conexao.rollback()
+                raise
+            finally:
+                conexao.close()
+            salvar_manifesto(hashes, snapshot_path)
+
+        print(f"Empresas sincronizadas: {resumo['inseridas']} inseridas, {resumo['alteradas']} alteradas, "
+              f"{resumo['removidas']} removidas, {resumo['inalteradas']} inalteradas.")
+        return resumo
+    except Exception as e:
+        raise Exception(f"Erro ao sincronizar a tabela {tabela}: {e}")
+
+
+def _importar_psycopg2():
+    """Importa o psycopg2, que só é necessário para carregar no PostgreSQL."""
+    try:
+        import psycopg2
+        return psycopg2
+    except ImportError:
+        raise Exception("A carga no PostgreSQL precisa do pacote psycopg2 instalado.")
+
+
+def conexao_postgres(dsn=DSN):
+    """Retorna uma função que abre uma nova conexão com o PostgreSQL a cada chamada."""
+    psycopg2 = _importar_psycopg2()
+    return lambda: psycopg2.connect(dsn)
+
+
+def conexao_sqlite(caminho):
+    """Retorna uma função que abre uma nova conexão com o banco SQLite a cada chamada."""
+    return lambda: sqlite3.connect(caminho, timeout=60)
+
+
+def main(dados_dir=DADOS_DIR, dsn=DSN, sqlite_path=None, num_conexoes=NUM_CONEXOES, migrar=False, montar_resumo=False, cadop_path=None):
+    """
+    Carrega os CSVs trimestrais no PostgreSQL (ou, se informado, num banco SQLite).
+    
+    Com migrar, converte antes a tabela do formato antigo: as colunas de valores para NUMERIC e o
+    código e a descrição da conta para a chave da dimensão de contas. Com montar_resumo, preenche
+    antes o resumo de todos os trimestres já carregados. Com cadop_path, sincroniza também a
+    tabela Empresas com o cadastro de operadoras.
+    """
+    conectar = conexao_sqlite(sqlite_path) if sqlite_path else conexao_postgres(dsn)
+    if migrar:
+        migrar_para_numerico(conectar)
+        migrar_para_contas(conectar)
+    if montar_resumo:
+        atualizar_resumo(conectar)
+    manifesto_path = os.path.join(dados_dir, os.path.basename(MANIFESTO_CARGA))
+    resumo = carregar_trimestres(conectar, dados_dir, manifesto_path, num_conexoes)
+    if cadop_path:
+        sincronizar_empresas(conectar, cadop_path, os.path.join(dados_dir, os.path.basename(SNAPSHOT_EMPRESAS)))
+    return resumo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carrega os CSVs trimestrais das demonstrações contábeis no banco.")
+    parser.add_argument("--dir", default=DADOS_DIR, help="Pasta com os CSVs trimestrais (1T2023.csv, ...).")
+    parser.add_argument("--dsn", default=DSN, help="Conexão com o PostgreSQL (padrão: variável DATABASE_URL).")
+    parser.add_argument("--sqlite", default=None, help="Carrega num banco SQLite em vez do PostgreSQL.")
+    parser.add_argument("--workers", type=int, default=NUM_CONEXOES, help="Quantidade de conexões em paralelo.")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Converte antes a tabela do formato antigo: VL_SALDO_* para NUMERIC e as contas para a dimensão contas.")
+    parser.add_argument("--rollup", action="store_true",
+                        help=f"Preenche antes a tabela {TABELA_RESUMO} com os trimestres já carregados.")
+    parser.add_argument("--cadop", default=None,
+                        help="Sincroniza também a tabela Empresas com este Relatorio_cadop.csv, aplicando só as diferenças.")
+    args = parser.parse_args()
+    main(args.dir, args.dsn, args.sqlite, args.workers, args.migrate, args.rollup, args.cadop)
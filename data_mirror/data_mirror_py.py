@@ -0,0 +1,229 @@
+import os
+import re
+import shutil
+import asyncio
+import zipfile
+import argparse
+from urllib.parse import urljoin, urlparse, unquote
+from bs4 import BeautifulSoup
+
+from web_scraping import web_scraping_py
+from data_loading import data_loading_py
+
+# Diretórios de dados abertos da ANS: demonstrações contábeis (uma pasta por ano, um ZIP por
+# trimestre) e o cadastro de operadoras ativas
+URL_DEMONSTRACOES = "https://dadosabertos.ans.gov.br/FTP/PDA/demonstracoes_contabeis/"
+URL_CADOP = "https://dadosabertos.ans.gov.br/FTP/PDA/operadoras_de_plano_de_saude_ativas/Relatorio_cadop.csv"
+
+# Pasta local espelhada: a mesma lida pelo carregador (data_loading_py)
+DADOS_DIR = data_loading_py.DADOS_DIR
+
+# Manifesto dos trimestres já espelhados
+MANIFESTO_ESPELHO = os.path.join(DADOS_DIR, "manifesto_espelho.json")
+
+# Quantidade máxima de requisições (listagens e downloads) em andamento ao mesmo tempo
+MAX_CONCORRENCIA = web_scraping_py.MAX_DOWNLOADS_SIMULTANEOS
+
+# Nomes dos ZIPs trimestrais ("1T2023.zip") e das pastas de ano ("2023/") nas listagens
+PADRAO_ZIP = re.compile(r"^([1-4])T(\d{4})\.zip$", re.IGNORECASE)
+PADRAO_ANO = re.compile(r"^(\d{4})/$")
+
+# Tamanho dos blocos copiados do ZIP para o disco
+CHUNK_SIZE = web_scraping_py.CHUNK_SIZE
+
+
+def listar_links(html, base_url):
+    """
+    Lista os links de uma página de listagem de diretório (Apache/nginx), em URLs absolutas.
+    
+    Os links de ordenação ("?C=N;O=D") e os que saem do diretório listado (como "../") são ignorados.
+    
+    Retorna:
+    - Lista de tuplas (nome, url), em que o nome é o último trecho do caminho ("2023/", "1T2023.zip").
+    """
+    links = []
+    for link in BeautifulSoup(html, "html.parser").find_all("a", href=True):
+        url = urljoin(base_url, link["href"])
+        if urlparse(url).query or not url.startswith(base_url) or url == base_url:
+            continue
+        nome = unquote(url[len(base_url):])
+        if nome.count("/") > 1 or (nome.count("/") == 1 and not nome.endswith("/")):
+            continue
+        links.append((nome, url))
+    return links
+
+
+async def _obter_listagem(url, sessao, semaforo):
+    async with semaforo:
+        return await asyncio.to_thread(web_scraping_py.obter_conteudo, url, sessao)
+
+
+async def listar_trimestres(url_base, sessao, semaforo, desde=None):
+    """
+    Percorre a listagem das demonstrações contábeis e as pastas de cada ano, ao mesmo tempo.
+    
+    Parâmetros:
+    - url_base: URL da listagem (terminada em "/").
+    - sessao: Sessão HTTP compartilhada.
+    - semaforo: Semáforo que limita as requisições simultâneas.
+    - desde: Primeiro ano espelhado; None para todos.
+    
+    Retorna:
+    - Dicionário trimestre ("1T2023") -> URL do ZIP.
+    """
+    trimestres = {}
+    pastas = []
+    for nome, url in listar_links(await _obter_listagem(url_base, sessao, semaforo), url_base):
+        ano = PADRAO_ANO.match(nome)
+        if ano and (desde is None or int(ano.group(1)) >= desde):
+            pastas.append(url)
+        elif PADRAO_ZIP.match(nome):
+            trimestres[nome] = url
+
+    for url_pasta, html in zip(pastas, await asyncio.gather(*(_obter_listagem(url, sessao, semaforo) for url in pastas))):
+        for nome, url in listar_links(html, url_pasta):
+            if PADRAO_ZIP.match(nome):
+                trimestres[nome] = url
+
+    resultado = {}
+    for nome, url in trimestres.items():
+        trimestre, ano = PADRAO_ZIP.match(nome).groups()
+        if desde is None or int(ano) >= desde:
+            resultado[f"{trimestre}T{ano}"] = url
+    return dict(sorted(resultado.items(), key=lambda item: (item[0][2:], item[0][0])))
+
+
+def extrair_zip(zip_path, destino, chunk_size=CHUNK_SIZE):
+    """
+    Extrai os CSVs do ZIP para a pasta de destino, copiando em blocos, sem carregar os arquivos em memória.
+    
+    Os caminhos internos do ZIP são descartados (só o nome do arquivo é usado) e cada arquivo é
+    gravado num temporário renomeado no fim, para que o carregador nunca veja um CSV pela metade.
+    
+    Retorna:
+    - Lista com os nomes dos arquivos extraídos.
+    """
+    extraidos = []
+    with zipfile.ZipFile(zip_path, "r") as zipf:
+        for membro in zipf.infolist():
+            nome = os.path.basename(membro.filename.replace("\\", "/"))
+            if membro.is_dir() or not nome.lower().endswith(".csv"):
+                continue
+            caminho = os.path.join(destino, nome)
+            with zipf.open(membro) as origem, open(f"{caminho}.tmp", "wb") as saida:
+                shutil.copyfileobj(origem, saida, chunk_size)
+            os.replace(f"{caminho}.tmp", caminho)
+            extraidos.append(nome)
+    return extraidos
+
+
+async def baixar_trimestre(trimestre, url, dados_dir, sessao, semaforo):
+    """
+    Baixa o ZIP de um trimestre e extrai os CSVs para a pasta de dados.
+    
+    O download usa web_scraping_py.baixar_pdf, que retoma transferências interrompidas; o ZIP é
+    apagado depois da extração.
+    
+    Retorna:
+    - A entrada do manifesto do trimestre (URL e arquivos extraídos).
+    """
+    zip_path = os.path.join(dados_dir, f"{trimestre}.zip.part")
+    async with semaforo:
+        await asyncio.to_thread(web_scraping_py.baixar_pdf, url, zip_path, condicional=False, sessao=sessao)
+    try:
+        arquivos = await asyncio.to_thread(extrair_zip, zip_path, dados_dir)
+    finally:
+        os.remove(zip_path)
+    if not arquivos:
+        raise Exception(f"Nenhum CSV encontrado em {url}")
+    print(f"Trimestre {trimestre} espelhado: {', '.join(arquivos)}")
+    return {"url": url, "arquivos": arquivos}
+
+
+async def baixar_cadop(url, dados_dir, sessao, semaforo):
+    """
+    Baixa o Relatorio_cadop.csv com uma requisição condicional: se o arquivo não mudou desde o
+    último download (304), nada é baixado.
+    
+    Retorna:
+    - True se o arquivo foi baixado, ou False se não mudou.
+    """
+    destino = os.path.join(dados_dir, os.path.basename(data_loading_py.CADOP_PATH))
+    cache_path = os.path.join(dados_dir, web_scraping_py.CACHE_DOWNLOADS)
+    async with semaforo:
+        return await asyncio.to_thread(web_scraping_py.baixar_pdf, url, destino, cache_path=cache_path, sessao=sessao)
+
+
+def _trimestre_espelhado(manifesto, trimestre, url, dados_dir):
+    entrada = manifesto.get(trimestre)
+    return (entrada is not None and entrada["url"] == url
+            and all(os.path.exists(os.path.join(dados_dir, nome)) for nome in entrada["arquivos"]))
+
+
+async def _espelhar(dados_dir, url_demonstracoes, url_cadop, manifesto_path, max_concorrencia, desde):
+    semaforo = asyncio.Semaphore(max(1, max_concorrencia))
+    manifesto = data_loading_py.carregar_manifesto(manifesto_path)
+    with web_scraping_py.criar_sessao(max_concorrencia) as sessao:
+        cadop = asyncio.create_task(baixar_cadop(url_cadop, dados_dir, sessao, semaforo)) if url_cadop else None
+        trimestres = await listar_trimestres(url_demonstracoes, sessao, semaforo, desde)
+        novos = {t: url for t, url in trimestres.items() if not _trimestre_espelhado(manifesto, t, url, dados_dir)}
+        print(f"{len(trimestres)} trimestres publicados, {len(novos)} novos.")
+
+        async def baixar(trimestre, url):
+            manifesto[trimestre] = await baixar_trimestre(trimestre, url, dados_dir, sessao, semaforo)
+            # Gravado a cada trimestre, para que uma falha nos demais não perca os já baixados
+            data_loading_py.salvar_manifesto(manifesto, manifesto_path)
+
+        resultados = await asyncio.gather(*(baixar(t, url) for t, url in novos.items()), return_exceptions=True)
+        cadop_baixado = await cadop if cadop else False
+
+    erros = [f"{t}: {erro}" for t, erro in zip(novos, resultados) if isinstance(erro, Exception)]
+    if erros:
+        raise Exception("; ".join(erros))
+    return {"baixados": list(novos), "pulados": len(trimestres) - len(novos), "cadop": cadop_baixado}
+
+
+def espelhar_dados_abertos(dados_dir=DADOS_DIR, url_demonstracoes=URL_DEMONSTRACOES, url_cadop=URL_CADOP,
+                           manifesto_path=None, max_concorrencia=MAX_CONCORRENCIA, desde=None):
+    """
+    Espelha os dados abertos da ANS usados no item 3: os CSVs trimestrais das demonstrações
+    contábeis e o Relatorio_cadop.csv.
+    
+    As listagens de diretório são percorridas e os trimestres novos baixados ao mesmo tempo, com
+    no máximo max_concorrencia requisições em andamento. Cada ZIP é extraído para dados_dir, no
+    formato esperado por data_loading_py.carregar_trimestres. Os trimestres já espelhados (no
+    manifesto, com os CSVs ainda na pasta) não são baixados de novo, e o cadastro só é baixado
+    se mudou.
+    
+    Parâmetros:
+    - dados_dir: Pasta local dos dados.
+    - url_demonstracoes: URL da listagem das demonstrações contábeis.
+    - url_cadop: URL do Relatorio_cadop.csv; None para não baixá-lo.
+    - manifesto_path: Caminho do manifesto; por padrão, manifesto_espelho.json em dados_dir.
+    - max_concorrencia: Quantidade máxima de requisições simultâneas.
+    - desde: Primeiro ano espelhado; None para todos.
+    
+    Retorna:
+    - Dicionário com os trimestres baixados, a quantidade de trimestres pulados e se o cadastro foi baixado.
+    """
+    try:
+        os.makedirs(dados_dir, exist_ok=True)
+        manifesto_path = manifesto_path or os.path.join(dados_dir, os.path.basename(MANIFESTO_ESPELHO))
+        if not url_demonstracoes.endswith("/"):
+            url_demonstracoes += "/"
+        return asyncio.run(_espelhar(dados_dir, url_demonstracoes, url_cadop, manifesto_path, max_concorrencia, desde))
+    except Exception as e:
+        raise Exception(f"Erro ao espelhar os dados abertos da ANS: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Baixa os CSVs trimestrais e o cadastro de operadoras dos dados abertos da ANS.")
+    parser.add_argument("--dir", default=DADOS_DIR, help="Pasta local dos dados (a mesma usada pelo carregador).")
+    parser.add_argument("--desde", type=int, default=None, help="Primeiro ano espelhado.")
+    parser.add_argument("--workers", type=int, default=MAX_CONCORRENCIA, help="Requisições simultâneas.")
+    parser.add_argument("--sem-cadop", action="store_true", help="Não baixa o Relatorio_cadop.csv.")
+    args = parser.parse_args()
+    resumo = espelhar_dados_abertos(args.dir, url_cadop=None if args.sem_cadop else URL_CADOP,
+                                    max_concorrencia=args.workers, desde=args.desde)
+    print(f"Trimestres baixados: {', '.join(resumo['baixados']) or 'nenhum'} | já espelhados: {resumo['pulados']} | "
+          f"cadastro {'atualizado' if resumo['cadop'] else 'sem mudanças'}")
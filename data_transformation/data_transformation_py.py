@@ -1,8 +1,24 @@
+import io
 import os
+import re
+import sys
+import csv
+import json
+import shutil
+import hashlib
 import zipfile
+import tempfile
 import pdfplumber
+import numpy as np
 import pandas as pd
-import subprocess
+import argparse
+import time
+from functools import partial
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from pdfminer.pdftypes import resolve1, PDFObjRef, PDFStream
+from pdfminer.psparser import PSLiteral, PSKeyword
 
 # Caminho para a pasta web_scraping
 WEB_SCRAPING_PATH = os.path.abspath(os.path.join(os.getcwd(), "..", "web_scraping"))
@@ -20,14 +36,95 @@ CSV_PATH = os.path.abspath(os.path.join(os.getcwd(), "dados_rol_procedimentos.cs
 # Caminho para o arquivo ZIP de saída do CSV
 ZIP_CSV_PATH = os.path.join(SCRIPT_DIR, "Teste_Gabriel.zip")
 
-def executar_web_scraping():
-    """Executa o script web_scraping.py para baixar o arquivo Anexos.zip novamente."""
+# Quando ativo, as linhas são gravadas no CSV à medida que as páginas são lidas,
+# sem montar o DataFrame completo em memória
+MODO_STREAMING = True
+
+# Quando ativo, o PDF é lido direto de Anexos.zip e o CSV é gravado direto em
+# Teste_Gabriel.zip, sem arquivos temporários no disco
+MODO_DIRETO_ZIP = True
+
+# Número de processos usados na extração das tabelas (1 = extração serial)
+NUM_WORKERS = os.cpu_count() or 1
+
+# Intervalos de páginas em andamento (ou prontos, à espera de serem consumidos) por processo;
+# limita a memória da extração paralela quando a gravação é mais lenta que os workers
+MAX_PENDENTES_POR_WORKER = 2
+
+# Nome do PDF dentro de Anexos.zip
+PDF_NAME = "Anexo_I.pdf"
+
+# Tamanho máximo do PDF mantido em memória; acima disso o buffer vai para o disco
+LIMITE_PDF_EM_MEMORIA = 256 * 1024 * 1024
+
+# Cache em disco das tabelas extraídas de cada página, para reprocessar só as páginas alteradas
+USAR_CACHE = True
+CACHE_DIR = os.path.join(SCRIPT_DIR, "cache_paginas")
+LIMITE_CACHE_BYTES = 512 * 1024 * 1024
+
+# Motor de extração das tabelas: "pdfplumber", "pdfplumber_modelo" (reaproveita a grade de
+# colunas da primeira página), "pymupdf", "tabula" ou "auto" (escolhe o mais rápido, entre os
+# que concordam entre si, medindo uma amostra de páginas)
+MOTOR = "pdfplumber"
+AMOSTRA_PAGINAS = 5
+
+# Formatos colunares gravados junto com o CSV compactado ("parquet" e/ou "arrow")
+FORMATOS_COLUNARES = ()
+CODEC_COLUNAR = "zstd"
+LINHAS_POR_GRUPO = 64 * 1024
+CAMINHOS_COLUNARES = {
+    "parquet": os.path.join(SCRIPT_DIR, "dados_rol_procedimentos.parquet"),
+    "arrow": os.path.join(SCRIPT_DIR, "dados_rol_procedimentos.arrow"),
+}
+
+# Colunas com até esta proporção de valores distintos são convertidas para o tipo category
+LIMITE_CARDINALIDADE = 0.5
+
+# Sequências de espaços e quebras de linha dentro das células
+ESPACOS = re.compile(r"\s+")
+
+# Abreviações da legenda e suas descrições completas
+ABREVIACOES = {"OD": "Seg. Odontológica", "AMB": "Seg. Ambulatorial"}
+
+# Checkpoints das etapas do pipeline, usados para retomar uma execução que falhou
+CHECKPOINT_DIR = os.path.join(SCRIPT_DIR, "checkpoints")
+MAX_TENTATIVAS = 3
+ESPERA_INICIAL = 2.0
+
+# Quando ativo, as linhas extraídas e as normalizadas também viram checkpoints (JSON Lines, em
+# CHECKPOINT_DIR), para que uma falha na gravação não repita a extração. Custa gravar e reler a
+# tabela inteira duas vezes; sem ele, o PDF vai direto para o CSV e as páginas já extraídas
+# ficam no cache de páginas
+CHECKPOINT_LINHAS = False
+
+def _importar_web_scraping():
+    """
+    Importa o módulo de web scraping só quando ele é usado.
+    
+    Executando este script da própria pasta (python data_transformation_py.py), a raiz do
+    repositório não está no caminho de importação, então ela é adicionada.
+    """
     try:
-        print("O arquivo Anexos.zip não foi encontrado. Executando o script web_scraping_py.py...")
-        subprocess.run(["python", os.path.join(WEB_SCRAPING_PATH, "web_scraping_py.py")], check=True, cwd=WEB_SCRAPING_PATH)
-        print("Script web_scraping.py executado com sucesso!")
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Erro ao executar o script web_scraping_py.py: {e}")
+        from web_scraping import web_scraping_py
+    except ImportError:
+        sys.path.append(os.path.dirname(SCRIPT_DIR))
+        from web_scraping import web_scraping_py
+    return web_scraping_py
+
+def executar_web_scraping(zip_path=ZIP_PATH):
+    """
+    Executa o web scraping no próprio processo para atualizar o arquivo Anexos.zip.
+    
+    Com o Anexos.zip já no disco, os downloads são condicionais e o arquivo só é recriado se
+    algum anexo mudou. Retorna True se o arquivo foi (re)criado, ou False se nada mudou.
+    """
+    try:
+        print("Executando o web scraping...")
+        atualizado = _importar_web_scraping().main(zip_path)
+        print("Web scraping executado com sucesso!")
+        return atualizado
+    except Exception as e:
+        raise Exception(f"Erro ao executar o web scraping: {e}")
 
 def extrair_pdf_do_zip(zip_path, pdf_path):
     """Extrai o arquivo Anexo_I.pdf de Anexos.zip para a pasta web_scraping."""
@@ -36,7 +133,7 @@ def extrair_pdf_do_zip(zip_path, pdf_path):
         with zipfile.ZipFile(zip_path, 'r') as zipf:
             # Verifica se o arquivo Anexo_I.pdf está dentro do ZIP
             if "Anexo_I.pdf" in zipf.namelist():
-                zipf.extract("Anexo_I.pdf", WEB_SCRAPING_PATH)  # Extrai para a pasta web_scraping
+                zipf.extract("Anexo_I.pdf", os.path.dirname(pdf_path))  # Extrai para a pasta web_scraping
                 print(f"Arquivo {pdf_path} extraído com sucesso!")
             else:
                 raise Exception("O arquivo Anexo_I.pdf não foi encontrado no arquivo ZIP.")
@@ -52,11 +149,55 @@ def excluir_arquivos_temporarios():
         os.remove(CSV_PATH)
         print(f"Arquivo {CSV_PATH} excluído com sucesso!")
 
-def excluir_arquivo_zip():
-    """Exclui o arquivo ZIP Anexos.zip se ocorrer um erro na extração."""
-    if os.path.exists(ZIP_PATH):
-        os.remove(ZIP_PATH)
-        print(f"Arquivo {ZIP_PATH} excluído com sucesso!")
+def excluir_arquivo_zip(zip_path=ZIP_PATH):
+    """Exclui o arquivo ZIP Anexos.zip quando ele está corrompido."""
+    if os.path.exists(zip_path):
+        os.remove(zip_path)
+        print(f"Arquivo {zip_path} excluído com sucesso!")
+
+def ler_pdf_do_zip(zip_path, nome_pdf=PDF_NAME):
+    """
+    Lê o PDF de dentro do arquivo ZIP para um buffer, sem extraí-lo para a pasta.
+    
+    O conteúdo fica em memória até LIMITE_PDF_EM_MEMORIA e, acima disso, em um arquivo
+    temporário anônimo, que some sozinho quando o buffer é fechado.
+    
+    Parâmetros:
+    - zip_path: Caminho do arquivo ZIP.
+    - nome_pdf: Nome do PDF dentro do ZIP.
+    
+    Retorna:
+    - Um buffer binário posicionado no início do PDF.
+    """
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zipf:
+            if nome_pdf not in zipf.namelist():
+                raise Exception(f"O arquivo {nome_pdf} não foi encontrado no arquivo ZIP.")
+            buffer = tempfile.SpooledTemporaryFile(max_size=LIMITE_PDF_EM_MEMORIA)
+            with zipf.open(nome_pdf) as membro:
+                shutil.copyfileobj(membro, buffer, 1024 * 1024)
+        buffer.seek(0)
+        return buffer
+    except Exception as e:
+        raise Exception(f"Erro ao ler o PDF do ZIP: {e}")
+
+@contextmanager
+def abrir_pdf(origem):
+    """
+    Abre o PDF com o pdfplumber a partir de um caminho ou de um membro de arquivo ZIP.
+    
+    Parâmetros:
+    - origem: Caminho do PDF ou uma tupla (caminho do ZIP, nome do PDF dentro do ZIP).
+    
+    Retorna:
+    - O objeto PDF do pdfplumber, dentro de um bloco with.
+    """
+    if isinstance(origem, tuple):
+        with ler_pdf_do_zip(*origem) as buffer, pdfplumber.open(buffer) as pdf:
+            yield pdf
+    else:
+        with pdfplumber.open(origem) as pdf:
+            yield pdf
 
 def substituir_abreviacoes(df):
     """
@@ -77,24 +218,615 @@ def substituir_abreviacoes(df):
         df.columns = df.columns.str.strip().str.replace(r"\n", " ", regex=True)
 
         # Renomeando as colunas como foi pedido
-        df = df.rename(columns={"OD": "Seg. Odontológica", "AMB": "Seg. Ambulatorial"})
+        df = df.rename(columns=ABREVIACOES)
 
         print("Abreviações substituídas com sucesso!")
         return df
     except Exception as e:
         raise Exception(f"Erro ao substituir abreviações: {e}")
 
-def extrair_tabela_pdf(pdf_path):
-    """Extrai tabelas do PDF."""
+def normalizar_tabela(tabela):
+    """
+    Normaliza as células de uma tabela para que a saída dos diferentes motores seja comparável.
+    
+    Células vazias (None ou NaN) viram string vazia, os demais valores viram texto e
+    quebras de linha no formato do Windows são convertidas para "\\n".
+    
+    Parâmetros:
+    - tabela: Lista de linhas extraídas por um dos motores.
+    
+    Retorna:
+    - A tabela normalizada, ou None se a página não tem tabela.
+    """
+    if not tabela:
+        return None
+    return [
+        ["" if celula is None or celula != celula else str(celula).replace("\r\n", "\n").replace("\r", "\n") for celula in linha]
+        for linha in tabela
+    ]
+
+def _tabelas_pdfplumber(pdf_path, paginas=None):
+    """Gera a tabela de cada página usando o pdfplumber."""
+    with abrir_pdf(pdf_path) as pdf:
+        indices = range(len(pdf.pages)) if paginas is None else paginas
+        for indice in indices:
+            page = pdf.pages[indice]
+            table = page.extract_table()
+            # Libera os objetos da página já processada para manter a memória constante
+            page.close()
+            yield table
+
+def detectar_modelo_tabela(page):
+    """
+    Detecta a tabela da página e guarda a sua grade como modelo para as páginas seguintes.
+    
+    Parâmetros:
+    - page: Página do pdfplumber.
+    
+    Retorna:
+    - Uma tupla (tabela extraída, modelo), em que o modelo é um dicionário com a caixa da
+      tabela ("bbox"), as posições das linhas verticais ("colunas") e a quantidade de colunas.
+      O modelo é None quando a página não tem tabela.
+    """
+    tabela = page.find_table()
+    if tabela is None:
+        return None, None
+    linhas = tabela.extract()
+    colunas = sorted({round(cell[0], 1) for cell in tabela.cells} | {round(cell[2], 1) for cell in tabela.cells})
+    modelo = {"bbox": tabela.bbox, "colunas": colunas, "num_colunas": max(len(linha) for linha in linhas)}
+    return linhas, modelo
+
+def _pagina_segue_modelo(page, modelo):
+    """Confere, de forma barata, se as linhas verticais da página batem com as do modelo."""
+    x0, _, x1, _ = modelo["bbox"]
+    verticais = {round(edge["x0"], 1) for edge in page.edges
+                 if edge["orientation"] == "v" and x0 - 1 <= edge["x0"] <= x1 + 1}
+    return verticais == set(modelo["colunas"])
+
+def _tabelas_pdfplumber_modelo(pdf_path, paginas=None):
+    """
+    Gera a tabela de cada página usando o pdfplumber com um modelo de layout.
+    
+    A grade de colunas detectada na primeira página com tabela é reaproveitada nas seguintes
+    como linhas verticais explícitas, evitando refazer a detecção completa em cada página.
+    A detecção só é refeita quando a página não passa na conferência com o modelo. Páginas
+    sem nenhuma linha desenhada são puladas, pois não podem conter tabela.
+    """
+    modelo = None
+    with abrir_pdf(pdf_path) as pdf:
+        indices = range(len(pdf.pages)) if paginas is None else paginas
+        for indice in indices:
+            page = pdf.pages[indice]
+            if not (page.lines or page.rects or page.curves):
+                table = None
+            elif modelo is not None and _pagina_segue_modelo(page, modelo):
+                x0, _, x1, _ = modelo["bbox"]
+                recorte = page.crop((max(x0 - 1, page.bbox[0]), page.bbox[1], min(x1 + 1, page.bbox[2]), page.bbox[3]))
+                table = recorte.extract_table({
+                    "vertical_strategy": "explicit",
+                    "explicit_vertical_lines": modelo["colunas"],
+                    "horizontal_strategy": "lines",
+                })
+                if not table or any(len(linha) != modelo["num_colunas"] for linha in table):
+                    table, modelo = detectar_modelo_tabela(page)
+            else:
+                table, novo_modelo = detectar_modelo_tabela(page)
+                modelo = novo_modelo or modelo
+            page.close()
+            yield table
+
+def _tabelas_pymupdf(pdf_path, paginas=None):
+    """Gera a tabela de cada página usando o find_tables do PyMuPDF."""
+    try:
+        import pymupdf
+    except ImportError:
+        try:
+            import fitz as pymupdf
+        except ImportError:
+            raise Exception("O motor pymupdf precisa do pacote PyMuPDF instalado.")
+
+    if isinstance(pdf_path, tuple):
+        with ler_pdf_do_zip(*pdf_path) as buffer:
+            documento = pymupdf.open(stream=buffer.read(), filetype="pdf")
+    else:
+        documento = pymupdf.open(pdf_path)
+    with documento:
+        indices = range(documento.page_count) if paginas is None else paginas
+        for indice in indices:
+            tabelas = documento[indice].find_tables().tables
+            if not tabelas:
+                yield None
+                continue
+            # Assim como o pdfplumber, fica com a maior tabela da página
+            maior = max(tabelas, key=lambda t: t.row_count * t.col_count)
+            yield maior.extract()
+
+def _tabelas_tabula(pdf_path, paginas=None):
+    """
+    Gera a tabela de cada página usando o tabula (requer Java).
+    
+    Todas as páginas pedidas são lidas numa única chamada ao tabula, que inicia o Java uma vez
+    só. Um PDF dentro de um ZIP é extraído uma única vez para um arquivo temporário.
+    """
+    try:
+        import tabula
+    except ImportError:
+        raise Exception("O motor tabula precisa do pacote tabula-py instalado.")
+
+    temporario = None
+    if isinstance(pdf_path, tuple):
+        with ler_pdf_do_zip(*pdf_path) as buffer, tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            shutil.copyfileobj(buffer, f, 1024 * 1024)
+        temporario = pdf_path = f.name
+    try:
+        paginas = list(range(contar_paginas(pdf_path))) if paginas is None else list(paginas)
+        if not paginas:
+            return
+        # No formato JSON cada tabela informa a página de onde veio
+        tabelas = tabula.read_pdf(pdf_path, pages=[indice + 1 for indice in paginas], lattice=True,
+                                  multiple_tables=True, output_format="json")
+    finally:
+        if temporario:
+            os.remove(temporario)
+
+    # Assim como o pdfplumber, fica com a maior tabela de cada página
+    maiores = {}
+    for tabela in tabelas:
+        linhas = [[celula.get("text", "") for celula in linha] for linha in tabela.get("data", [])]
+        if not linhas:
+            continue
+        indice = tabela["page_number"] - 1
+        tamanho = len(linhas) * max(len(linha) for linha in linhas)
+        if indice not in maiores or tamanho > maiores[indice][0]:
+            maiores[indice] = (tamanho, linhas)
+    for indice in paginas:
+        yield maiores[indice][1] if indice in maiores else None
+
+# Motores de extração disponíveis: cada um gera a tabela de cada página pedida (ou None)
+MOTORES = {
+    "pdfplumber": _tabelas_pdfplumber,
+    "pdfplumber_modelo": _tabelas_pdfplumber_modelo,
+    "pymupdf": _tabelas_pymupdf,
+    "tabula": _tabelas_tabula,
+}
+
+def gerar_tabelas_motor(pdf_path, motor="pdfplumber", paginas=None):
+    """
+    Gera a tabela normalizada de cada página usando o motor informado.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - motor: Nome do motor de extração (uma das chaves de MOTORES).
+    - paginas: Sequência com os índices das páginas; None para todas.
+    
+    Retorna:
+    - Um gerador com a tabela de cada página (None quando a página não tem tabela).
+    """
+    if motor not in MOTORES:
+        raise Exception(f"Motor de extração desconhecido: {motor}")
+    for table in MOTORES[motor](pdf_path, paginas):
+        yield normalizar_tabela(table)
+
+def contar_paginas(pdf_path):
+    """Retorna a quantidade de páginas do PDF."""
+    with abrir_pdf(pdf_path) as pdf:
+        return len(pdf.pages)
+
+def _extrair_tabelas_separadas(pdf_path, paginas, motor="pdfplumber"):
+    """
+    Extrai a tabela de cada uma das páginas informadas do PDF.
+    
+    Executada dentro de cada processo do pool: cada worker abre o PDF por conta própria,
+    já que os objetos dos motores de extração não podem ser compartilhados entre processos.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - paginas: Sequência com os índices das páginas a serem processadas.
+    - motor: Nome do motor de extração.
+    
+    Retorna:
+    - Lista com a tabela de cada página (None quando a página não tem tabela), na ordem recebida.
+    """
+    return list(gerar_tabelas_motor(pdf_path, motor, paginas))
+
+def _extrair_tabelas_paginas(pdf_path, paginas, motor="pdfplumber"):
+    """
+    Extrai as tabelas de um intervalo de páginas do PDF.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - paginas: Intervalo (range) com os índices das páginas a serem processadas.
+    - motor: Nome do motor de extração.
+    
+    Retorna:
+    - Lista com as linhas das tabelas encontradas, na ordem das páginas.
+    """
+    linhas = []
+    for table in _extrair_tabelas_separadas(pdf_path, paginas, motor):
+        if table:
+            linhas.extend(table)
+    return linhas
+
+def selecionar_motor(pdf_path, motores=None, amostra=AMOSTRA_PAGINAS):
+    """
+    Escolhe o motor de extração mais rápido entre os que concordam com os demais.
+    
+    Cada motor disponível extrai uma amostra de páginas espalhadas pelo documento. A saída
+    gerada pelo maior número de motores é tomada como referência (em caso de empate, vale a
+    do pdfplumber) e, entre os motores que a reproduzem, vence o mais rápido.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - motores: Nomes dos motores a comparar; None para todos de MOTORES.
+    - amostra: Quantidade de páginas usadas na comparação.
+    
+    Retorna:
+    - O nome do motor escolhido.
+    """
+    motores = list(MOTORES) if motores is None else list(motores)
+    total_paginas = contar_paginas(pdf_path)
+    passo = max(1, total_paginas // amostra) if amostra else 1
+    paginas = list(range(0, total_paginas, passo))[:amostra]
+
+    resultados = {}
+    for motor in motores:
+        inicio = time.perf_counter()
+        try:
+            tabelas = _extrair_tabelas_separadas(pdf_path, paginas, motor)
+        except Exception as e:
+            print(f"Motor {motor} indisponível: {e}")
+            continue
+        resultados[motor] = (time.perf_counter() - inicio, tabelas)
+        print(f"Motor {motor}: {resultados[motor][0]:.3f}s em {len(paginas)} páginas")
+
+    if not resultados:
+        raise Exception("Nenhum motor de extração disponível.")
+
+    def votos(motor):
+        return sum(1 for _, tabelas in resultados.values() if tabelas == resultados[motor][1])
+
+    referencia = max(resultados, key=lambda motor: (votos(motor), motor == "pdfplumber"))
+    concordantes = [motor for motor in resultados if resultados[motor][1] == resultados[referencia][1]]
+    escolhido = min(concordantes, key=lambda motor: resultados[motor][0])
+    print(f"Motor selecionado: {escolhido}")
+    return escolhido
+
+def dividir_paginas(total_paginas, num_workers):
+    """
+    Divide as páginas do PDF em intervalos contíguos para distribuir entre os workers.
+    
+    São gerados alguns intervalos por worker para equilibrar a carga, já que
+    algumas páginas demoram mais do que outras para serem processadas.
+    
+    Parâmetros:
+    - total_paginas: Quantidade de páginas do PDF.
+    - num_workers: Quantidade de processos do pool.
+    
+    Retorna:
+    - Lista de ranges com os índices das páginas, em ordem.
+    """
+    if total_paginas <= 0:
+        return []
+    tamanho = max(1, -(-total_paginas // (num_workers * 4)))
+    return [range(inicio, min(inicio + tamanho, total_paginas)) for inicio in range(0, total_paginas, tamanho)]
+
+def mapear_em_ordem(executor, funcao, tarefas, max_pendentes):
+    """
+    Executa a função no pool para cada tarefa e gera os resultados na ordem das tarefas.
+    
+    Diferente do executor.map, que submete todas as tarefas de uma vez, mantém no máximo
+    max_pendentes tarefas submetidas e ainda não consumidas: uma nova só é submetida quando o
+    resultado mais antigo é entregue, então os resultados prontos não se acumulam em memória.
+    
+    Parâmetros:
+    - executor: Pool de processos (ou de threads).
+    - funcao: Função executada em cada tarefa.
+    - tarefas: Iterável de tuplas com os argumentos de cada chamada.
+    - max_pendentes: Quantidade máxima de tarefas em andamento ao mesmo tempo.
+    
+    Retorna:
+    - Um gerador com o resultado de cada tarefa, na ordem recebida.
+    """
+    pendentes = deque()
+    for argumentos in tarefas:
+        if len(pendentes) >= max(1, max_pendentes):
+            yield pendentes.popleft().result()
+        pendentes.append(executor.submit(funcao, *argumentos))
+    while pendentes:
+        yield pendentes.popleft().result()
+
+def calcular_hash_pdf(origem):
+    """
+    Calcula o hash SHA-256 do conteúdo do PDF.
+    
+    Parâmetros:
+    - origem: Caminho do PDF ou uma tupla (caminho do ZIP, nome do PDF dentro do ZIP).
+    
+    Retorna:
+    - String hexadecimal com o hash do arquivo.
+    """
+    h = hashlib.sha256()
+    if isinstance(origem, tuple):
+        zip_path, nome_pdf = origem
+        with zipfile.ZipFile(zip_path, 'r') as zipf, zipf.open(nome_pdf) as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(bloco)
+    else:
+        with open(origem, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(bloco)
+    return h.hexdigest()
+
+def _resumir_objeto_pdf(objeto, resumos):
+    """
+    Calcula um hash estável de um objeto do PDF, resolvendo as referências e incluindo os
+    dados dos streams.
+    
+    Parâmetros:
+    - objeto: Objeto do pdfminer (dicionário, lista, stream, referência ou valor simples).
+    - resumos: Dicionário id do objeto indireto -> hash, compartilhado entre as páginas do PDF.
+    
+    Retorna:
+    - O hash do objeto, em bytes.
+    """
+    if isinstance(objeto, PDFObjRef):
+        if objeto.objid not in resumos:
+            # Marca o objeto antes de resolvê-lo, para não entrar em ciclo (como /Parent)
+            resumos[objeto.objid] = f"ref:{objeto.objid}".encode()
+            resumos[objeto.objid] = _resumir_objeto_pdf(objeto.resolve(), resumos)
+        return resumos[objeto.objid]
+
+    h = hashlib.sha256()
+    if isinstance(objeto, PDFStream):
+        h.update(b"stream")
+        h.update(_resumir_objeto_pdf(objeto.attrs, resumos))
+        h.update(objeto.get_data())
+    elif isinstance(objeto, dict):
+        h.update(b"dict")
+        for chave in sorted(objeto, key=str):
+            h.update(str(chave).encode())
+            h.update(_resumir_objeto_pdf(objeto[chave], resumos))
+    elif isinstance(objeto, (list, tuple)):
+        h.update(b"list")
+        for item in objeto:
+            h.update(_resumir_objeto_pdf(item, resumos))
+    elif isinstance(objeto, (PSLiteral, PSKeyword)):
+        h.update(b"nome")
+        h.update(str(objeto.name).encode())
+    else:
+        h.update(repr(objeto).encode())
+    return h.digest()
+
+class CachePaginas:
+    """
+    Cache em disco das tabelas extraídas de cada página do PDF.
+    
+    Cada página é guardada em um arquivo JSON nomeado pelo hash do seu conteúdo, então uma
+    nova versão do PDF só tem reprocessadas as páginas que mudaram. A lista de páginas de cada
+    PDF também é guardada, pelo hash do arquivo, para que um PDF inalterado seja carregado sem
+    nem ser aberto. Quando o cache passa de limite_bytes, os arquivos usados há mais tempo são
+    removidos (LRU).
+    
+    Parâmetros:
+    - cache_dir: Pasta onde os arquivos do cache são guardados.
+    - limite_bytes: Tamanho máximo do cache em disco.
+    - contexto: Texto incluído em todas as chaves; deve mudar sempre que a forma de extração mudar.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, limite_bytes=LIMITE_CACHE_BYTES, contexto="v1"):
+        self.cache_dir = cache_dir
+        self.limite_bytes = limite_bytes
+        self.contexto = contexto
+        self.acertos = 0
+        self.falhas = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _caminho(self, chave):
+        return os.path.join(self.cache_dir, f"{chave}.json")
+
+    def _ler(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                valor = json.load(f)
+            # Atualiza a data de acesso usada na remoção LRU
+            os.utime(caminho)
+            return valor
+        except (OSError, ValueError):
+            return None
+
+    def _gravar(self, chave, valor):
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(valor, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    def contem(self, chave):
+        """Indica se a chave está no cache."""
+        return os.path.exists(self._caminho(chave))
+
+    def chave_pdf(self, hash_pdf, motor="pdfplumber"):
+        """Monta a chave do índice de páginas de um PDF a partir do hash do arquivo."""
+        return "pdf-" + hashlib.sha256(f"{self.contexto}:{motor}:{hash_pdf}".encode()).hexdigest()
+
+    def chave_pagina(self, page, motor="pdfplumber", resumos=None):
+        """
+        Monta a chave de uma página a partir do seu conteúdo bruto, sem analisar o layout.
+        
+        Além do fluxo de conteúdo, entram na chave os recursos da página (fontes e XObjects,
+        com o conteúdo dos seus streams), já que um texto dentro de um XObject pode mudar sem
+        que o fluxo de conteúdo da página mude. resumos guarda o resumo de cada objeto
+        indireto já visto, para que recursos compartilhados entre as páginas do mesmo PDF
+        (como as fontes) sejam lidos uma vez só.
+        """
+        resumos = {} if resumos is None else resumos
+        h = hashlib.sha256(f"{self.contexto}:{motor}:{page.bbox}".encode())
+        for stream in page.page_obj.contents:
+            h.update(resolve1(stream).get_data())
+        h.update(_resumir_objeto_pdf(page.page_obj.resources, resumos))
+        return "pagina-" + h.hexdigest()
+
+    def obter_indice(self, chave_pdf):
+        """Retorna a lista de chaves das páginas do PDF, ou None se o PDF não está no cache."""
+        valor = self._ler(chave_pdf)
+        return None if valor is None else valor["paginas"]
+
+    def salvar_indice(self, chave_pdf, chaves_paginas):
+        """Guarda a lista de chaves das páginas do PDF."""
+        self._gravar(chave_pdf, {"paginas": chaves_paginas})
+
+    def obter_pagina(self, chave):
+        """Retorna a tabela guardada para a página, ou lança KeyError se ela não está no cache."""
+        valor = self._ler(chave)
+        if valor is None:
+            raise KeyError(chave)
+        return valor["tabela"]
+
+    def salvar_pagina(self, chave, tabela):
+        """Guarda a tabela extraída de uma página."""
+        self._gravar(chave, {"tabela": tabela})
+
+    def limitar_tamanho(self):
+        """Remove os arquivos usados há mais tempo até o cache caber em limite_bytes."""
+        arquivos = []
+        for entrada in os.scandir(self.cache_dir):
+            if entrada.is_file() and entrada.name.endswith(".json"):
+                info = entrada.stat()
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        removidos = 0
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.limite_bytes:
+                break
+            os.remove(caminho)
+            total -= tamanho
+            removidos += 1
+        return removidos
+
+    def relatorio(self):
+        """Retorna a quantidade de acertos e falhas e a taxa de acerto do cache."""
+        consultas = self.acertos + self.falhas
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+        }
+
+def gerar_tabelas_com_cache(pdf_path, cache, num_workers=1, motor="pdfplumber"):
+    """
+    Gera as tabelas de cada página do PDF, extraindo apenas as páginas que não estão no cache.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - cache: Instância de CachePaginas.
+    - num_workers: Quantidade de processos usados na extração das páginas alteradas.
+    - motor: Nome do motor de extração.
+    
+    Retorna:
+    - Um gerador com a tabela de cada página que possui tabela, na ordem das páginas.
+    """
+    chave_pdf = cache.chave_pdf(calcular_hash_pdf(pdf_path), motor)
+    chaves = cache.obter_indice(chave_pdf)
+    faltantes = []
+
+    if chaves is None or not all(cache.contem(chave) for chave in chaves):
+        resumos = {}
+        with abrir_pdf(pdf_path) as pdf:
+            chaves = [cache.chave_pagina(page, motor, resumos) for page in pdf.pages]
+        faltantes = [i for i, chave in enumerate(chaves) if not cache.contem(chave)]
+
+        if num_workers > 1 and len(faltantes) > 1:
+            tamanho = max(1, -(-len(faltantes) // (num_workers * 4)))
+            blocos = [faltantes[i:i + tamanho] for i in range(0, len(faltantes), tamanho)]
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                tarefas = [(pdf_path, bloco, motor) for bloco in blocos]
+                resultados = mapear_em_ordem(executor, _extrair_tabelas_separadas, tarefas, num_workers * MAX_PENDENTES_POR_WORKER)
+                for bloco, tabelas in zip(blocos, resultados):
+                    for indice, table in zip(bloco, tabelas):
+                        cache.salvar_pagina(chaves[indice], table)
+        elif faltantes:
+            for indice, table in zip(faltantes, gerar_tabelas_motor(pdf_path, motor, faltantes)):
+                cache.salvar_pagina(chaves[indice], table)
+        cache.salvar_indice(chave_pdf, chaves)
+
+    cache.acertos += len(chaves) - len(faltantes)
+    cache.falhas += len(faltantes)
+
+    # Páginas extraídas agora já foram gravadas no cache, então todas são lidas dele
+    for chave in chaves:
+        table = cache.obter_pagina(chave)
+        if table:
+            yield table
+
+    relatorio = cache.relatorio()
+    print(f"Cache de páginas: {relatorio['acertos']} acertos, {relatorio['falhas']} falhas.")
+    cache.limitar_tamanho()
+
+def gerar_tabelas_paralelo(pdf_path, num_workers, motor="pdfplumber"):
+    """
+    Extrai as tabelas do PDF distribuindo as páginas em um pool de processos.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - num_workers: Quantidade de processos do pool.
+    - motor: Nome do motor de extração.
+    
+    Retorna:
+    - Um gerador com as linhas de cada intervalo de páginas, na ordem das páginas.
+    """
+    intervalos = dividir_paginas(contar_paginas(pdf_path), num_workers)
+    tarefas = ((pdf_path, intervalo, motor) for intervalo in intervalos)
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        # Os resultados saem na ordem dos intervalos, mantendo a ordem das páginas, e só alguns
+        # intervalos por worker ficam em andamento, para a memória não crescer com o tamanho do PDF
+        yield from mapear_em_ordem(executor, _extrair_tabelas_paginas, tarefas, num_workers * MAX_PENDENTES_POR_WORKER)
+
+def gerar_tabelas_pdf(pdf_path, num_workers=1, cache=None, motor="pdfplumber"):
+    """
+    Gera as linhas das tabelas do PDF em blocos, na ordem das páginas.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - num_workers: Quantidade de processos usados na extração (1 = serial).
+    - cache: Instância opcional de CachePaginas; quando informada, só as páginas que
+      não estão no cache são extraídas.
+    - motor: Nome do motor de extração, ou "auto" para escolher com selecionar_motor.
+    
+    Retorna:
+    - Um gerador de listas de linhas (uma página ou um intervalo de páginas por vez).
+    """
+    if motor == "auto":
+        motor = selecionar_motor(pdf_path)
+
+    if cache is not None:
+        yield from gerar_tabelas_com_cache(pdf_path, cache, num_workers, motor)
+    elif num_workers > 1:
+        yield from gerar_tabelas_paralelo(pdf_path, num_workers, motor)
+    else:
+        for table in gerar_tabelas_motor(pdf_path, motor):
+            if table:
+                yield table
+
+def extrair_tabela_pdf(pdf_path, num_workers=1, cache=None, motor="pdfplumber"):
+    """
+    Extrai tabelas do PDF.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - num_workers: Quantidade de processos usados na extração. Com 1 (padrão), as páginas
+      são processadas em sequência; com mais de 1, são divididas entre um pool de processos.
+    - cache: Instância opcional de CachePaginas, para reaproveitar páginas já extraídas.
+    - motor: Nome do motor de extração (veja MOTORES), ou "auto".
+    
+    Retorna:
+    - Um DataFrame com os dados da tabela.
+    """
     try:
         print("Extraindo dados do PDF...")
         tabelas = []
-        with pdfplumber.open(pdf_path) as pdf:
-            
-            for page in pdf.pages:  
-                table = page.extract_table()
-                if table:
-                    tabelas.extend(table)
+        for linhas in gerar_tabelas_pdf(pdf_path, num_workers, cache, motor):
+            tabelas.extend(linhas)
         
         if not tabelas:
             return pd.DataFrame()  
@@ -105,6 +837,9 @@ def extrair_tabela_pdf(pdf_path):
         if len(df) > 0:
             df.columns = df.iloc[0]  # Define a primeira linha como cabeçalho
             df = df[1:].reset_index(drop=True)  # Remove a primeira linha
+        
+        # Remover cabeçalhos repetidos, limpar as células e compactar os tipos
+        df = pos_processar_tabela(df)
             
         # Substituir as abreviações nas colunas
         df = substituir_abreviacoes(df)
@@ -114,6 +849,56 @@ def extrair_tabela_pdf(pdf_path):
     except Exception as e:
         raise Exception(f"Erro ao extrair dados do PDF: {e}")
 
+def normalizar_celula(celula):
+    """Troca sequências de espaços e quebras de linha da célula por um único espaço e apara as pontas."""
+    if celula is None:
+        return None
+    return ESPACOS.sub(" ", celula).strip(" ")
+
+def medir_memoria(df):
+    """Retorna a memória ocupada pelo DataFrame, em bytes, incluindo o conteúdo dos textos."""
+    return int(df.memory_usage(deep=True).sum())
+
+def baixa_cardinalidade(distintos, total):
+    """Indica se uma coluna com essa quantidade de valores distintos deve ser guardada como categoria (ou dicionário)."""
+    return total > 0 and distintos <= total * LIMITE_CARDINALIDADE
+
+def pos_processar_tabela(df):
+    """
+    Faz a limpeza da tabela extraída com operações vetorizadas.
+    
+    - Remove as linhas iguais ao cabeçalho, repetido no topo de cada página do PDF.
+    - Troca espaços e quebras de linha repetidos dentro das células por um único espaço.
+    - Converte as colunas com poucos valores distintos (como OD, AMB, RN e subgrupos)
+      para o tipo category.
+    
+    Parâmetros:
+    - df: DataFrame cujas colunas ainda são o cabeçalho original do PDF.
+    
+    Retorna:
+    - O DataFrame processado.
+    """
+    try:
+        memoria_antes = medir_memoria(df)
+
+        cabecalho = np.asarray(list(df.columns), dtype=object)
+        repetidos = (df.to_numpy(dtype=object) == cabecalho).all(axis=1)
+        df = df.loc[~repetidos].reset_index(drop=True)
+
+        df = df.replace(ESPACOS.pattern, " ", regex=True).replace(r"^ | $", "", regex=True)
+
+        for posicao in range(df.shape[1]):
+            coluna = df.iloc[:, posicao]
+            if baixa_cardinalidade(coluna.nunique(dropna=False), len(df)):
+                df.isetitem(posicao, coluna.astype("category"))
+
+        memoria_depois = medir_memoria(df)
+        print(f"Linhas de cabeçalho repetidas removidas: {int(repetidos.sum())}")
+        print(f"Memória do DataFrame: {memoria_antes / 1024 ** 2:.2f} MB -> {memoria_depois / 1024 ** 2:.2f} MB")
+        return df
+    except Exception as e:
+        raise Exception(f"Erro no pós-processamento da tabela: {e}")
+
 def salvar_csv(df, csv_path):
     """Salva os dados extraídos em um arquivo CSV."""
     try:
@@ -123,8 +908,287 @@ def salvar_csv(df, csv_path):
     except Exception as e:
         raise Exception(f"Erro ao salvar CSV: {e}")
 
-def compactar_csv(csv_path, zip_path):
-    """Compacta o arquivo CSV em um arquivo ZIP."""
+def normalizar_cabecalho(cabecalho):
+    """
+    Aplica ao cabeçalho da tabela a mesma normalização de substituir_abreviacoes,
+    sem precisar de um DataFrame.
+    
+    Parâmetros:
+    - cabecalho: Lista com os nomes das colunas extraídos do PDF.
+    
+    Retorna:
+    - Lista com os nomes das colunas limpos e com as abreviações substituídas.
+    """
+    colunas = []
+    for nome in cabecalho:
+        nome = "" if nome is None else nome.strip().replace("\n", " ")
+        colunas.append(ABREVIACOES.get(nome, nome))
+    return colunas
+
+def gerar_linhas_pdf(pdf_path, num_workers=1, cache=None, motor="pdfplumber"):
+    """
+    Gera as linhas da tabela do PDF página a página, sem acumular o documento em memória.
+    
+    A primeira linha gerada é o cabeçalho já normalizado; as demais são os dados, com as
+    mesmas regras de pos_processar_tabela (cabeçalhos repetidos removidos e células limpas)
+    e na mesma ordem da extração feita por extrair_tabela_pdf.
+    
+    Parâmetros:
+    - pdf_path: Caminho do arquivo PDF (ou tupla com o ZIP e o nome do PDF).
+    - num_workers: Quantidade de processos usados na extração (1 = serial).
+    - cache: Instância opcional de CachePaginas, para reaproveitar páginas já extraídas.
+    - motor: Nome do motor de extração (veja MOTORES), ou "auto".
+    
+    Retorna:
+    - Um gerador de listas, uma por linha da tabela.
+    """
+    yield from transformar_linhas(gerar_tabelas_pdf(pdf_path, num_workers, cache, motor))
+
+def transformar_linhas(blocos):
+    """
+    Aplica às linhas brutas extraídas do PDF a normalização de cabeçalho e de células.
+    
+    Parâmetros:
+    - blocos: Iterável de listas de linhas brutas, como o gerado por gerar_tabelas_pdf.
+    
+    Retorna:
+    - Um gerador com o cabeçalho normalizado seguido das linhas de dados limpas.
+    """
+    cabecalho = None
+    for linhas in blocos:
+        for linha in linhas:
+            if cabecalho is None:
+                cabecalho = linha
+                yield normalizar_cabecalho(linha)
+            elif linha != cabecalho:
+                yield [normalizar_celula(celula) for celula in linha]
+
+def salvar_csv_streaming(linhas, csv_path):
+    """
+    Grava no CSV as linhas recebidas à medida que chegam, no mesmo formato de salvar_csv.
+    
+    Parâmetros:
+    - linhas: Iterável de linhas (a primeira é o cabeçalho), como o gerado por gerar_linhas_pdf.
+    - csv_path: Caminho do arquivo CSV a ser criado.
+    
+    Retorna:
+    - A quantidade de linhas de dados gravadas.
+    """
+    try:
+        print(f"Salvando dados em CSV em {csv_path} (streaming)...")
+        with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+            total = escrever_linhas_csv(linhas, f)
+        print(f"CSV salvo com sucesso! {total} linhas gravadas.")
+        return total
+    except Exception as e:
+        raise Exception(f"Erro ao salvar CSV: {e}")
+
+def escrever_linhas_csv(linhas, arquivo):
+    """
+    Escreve as linhas em um arquivo texto já aberto, com o mesmo dialeto usado pelo pandas.
+    
+    Parâmetros:
+    - linhas: Iterável de linhas (a primeira é o cabeçalho).
+    - arquivo: Arquivo texto aberto para escrita.
+    
+    Retorna:
+    - A quantidade de linhas de dados escritas (sem contar o cabeçalho).
+    """
+    writer = csv.writer(arquivo, lineterminator=os.linesep)
+    total = -1
+    for linha in linhas:
+        writer.writerow(linha)
+        total += 1
+    return max(total, 0)
+
+def salvar_csv_no_zip(linhas, zip_path, nome_csv, codec="deflate", nivel=None):
+    """
+    Grava as linhas como CSV direto dentro do arquivo ZIP, à medida que chegam.
+    
+    O conteúdo é comprimido enquanto é escrito, sem gerar o CSV no disco.
+    
+    Parâmetros:
+    - linhas: Iterável de linhas (a primeira é o cabeçalho), como o gerado por gerar_linhas_pdf.
+    - zip_path: Caminho do arquivo ZIP a ser criado.
+    - nome_csv: Nome do arquivo CSV dentro do ZIP.
+    - codec: Codec de compressão (veja web_scraping_py.CODECS_ZIP).
+    - nivel: Nível de compressão; None usa o padrão do codec.
+    
+    Retorna:
+    - A quantidade de linhas de dados gravadas.
+    """
+    try:
+        print(f"Gravando {nome_csv} direto em {zip_path}...")
+        codecs = _importar_web_scraping().CODECS_ZIP
+        if codec not in codecs:
+            raise Exception(f"Codec de compactação não suportado: {codec}")
+        with zipfile.ZipFile(zip_path, 'w', codecs[codec], compresslevel=nivel) as zipf:
+            with zipf.open(nome_csv, 'w', force_zip64=True) as membro:
+                with io.TextIOWrapper(membro, encoding='utf-8-sig', newline='') as f:
+                    total = escrever_linhas_csv(linhas, f)
+        print(f"Arquivo ZIP criado: {zip_path} ({total} linhas)")
+        return total
+    except Exception as e:
+        raise Exception(f"Erro ao gravar CSV no ZIP: {e}")
+
+def _importar_pyarrow():
+    """Importa o pyarrow, que só é necessário para os formatos colunares."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise Exception("Os formatos Parquet e Arrow precisam do pacote pyarrow instalado.")
+
+def _abrir_escritor_colunar(pa, caminho, schema, formato, codec):
+    """Abre o escritor do formato pedido, validando o codec."""
+    if formato == "parquet":
+        return pa.parquet.ParquetWriter(caminho, schema, compression=codec, use_dictionary=True)
+    if formato == "arrow":
+        if codec not in ("zstd", "lz4", None):
+            raise Exception(f"O formato Arrow aceita apenas os codecs zstd e lz4, não {codec}.")
+        # Os dicionários crescem a cada lote gravado em streaming; o formato de arquivo do
+        # Arrow só aceita essa mudança como delta do dicionário anterior
+        opcoes = pa.ipc.IpcWriteOptions(compression=codec, emit_dictionary_deltas=True)
+        return pa.ipc.new_file(caminho, schema, options=opcoes)
+    raise Exception(f"Formato colunar desconhecido: {formato}")
+
+def salvar_colunar(df, caminho, formato="parquet", codec=CODEC_COLUNAR):
+    """
+    Salva o DataFrame em formato colunar (Parquet ou Arrow IPC), mantendo os tipos das colunas.
+    
+    Colunas do tipo category são gravadas com codificação de dicionário.
+    
+    Parâmetros:
+    - df: DataFrame com os dados extraídos.
+    - caminho: Caminho do arquivo a ser criado.
+    - formato: "parquet" ou "arrow".
+    - codec: Codec de compressão (snappy ou zstd no Parquet; zstd ou lz4 no Arrow).
+    """
+    try:
+        print(f"Salvando dados em {formato} em {caminho}...")
+        pa = _importar_pyarrow()
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        with _abrir_escritor_colunar(pa, caminho, tabela.schema, formato, codec) as escritor:
+            escritor.write_table(tabela)
+        print(f"Arquivo {formato} salvo com sucesso!")
+    except Exception as e:
+        raise Exception(f"Erro ao salvar {formato}: {e}")
+
+def espelhar_colunar(linhas, caminho, formato="parquet", codec=CODEC_COLUNAR, linhas_por_grupo=LINHAS_POR_GRUPO):
+    """
+    Repassa as linhas adiante e, ao mesmo tempo, grava-as em grupos no arquivo colunar.
+    
+    Permite gravar o Parquet/Arrow na mesma passada que grava o CSV, em streaming: só um
+    grupo de linhas fica em memória por vez. As colunas com poucos valores distintos no
+    primeiro grupo (as mesmas que pos_processar_tabela converte para category) são gravadas
+    com codificação de dicionário; as demais, como texto.
+    
+    Parâmetros:
+    - linhas: Iterável de linhas (a primeira é o cabeçalho), como o gerado por gerar_linhas_pdf.
+    - caminho: Caminho do arquivo a ser criado.
+    - formato: "parquet" ou "arrow".
+    - codec: Codec de compressão.
+    - linhas_por_grupo: Quantidade de linhas por grupo (row group no Parquet, lote no Arrow).
+    
+    Retorna:
+    - Um gerador com as mesmas linhas recebidas.
+    """
+    pa = _importar_pyarrow()
+    linhas = iter(linhas)
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        return
+    yield cabecalho
+
+    escritor = None
+    schema = None
+    # Valor -> código de cada coluna com dicionário; o dicionário de um lote sempre estende o
+    # do lote anterior, mantendo os códigos já gravados
+    dicionarios = {}
+
+    def converter(posicao, coluna, tipo):
+        if posicao not in dicionarios:
+            return pa.array(coluna, type=tipo)
+        codigos = dicionarios[posicao]
+        indices = [None if valor is None else codigos.setdefault(valor, len(codigos)) for valor in coluna]
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()), pa.array(list(codigos), type=pa.string()))
+
+    def escrever(lote):
+        nonlocal escritor, schema
+        if escritor is None:
+            # Os tipos são decididos pelo primeiro grupo de linhas, com a mesma regra de
+            # pos_processar_tabela: colunas com poucos valores distintos viram dicionário
+            tipos = []
+            for posicao, coluna in enumerate(zip(*lote) if lote else [()] * len(cabecalho)):
+                if baixa_cardinalidade(len(set(coluna)), len(lote)):
+                    dicionarios[posicao] = {}
+                    tipos.append(pa.dictionary(pa.int32(), pa.string()))
+                else:
+                    tipos.append(pa.string())
+            schema = pa.schema(list(zip(cabecalho, tipos)))
+            escritor = _abrir_escritor_colunar(pa, caminho, schema, formato, codec)
+        if lote:
+            colunas = [converter(posicao, coluna, campo.type) for posicao, (coluna, campo) in enumerate(zip(zip(*lote), schema))]
+            escritor.write_batch(pa.RecordBatch.from_arrays(colunas, schema=schema))
+
+    try:
+        lote = []
+        for linha in linhas:
+            lote.append(linha)
+            yield linha
+            if len(lote) >= linhas_por_grupo:
+                escrever(lote)
+                lote = []
+        if lote or escritor is None:
+            escrever(lote)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    print(f"Arquivo {formato} salvo em {caminho}")
+
+def salvar_colunar_streaming(linhas, caminho, formato="parquet", codec=CODEC_COLUNAR, linhas_por_grupo=LINHAS_POR_GRUPO):
+    """
+    Grava as linhas em formato colunar à medida que chegam, em grupos de linhas_por_grupo.
+    
+    Parâmetros:
+    - linhas: Iterável de linhas (a primeira é o cabeçalho).
+    - caminho: Caminho do arquivo a ser criado.
+    - formato: "parquet" ou "arrow".
+    - codec: Codec de compressão.
+    - linhas_por_grupo: Quantidade de linhas por grupo.
+    
+    Retorna:
+    - A quantidade de linhas de dados gravadas.
+    """
+    try:
+        total = -1
+        for _ in espelhar_colunar(linhas, caminho, formato, codec, linhas_por_grupo):
+            total += 1
+        return max(total, 0)
+    except Exception as e:
+        raise Exception(f"Erro ao salvar {formato}: {e}")
+
+def carregar_colunar(caminho):
+    """
+    Carrega um arquivo Parquet ou Arrow gerado pelo pipeline usando memória mapeada.
+    
+    No Arrow IPC a leitura não copia os dados: as colunas apontam direto para o arquivo mapeado.
+    
+    Parâmetros:
+    - caminho: Caminho do arquivo (.parquet ou .arrow).
+    
+    Retorna:
+    - Uma pyarrow.Table com os dados (use .to_pandas() para obter um DataFrame).
+    """
+    pa = _importar_pyarrow()
+    if caminho.endswith(".parquet"):
+        return pa.parquet.read_table(caminho, memory_map=True)
+    with pa.memory_map(caminho, 'r') as origem:
+        return pa.ipc.open_file(origem).read_all()
+
+def compactar_csv(csv_path, zip_path, codec="deflate", nivel=None):
+    """Compacta o arquivo CSV em um arquivo ZIP, com o codec e o nível de compressão informados."""
     try:
         print(f"Compactando o CSV em {zip_path}...")
         
@@ -132,44 +1196,243 @@ def compactar_csv(csv_path, zip_path):
         if not os.path.exists(csv_path):
             raise Exception(f"Arquivo CSV não encontrado: {csv_path}")
         
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(csv_path, os.path.basename(csv_path))
-        print(f"Arquivo ZIP criado: {zip_path}")
+        _importar_web_scraping().compactar_arquivos([csv_path], zip_path, codec, nivel)
     except Exception as e:
         raise Exception(f"Erro ao compactar CSV: {e}")
 
-def main():
-    """Função principal que executa todas as etapas do processo."""
+def _assinatura_arquivo(caminho):
+    """Retorna tamanho e data de modificação do arquivo, usados para detectar se ele mudou."""
+    info = os.stat(caminho)
+    return [info.st_size, info.st_mtime_ns]
+
+def carregar_estado(checkpoint_dir):
+    """Carrega o estado das etapas já concluídas, ou um estado vazio se não houver checkpoint."""
     try:
-        # Se o arquivo ZIP não existir, executar o scraping novamente
-        if not os.path.exists(ZIP_PATH):
-            executar_web_scraping()
-        
-        # Extração do PDF do ZIP
-        extrair_pdf_do_zip(ZIP_PATH, PDF_PATH)
-        
-        # Extração de dados do PDF
-        df = extrair_tabela_pdf(PDF_PATH)
-        
-        # Excluir arquivos temporários (Anexo_I.pdf e CSV gerado)
+        with open(os.path.join(checkpoint_dir, "estado.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def salvar_estado(checkpoint_dir, estado):
+    """Grava o estado das etapas de forma atômica."""
+    caminho = os.path.join(checkpoint_dir, "estado.json")
+    with open(f"{caminho}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2)
+    os.replace(f"{caminho}.tmp", caminho)
+
+def executar_pipeline(etapas, checkpoint_dir=CHECKPOINT_DIR, max_tentativas=MAX_TENTATIVAS, espera_inicial=ESPERA_INICIAL,
+                      sempre_executar=()):
+    """
+    Executa as etapas em sequência, no próprio processo, com checkpoints e novas tentativas.
+    
+    Cada etapa recebe o arquivo gerado pela anterior e retorna o caminho do arquivo que gerou.
+    Ao concluir, a etapa é registrada no checkpoint junto com a assinatura do arquivo de entrada
+    e os seus parâmetros; numa nova execução, as etapas já concluídas cuja entrada e parâmetros
+    não mudaram são puladas, de modo que uma falha é retomada a partir da última etapa
+    bem-sucedida e uma entrada que não mudou não é processada de novo. Uma etapa que falha é
+    repetida até max_tentativas vezes, com espera exponencial entre as tentativas.
+    
+    Parâmetros:
+    - etapas: Lista de tuplas (nome, função) ou (nome, função, parâmetros), em que os parâmetros
+      são um valor serializável em JSON que também decide se a etapa pode ser pulada.
+    - checkpoint_dir: Pasta onde o estado das etapas é guardado.
+    - max_tentativas: Quantidade máxima de tentativas de cada etapa.
+    - espera_inicial: Espera, em segundos, antes da segunda tentativa (dobra a cada falha).
+    - sempre_executar: Nomes das etapas executadas mesmo com checkpoint, como o download, que
+      precisa consultar o servidor para saber se algo mudou.
+    
+    Retorna:
+    - Um dicionário com o tempo, em segundos, de cada etapa executada, somando as tentativas que
+      falharam e as esperas entre elas.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    estado = carregar_estado(checkpoint_dir)
+    tempos = {}
+    entrada = None
+
+    for nome, funcao, *parametros in etapas:
+        parametros = parametros[0] if parametros else None
+        assinatura = _assinatura_arquivo(entrada) if entrada else None
+        registro = estado.get(nome)
+        if (nome not in sempre_executar and registro and registro["entrada"] == assinatura
+                and registro.get("parametros") == parametros and os.path.exists(registro["artefato"])):
+            print(f"Etapa {nome}: retomada do checkpoint ({registro['artefato']}).")
+            entrada = registro["artefato"]
+            continue
+
+        inicio = time.perf_counter()
+        for tentativa in range(1, max_tentativas + 1):
+            try:
+                artefato = funcao(entrada)
+                break
+            except Exception as e:
+                print(f"Etapa {nome} falhou (tentativa {tentativa}/{max_tentativas}): {e}")
+                if tentativa == max_tentativas:
+                    raise Exception(f"Etapa {nome} falhou após {max_tentativas} tentativas: {e}")
+                time.sleep(espera_inicial * 2 ** (tentativa - 1))
+
+        tempos[nome] = time.perf_counter() - inicio
+        print(f"Etapa {nome} concluída em {tempos[nome]:.2f}s ({tentativa} tentativa{'s' if tentativa > 1 else ''}).")
+        estado[nome] = {"artefato": artefato, "entrada": assinatura, "parametros": parametros, "duracao": tempos[nome],
+                        "tentativas": tentativa}
+        salvar_estado(checkpoint_dir, estado)
+        entrada = artefato
+
+    return tempos
+
+def _ler_jsonl(caminho):
+    """Gera as linhas gravadas em um arquivo JSON Lines."""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            yield json.loads(linha)
+
+def _gravar_jsonl(linhas, caminho):
+    """Grava as linhas em um arquivo JSON Lines de forma atômica."""
+    with open(f"{caminho}.tmp", 'w', encoding='utf-8') as f:
+        for linha in linhas:
+            f.write(json.dumps(linha, ensure_ascii=False))
+            f.write("\n")
+    os.replace(f"{caminho}.tmp", caminho)
+    return caminho
+
+def _zip_integro(zip_path):
+    """Indica se o Anexos.zip existe, pode ser lido e contém o Anexo_I.pdf."""
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zipf:
+            return PDF_NAME in zipf.namelist() and zipf.testzip() is None
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+def etapa_download(_entrada, zip_path=ZIP_PATH):
+    """
+    Etapa de download: atualiza o Anexos.zip com o web scraping e garante que ele está íntegro.
+    
+    Roda em toda execução, com requisições condicionais: se nenhum anexo mudou, o Anexos.zip
+    fica como está e, como a entrada da etapa seguinte não muda, o processamento é pulado pelo
+    checkpoint. Se o web scraping falha (sem acesso ao site, por exemplo), o Anexos.zip
+    anterior é usado, desde que esteja íntegro.
+    """
+    if os.path.exists(zip_path) and not _zip_integro(zip_path):
+        print(f"Arquivo {zip_path} corrompido, baixando novamente...")
+        excluir_arquivo_zip(zip_path)
+
+    try:
+        executar_web_scraping(zip_path)
+    except Exception as e:
+        if not os.path.exists(zip_path):
+            raise
+        print(f"{e}. Usando o arquivo {zip_path} baixado anteriormente.")
+
+    if not _zip_integro(zip_path):
+        raise Exception(f"O arquivo {PDF_NAME} não foi encontrado no arquivo ZIP.")
+    return zip_path
+
+def etapa_processamento(zip_path, zip_csv_path=ZIP_CSV_PATH, num_workers=1, cache=None, motor="pdfplumber",
+                        formatos=(), codec=CODEC_COLUNAR, direto_zip=True, streaming=True):
+    """
+    Etapa de processamento: extrai a tabela do PDF e grava o CSV compactado em uma só passada.
+    
+    - direto_zip: o PDF é lido direto do ZIP e o CSV gravado direto no ZIP de saída, sem
+      arquivos temporários.
+    - streaming (sem direto_zip): o PDF é extraído para a pasta web_scraping e as linhas vão
+      para o CSV à medida que as páginas são lidas; o CSV é compactado em seguida.
+    - Sem nenhum dos dois: a tabela é montada num DataFrame (com os tipos category de
+      pos_processar_tabela) e gravada com salvar_csv.
+    
+    Os formatos colunares pedidos são gravados na mesma passada.
+    """
+    if direto_zip:
+        linhas = gerar_linhas_pdf((zip_path, PDF_NAME), num_workers, cache, motor)
+        for formato in formatos:
+            linhas = espelhar_colunar(linhas, CAMINHOS_COLUNARES[formato], formato, codec)
+        salvar_csv_no_zip(linhas, zip_csv_path, os.path.basename(CSV_PATH))
+        return zip_csv_path
+
+    try:
+        extrair_pdf_do_zip(zip_path, PDF_PATH)
+        if streaming:
+            linhas = gerar_linhas_pdf(PDF_PATH, num_workers, cache, motor)
+            for formato in formatos:
+                linhas = espelhar_colunar(linhas, CAMINHOS_COLUNARES[formato], formato, codec)
+            salvar_csv_streaming(linhas, CSV_PATH)
+        else:
+            df = extrair_tabela_pdf(PDF_PATH, num_workers, cache, motor)
+            salvar_csv(df, CSV_PATH)
+            for formato in formatos:
+                salvar_colunar(df, CAMINHOS_COLUNARES[formato], formato, codec)
+        compactar_csv(CSV_PATH, zip_csv_path)
+    finally:
+        # Exclui o Anexo_I.pdf e o CSV, que não são mais necessários (ou ficaram pela metade)
         excluir_arquivos_temporarios()
-        
-        # Salvar os dados extraídos em um CSV
-        salvar_csv(df, CSV_PATH)
-        
-        # Compactar o CSV gerado
-        compactar_csv(CSV_PATH, ZIP_CSV_PATH)
-        
-        # Excluir o CSV após compactação
-        os.remove(CSV_PATH)
-        print(f"Arquivo {CSV_PATH} excluído após compactação.")
-        
+    return zip_csv_path
+
+def etapa_extracao(zip_path, checkpoint_dir=CHECKPOINT_DIR, num_workers=1, cache=None, motor="pdfplumber"):
+    """Etapa de extração (com CHECKPOINT_LINHAS): grava as linhas brutas das tabelas do PDF, lido direto do ZIP."""
+    linhas = (linha for bloco in gerar_tabelas_pdf((zip_path, PDF_NAME), num_workers, cache, motor) for linha in bloco)
+    return _gravar_jsonl(linhas, os.path.join(checkpoint_dir, "linhas_brutas.jsonl"))
+
+def etapa_transformacao(brutas_path, checkpoint_dir=CHECKPOINT_DIR):
+    """Etapa de transformação (com CHECKPOINT_LINHAS): normaliza o cabeçalho e as células das linhas brutas."""
+    linhas = transformar_linhas([_ler_jsonl(brutas_path)])
+    return _gravar_jsonl(linhas, os.path.join(checkpoint_dir, "linhas_normalizadas.jsonl"))
+
+def etapa_gravacao(normalizadas_path, zip_csv_path=ZIP_CSV_PATH, formatos=(), codec=CODEC_COLUNAR):
+    """Etapa de gravação (com CHECKPOINT_LINHAS): grava o CSV direto no ZIP de saída e, se pedido, os arquivos colunares."""
+    linhas = _ler_jsonl(normalizadas_path)
+    for formato in formatos:
+        linhas = espelhar_colunar(linhas, CAMINHOS_COLUNARES[formato], formato, codec)
+    salvar_csv_no_zip(linhas, zip_csv_path, os.path.basename(CSV_PATH))
+    return zip_csv_path
+
+def main(motor=MOTOR, formatos=FORMATOS_COLUNARES, codec=CODEC_COLUNAR):
+    """
+    Função principal que executa todas as etapas do processo.
+    
+    As etapas rodam no próprio processo com checkpoints: se alguma falhar, a próxima execução
+    continua a partir dela, sem baixar os anexos novamente. Por padrão são duas etapas, o
+    download e o processamento (PDF direto para o CSV compactado, veja etapa_processamento);
+    com CHECKPOINT_LINHAS, o processamento é dividido em extração, transformação e gravação,
+    com as linhas guardadas em disco entre elas. O download sempre roda, com requisições
+    condicionais; se os anexos não mudaram, as demais etapas são puladas.
+    
+    Parâmetros:
+    - motor: Motor de extração das tabelas (veja MOTORES), ou "auto".
+    - formatos: Formatos colunares ("parquet", "arrow") gravados junto com o CSV compactado.
+    - codec: Codec de compressão dos arquivos colunares.
+    """
+    cache = CachePaginas() if USAR_CACHE else None
+    if CHECKPOINT_LINHAS:
+        etapas = [
+            ("download", etapa_download),
+            ("extracao", partial(etapa_extracao, num_workers=NUM_WORKERS, cache=cache, motor=motor), {"motor": motor}),
+            ("transformacao", etapa_transformacao),
+            ("gravacao", partial(etapa_gravacao, formatos=formatos, codec=codec), {"formatos": list(formatos), "codec": codec}),
+        ]
+    else:
+        parametros = {"motor": motor, "formatos": list(formatos), "codec": codec,
+                      "direto_zip": MODO_DIRETO_ZIP, "streaming": MODO_STREAMING}
+        etapas = [
+            ("download", etapa_download),
+            ("processamento", partial(etapa_processamento, num_workers=NUM_WORKERS, cache=cache, **parametros), parametros),
+        ]
+    try:
+        # O estado das etapas fica guardado mesmo após uma execução completa, para que a próxima
+        # pule o processamento quando os anexos não mudaram
+        tempos = executar_pipeline(etapas, sempre_executar=("download",))
+        print("Tempo por etapa: " + ", ".join(f"{nome} {tempo:.2f}s" for nome, tempo in tempos.items()))
         print("Processo concluído com sucesso!")
     except Exception as e:
         print(f"Erro no processo: {e}")
-        # Se o erro ocorrer ao extrair o PDF, exclua o ZIP e recomece o processo
-        excluir_arquivo_zip()
-        main()  # Reexecuta o processo
+        print(f"Os checkpoints foram mantidos em {CHECKPOINT_DIR}; a próxima execução continua da etapa que falhou.")
+        raise
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Extrai a tabela do Anexo I para CSV.")
+    parser.add_argument("--engine", choices=list(MOTORES) + ["auto"], default=MOTOR,
+                        help="Motor de extração das tabelas (auto escolhe o mais rápido que concorda com os demais).")
+    parser.add_argument("--format", nargs="*", choices=list(CAMINHOS_COLUNARES), default=list(FORMATOS_COLUNARES),
+                        help="Formatos colunares gravados junto com o CSV compactado.")
+    parser.add_argument("--codec", default=CODEC_COLUNAR,
+                        help="Codec dos arquivos colunares (snappy ou zstd no Parquet; zstd ou lz4 no Arrow).")
+    args = parser.parse_args()
+    main(motor=args.engine, formatos=args.format, codec=args.codec)
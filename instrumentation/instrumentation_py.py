@@ -0,0 +1,462 @@
+import os
+import sys
+import json
+import time
+import inspect
+import argparse
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+from web_scraping import web_scraping_py
+from data_transformation import data_transformation_py
+
+# Formatos de saída das métricas
+FORMATOS = ("jsonl", "prometheus")
+
+# Limites (em segundos) das faixas do histograma de latência por página
+LIMITES_HISTOGRAMA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Perfiladores disponíveis para a etapa escolhida
+PERFILADORES = ("cprofile", "pyinstrument")
+
+
+def _tamanho(caminho):
+    """Tamanho do arquivo em bytes, ou 0 se ele não existe."""
+    try:
+        return os.path.getsize(caminho)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+def _quantidade(valor):
+    try:
+        return len(valor)
+    except TypeError:
+        return 0
+
+
+# Etapas instrumentadas de cada módulo. Para cada função, como contar os bytes e as linhas a partir
+# dos argumentos e do resultado; nos geradores, "linhas_item" conta as linhas de cada item gerado.
+ETAPAS = {
+    web_scraping_py: {
+        "obter_conteudo": {"bytes": lambda a, r: len(r.encode("utf-8")) if isinstance(r, str) else 0},
+        "extrair_links_pdfs": {},
+        "descobrir_links_pdfs": {},
+        "baixar_pdf": {"bytes": lambda a, r: _tamanho(a["caminho_destino"]) if r else 0},
+        "baixar_pdfs": {},
+        "compactar_arquivos": {"bytes": lambda a, r: _tamanho(a["arquivo_zip"])},
+        "compactar_pdfs": {"bytes": lambda a, r: _tamanho(a["arquivo_zip"])},
+        "excluir_arquivos": {},
+        "main": {},
+    },
+    data_transformation_py: {
+        "executar_web_scraping": {},
+        "extrair_pdf_do_zip": {"bytes": lambda a, r: _tamanho(a["pdf_path"])},
+        "selecionar_motor": {},
+        "gerar_tabelas_pdf": {"linhas_item": _quantidade},
+        "gerar_linhas_pdf": {"linhas_item": lambda item: 1},
+        "transformar_linhas": {"linhas_item": lambda item: 1},
+        "extrair_tabela_pdf": {"linhas": lambda a, r: _quantidade(r)},
+        "pos_processar_tabela": {"linhas": lambda a, r: _quantidade(r)},
+        "substituir_abreviacoes": {"linhas": lambda a, r: _quantidade(r)},
+        "salvar_csv": {"bytes": lambda a, r: _tamanho(a["csv_path"]), "linhas": lambda a, r: _quantidade(a["df"])},
+        "salvar_csv_streaming": {"bytes": lambda a, r: _tamanho(a["csv_path"]), "linhas": lambda a, r: r or 0},
+        "salvar_csv_no_zip": {"bytes": lambda a, r: _tamanho(a["zip_path"]), "linhas": lambda a, r: r or 0},
+        "salvar_colunar": {"bytes": lambda a, r: _tamanho(a["caminho"]), "linhas": lambda a, r: _quantidade(a["df"])},
+        "salvar_colunar_streaming": {"bytes": lambda a, r: _tamanho(a["caminho"]), "linhas": lambda a, r: r or 0},
+        "espelhar_colunar": {"linhas_item": lambda item: 1},
+        "compactar_csv": {"bytes": lambda a, r: _tamanho(a["zip_path"])},
+        "etapa_download": {"bytes": lambda a, r: _tamanho(r)},
+        "etapa_processamento": {"bytes": lambda a, r: _tamanho(r)},
+        "etapa_extracao": {"bytes": lambda a, r: _tamanho(r)},
+        "etapa_transformacao": {"bytes": lambda a, r: _tamanho(r)},
+        "etapa_gravacao": {"bytes": lambda a, r: _tamanho(r)},
+        "executar_pipeline": {},
+        "main": {},
+    },
+}
+
+
+def _rss_pico():
+    """Maior memória residente (RSS) do processo até agora, em bytes, ou None onde não há o módulo resource."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # O Linux informa em KB; o macOS, em bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def _importar_pyinstrument():
+    """Importa o pyinstrument, que só é necessário para o perfil com ele."""
+    try:
+        import pyinstrument
+        return pyinstrument
+    except ImportError:
+        raise Exception("O perfil com pyinstrument precisa do pacote pyinstrument instalado.")
+
+
+class Coletor:
+    """
+    Guarda as métricas das etapas instrumentadas e grava os eventos em JSON Lines ou no formato
+    texto do Prometheus.
+    
+    Os tempos são inclusivos: uma etapa que chama outra conta também o tempo da chamada. Nos
+    geradores, só conta o tempo gasto gerando cada item, não o de quem os consome. O pico de
+    memória (tracemalloc) é medido em relação à memória no início da etapa; em etapas que rodam
+    em várias threads ao mesmo tempo ele é aproximado, porque o tracemalloc é do processo todo.
+    
+    Parâmetros:
+    - saida: Arquivo onde as métricas são gravadas; None guarda só em memória.
+    - formato: "jsonl" (um evento por chamada, gravado ao fim de cada uma) ou "prometheus"
+      (os totais, gravados ao fim da coleta).
+    - memoria: Se o pico de memória de cada etapa é medido com o tracemalloc. Deixa o código
+      medido umas cinco vezes mais lento; sem ele, fica só o pico de RSS do processo.
+    - perfil: Nome de uma etapa (por exemplo "data_transformation.extrair_tabela_pdf") cujas
+      chamadas são perfiladas.
+    - perfil_path: Arquivo do perfil; por padrão, "<etapa>.prof" (cProfile) ou "<etapa>.html".
+    - perfilador: "cprofile" ou "pyinstrument".
+    """
+
+    def __init__(self, saida=None, formato="jsonl", memoria=False, perfil=None, perfil_path=None, perfilador="cprofile"):
+        if formato not in FORMATOS:
+            raise Exception(f"Formato de métricas não suportado: {formato}. Opções: {', '.join(FORMATOS)}")
+        if perfilador not in PERFILADORES:
+            raise Exception(f"Perfilador não suportado: {perfilador}. Opções: {', '.join(PERFILADORES)}")
+        self.saida = saida
+        self.formato = formato
+        self.memoria = memoria
+        self.perfil = perfil
+        self.perfilador = perfilador
+        self.perfil_path = perfil_path or (f"{perfil}.prof" if perfilador == "cprofile" else f"{perfil}.html")
+        self.etapas = {}
+        self.histogramas = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._perfilador = None
+        self._parar_tracemalloc = False
+        self._arquivo = open(saida, "w", encoding="utf-8") if saida and formato == "jsonl" else None
+
+    def _pilha(self):
+        pilha = getattr(self._local, "pilha", None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def _entrar(self, etapa):
+        """Marca o início de um trecho medido; devolve o estado usado por _sair."""
+        if etapa == self.perfil and self._perfilador is None:
+            self._iniciar_perfil()
+            perfilando = True
+        else:
+            perfilando = False
+        quadro = None
+        if self.memoria and tracemalloc.is_tracing():
+            # O pico atual pertence a todos os trechos abertos; depois é zerado para medir este
+            atual, pico = tracemalloc.get_traced_memory()
+            for aberto in self._pilha():
+                aberto[1] = max(aberto[1], pico)
+            tracemalloc.reset_peak()
+            quadro = [atual, atual]
+            self._pilha().append(quadro)
+        return quadro, perfilando, time.perf_counter()
+
+    def _sair(self, estado):
+        """Fecha um trecho medido; devolve os segundos e o pico de memória (ou None)."""
+        quadro, perfilando, inicio = estado
+        segundos = time.perf_counter() - inicio
+        memoria = None
+        if quadro is not None:
+            _, pico = tracemalloc.get_traced_memory()
+            quadro[1] = max(quadro[1], pico)
+            pilha = self._pilha()
+            if pilha and pilha[-1] is quadro:
+                pilha.pop()
+            if pilha:
+                pilha[-1][1] = max(pilha[-1][1], quadro[1])
+            tracemalloc.reset_peak()
+            memoria = quadro[1] - quadro[0]
+        if perfilando:
+            self._parar_perfil()
+        return segundos, memoria
+
+    def registrar(self, etapa, segundos, memoria=None, nbytes=0, linhas=0, erro=None):
+        """Soma uma chamada às métricas da etapa e grava o evento, no formato JSON Lines."""
+        evento = {
+            "etapa": etapa, "segundos": segundos, "memoria_pico": memoria, "rss_pico": _rss_pico(),
+            "bytes": nbytes, "linhas": linhas, "erro": erro,
+        }
+        with self._lock:
+            metricas = self.etapas.setdefault(etapa, {
+                "chamadas": 0, "erros": 0, "segundos": 0.0, "memoria_pico": None, "bytes": 0, "linhas": 0,
+            })
+            metricas["chamadas"] += 1
+            metricas["erros"] += erro is not None
+            metricas["segundos"] += segundos
+            metricas["bytes"] += nbytes
+            metricas["linhas"] += linhas
+            if memoria is not None:
+                metricas["memoria_pico"] = max(metricas["memoria_pico"] or 0, memoria)
+            if self._arquivo:
+                self._arquivo.write(json.dumps(evento, ensure_ascii=False) + "\n")
+                self._arquivo.flush()
+
+    def observar_pagina(self, motor, segundos):
+        """Registra a latência de extração de uma página no histograma do motor."""
+        with self._lock:
+            histograma = self.histogramas.setdefault(motor, {"faixas": [0] * len(LIMITES_HISTOGRAMA), "soma": 0.0, "total": 0})
+            for i, limite in enumerate(LIMITES_HISTOGRAMA):
+                if segundos <= limite:
+                    histograma["faixas"][i] += 1
+                    break
+            histograma["soma"] += segundos
+            histograma["total"] += 1
+
+    def _iniciar_perfil(self):
+        if self.perfilador == "pyinstrument":
+            self._perfilador = _importar_pyinstrument().Profiler()
+            self._perfilador.start()
+        else:
+            import cProfile
+            self._perfilador = cProfile.Profile()
+            self._perfilador.enable()
+
+    def _parar_perfil(self):
+        if self.perfilador == "pyinstrument":
+            self._perfilador.stop()
+            with open(self.perfil_path, "w", encoding="utf-8") as f:
+                f.write(self._perfilador.output_html())
+        else:
+            self._perfilador.disable()
+            self._perfilador.dump_stats(self.perfil_path)
+        print(f"Perfil da etapa {self.perfil} gravado em {self.perfil_path}")
+        self._perfilador = None
+
+    def prometheus(self):
+        """Exporta as métricas no formato texto do Prometheus."""
+        linhas = []
+        series = (
+            ("pipeline_etapa_chamadas_total", "counter", "Chamadas de cada etapa.", "chamadas"),
+            ("pipeline_etapa_erros_total", "counter", "Chamadas de cada etapa que terminaram com erro.", "erros"),
+            ("pipeline_etapa_segundos_total", "counter", "Tempo gasto em cada etapa (inclusivo).", "segundos"),
+            ("pipeline_etapa_bytes_total", "counter", "Bytes gerados ou lidos por cada etapa.", "bytes"),
+            ("pipeline_etapa_linhas_total", "counter", "Linhas processadas por cada etapa.", "linhas"),
+            ("pipeline_etapa_memoria_pico_bytes", "gauge", "Pico de memória alocada numa chamada da etapa (tracemalloc).", "memoria_pico"),
+        )
+        for nome, tipo, ajuda, campo in series:
+            linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+            for etapa, metricas in sorted(self.etapas.items()):
+                if metricas[campo] is not None:
+                    linhas.append(f'{nome}{{etapa="{etapa}"}} {metricas[campo]}')
+        rss = _rss_pico()
+        if rss is not None:
+            linhas += ["# HELP pipeline_rss_pico_bytes Maior memória residente do processo.",
+                       "# TYPE pipeline_rss_pico_bytes gauge", f"pipeline_rss_pico_bytes {rss}"]
+        linhas += ["# HELP pipeline_pagina_segundos Latência da extração de cada página do PDF.",
+                   "# TYPE pipeline_pagina_segundos histogram"]
+        for motor, histograma in sorted(self.histogramas.items()):
+            acumulado = 0
+            for limite, quantidade in zip(LIMITES_HISTOGRAMA, histograma["faixas"]):
+                acumulado += quantidade
+                linhas.append(f'pipeline_pagina_segundos_bucket{{motor="{motor}",le="{limite}"}} {acumulado}')
+            linhas.append(f'pipeline_pagina_segundos_bucket{{motor="{motor}",le="+Inf"}} {histograma["total"]}')
+            linhas.append(f'pipeline_pagina_segundos_sum{{motor="{motor}"}} {histograma["soma"]}')
+            linhas.append(f'pipeline_pagina_segundos_count{{motor="{motor}"}} {histograma["total"]}')
+        return "\n".join(linhas) + "\n"
+
+    def fechar(self):
+        """Grava o resumo das etapas e os histogramas (JSON Lines) ou todas as métricas (Prometheus)."""
+        if self._arquivo:
+            for etapa, metricas in sorted(self.etapas.items()):
+                self._arquivo.write(json.dumps({"tipo": "resumo", "etapa": etapa, **metricas}, ensure_ascii=False) + "\n")
+            for motor, histograma in sorted(self.histogramas.items()):
+                self._arquivo.write(json.dumps({"tipo": "histograma", "motor": motor, "limites": LIMITES_HISTOGRAMA,
+                                                **histograma}, ensure_ascii=False) + "\n")
+            self._arquivo.close()
+            self._arquivo = None
+        elif self.saida and self.formato == "prometheus":
+            with open(self.saida, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+
+
+def _instrumentar_funcao(coletor, etapa, funcao, contadores):
+    """Cria o wrapper que mede cada chamada (ou cada item gerado, nos geradores) da função."""
+    assinatura = inspect.signature(funcao)
+
+    def contar(contador, args, kwargs, resultado):
+        if contador not in contadores:
+            return 0
+        argumentos = assinatura.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        return contadores[contador](argumentos.arguments, resultado)
+
+    if inspect.isgeneratorfunction(funcao):
+        @functools.wraps(funcao)
+        def gerador(*args, **kwargs):
+            segundos, memoria, linhas, erro = 0.0, None, 0, None
+            iterador = funcao(*args, **kwargs)
+            try:
+                while True:
+                    estado = coletor._entrar(etapa)
+                    try:
+                        item = next(iterador)
+                    except StopIteration:
+                        return
+                    except Exception as e:
+                        erro = str(e)
+                        raise
+                    finally:
+                        duracao, pico = coletor._sair(estado)
+                        segundos += duracao
+                        if pico is not None:
+                            memoria = max(memoria or 0, pico)
+                    if "linhas_item" in contadores:
+                        linhas += contadores["linhas_item"](item)
+                    yield item
+            finally:
+                iterador.close()
+                coletor.registrar(etapa, segundos, memoria, linhas=linhas, erro=erro)
+        return gerador
+
+    @functools.wraps(funcao)
+    def wrapper(*args, **kwargs):
+        estado = coletor._entrar(etapa)
+        try:
+            resultado = funcao(*args, **kwargs)
+        except Exception as e:
+            segundos, memoria = coletor._sair(estado)
+            coletor.registrar(etapa, segundos, memoria, erro=str(e))
+            raise
+        segundos, memoria = coletor._sair(estado)
+        coletor.registrar(etapa, segundos, memoria, contar("bytes", args, kwargs, resultado),
+                          contar("linhas", args, kwargs, resultado))
+        return resultado
+    return wrapper
+
+
+def _instrumentar_motor(coletor, motor, funcao):
+    """Cria o wrapper do motor de extração que mede a latência de cada página gerada."""
+    @functools.wraps(funcao)
+    def gerador(*args, **kwargs):
+        iterador = funcao(*args, **kwargs)
+        try:
+            while True:
+                inicio = time.perf_counter()
+                try:
+                    tabela = next(iterador)
+                except StopIteration:
+                    return
+                coletor.observar_pagina(motor, time.perf_counter() - inicio)
+                yield tabela
+        finally:
+            iterador.close()
+    return gerador
+
+
+# Coletor ativo e as funções originais substituídas pelos wrappers
+_COLETOR = None
+_ORIGINAIS = []
+
+
+def ativar(saida=None, formato="jsonl", memoria=False, perfil=None, perfil_path=None, perfilador="cprofile"):
+    """
+    Liga a instrumentação: as funções das etapas de web_scraping_py e data_transformation_py e os
+    motores de extração são trocados por versões medidas.
+    
+    Sem ativar, nenhuma função é trocada e o custo da instrumentação é zero. Os processos do pool
+    de extração (num_workers > 1) não são medidos página a página, só a etapa como um todo.
+    
+    Parâmetros: os mesmos de Coletor.
+    
+    Retorna:
+    - O Coletor com as métricas.
+    """
+    global _COLETOR
+    if _COLETOR is not None:
+        raise Exception("A instrumentação já está ativa.")
+    coletor = Coletor(saida, formato, memoria, perfil, perfil_path, perfilador)
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        coletor._parar_tracemalloc = True
+    for modulo, funcoes in ETAPAS.items():
+        prefixo = modulo.__name__.split(".")[0]
+        for nome, contadores in funcoes.items():
+            original = getattr(modulo, nome)
+            _ORIGINAIS.append((modulo, nome, original))
+            setattr(modulo, nome, _instrumentar_funcao(coletor, f"{prefixo}.{nome}", original, contadores))
+    motores = data_transformation_py.MOTORES
+    for motor, original in list(motores.items()):
+        _ORIGINAIS.append((motores, motor, original))
+        motores[motor] = _instrumentar_motor(coletor, motor, original)
+    _COLETOR = coletor
+    return coletor
+
+
+def desativar():
+    """
+    Desliga a instrumentação, devolvendo as funções originais, e grava as métricas.
+    
+    Retorna:
+    - O Coletor com as métricas, ou None se a instrumentação não estava ativa.
+    """
+    global _COLETOR
+    coletor = _COLETOR
+    if coletor is None:
+        return None
+    while _ORIGINAIS:
+        alvo, nome, original = _ORIGINAIS.pop()
+        if isinstance(alvo, dict):
+            alvo[nome] = original
+        else:
+            setattr(alvo, nome, original)
+    if coletor._parar_tracemalloc:
+        tracemalloc.stop()
+    coletor.fechar()
+    _COLETOR = None
+    return coletor
+
+
+@contextmanager
+def instrumentar(**opcoes):
+    """Liga a instrumentação dentro do bloco (veja ativar) e grava as métricas ao sair."""
+    coletor = ativar(**opcoes)
+    try:
+        yield coletor
+    finally:
+        desativar()
+
+
+def main(pipeline, saida, formato="jsonl", memoria=False, perfil=None, perfilador="cprofile"):
+    """
+    Executa um dos pipelines com a instrumentação ligada e imprime o resumo por etapa.
+    
+    Parâmetros:
+    - pipeline: "web_scraping" ou "data_transformation".
+    - saida: Arquivo das métricas.
+    - formato, memoria, perfil, perfilador: Veja Coletor.
+    """
+    modulo = {"web_scraping": web_scraping_py, "data_transformation": data_transformation_py}[pipeline]
+    with instrumentar(saida=saida, formato=formato, memoria=memoria, perfil=perfil, perfilador=perfilador) as coletor:
+        modulo.main()
+    for etapa, metricas in sorted(coletor.etapas.items(), key=lambda item: -item[1]["segundos"]):
+        memoria_pico = "" if metricas["memoria_pico"] is None else f" | pico {metricas['memoria_pico'] / 1024 ** 2:.1f} MB"
+        print(f"{etapa}: {metricas['segundos']:.2f}s em {metricas['chamadas']} chamada(s) | "
+              f"{metricas['bytes']} bytes | {metricas['linhas']} linhas{memoria_pico}")
+    print(f"Métricas gravadas em {saida}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa um pipeline medindo o tempo, a memória e os volumes de cada etapa.")
+    parser.add_argument("pipeline", choices=["web_scraping", "data_transformation"])
+    parser.add_argument("--saida", default="metricas.jsonl", help="Arquivo das métricas.")
+    parser.add_argument("--formato", choices=FORMATOS, default="jsonl")
+    parser.add_argument("--memoria", action="store_true",
+                        help="Mede o pico de memória de cada etapa com o tracemalloc (deixa o pipeline bem mais lento).")
+    parser.add_argument("--perfil", default=None,
+                        help="Etapa perfilada, por exemplo data_transformation.extrair_tabela_pdf.")
+    parser.add_argument("--perfilador", choices=PERFILADORES, default="cprofile")
+    args = parser.parse_args()
+    main(args.pipeline, args.saida, args.formato, args.memoria, args.perfil, args.perfilador)
@@ -0,0 +1,155 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+
+from data_loading import data_loading_py
+from operator_search import operator_search_py
+
+# Tamanho do cadastro sintético (o Relatorio_cadop.csv tem pouco mais de mil operadoras ativas)
+OPERADORAS = 5000
+
+# Buscas medidas
+BUSCAS = 20000
+
+# Palavras usadas para montar os nomes das operadoras, com e sem acento
+PALAVRAS = (
+    "Saúde", "Assistência", "Médica", "Odontológica", "Unimed", "Cooperativa", "Trabalho", "Hospital",
+    "Clínica", "Plano", "Seguros", "Administradora", "Benefícios", "Vida", "Família", "São", "Paulo",
+    "Paraná", "Minas", "Gerais", "Rio", "Grande", "Sul", "Norte", "Nordeste", "Brasil", "Nacional",
+    "Servidores", "Municipais", "Previdência", "Integral", "Odonto", "Sorriso", "Bem", "Estar", "Amil",
+)
+SUFIXOS = ("LTDA", "S.A.", "S/A", "EIRELI", "")
+
+
+def gerar_cadop_sintetico(caminho, operadoras=OPERADORAS, semente=42):
+    """
+    Gera um Relatorio_cadop.csv com todas as colunas da tabela Empresas e nomes parecidos com os reais.
+
+    Retorna:
+    - Lista de (Registro_ANS, CNPJ, Razão Social) das operadoras geradas.
+    """
+    aleatorio = random.Random(semente)
+    geradas = []
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(";".join(f'"{coluna}"' for coluna in data_loading_py.COLUNAS_EMPRESAS) + "\n")
+        for i in range(operadoras):
+            registro, cnpj = str(300000 + i), f"{10 ** 13 + i * 7919:014d}"
+            palavras = aleatorio.sample(PALAVRAS, aleatorio.randint(2, 5))
+            razao = " ".join(palavras + [f"{i}", aleatorio.choice(SUFIXOS)]).strip().upper()
+            fantasia = " ".join(aleatorio.sample(palavras, min(2, len(palavras))))
+            valores = [registro, cnpj, razao, fantasia, "Cooperativa Médica", "RUA A", "10", "", "CENTRO",
+                       "Curitiba", "PR", "80000000", "41", "33330000", "", "", "", "", "4", "2001-03-15"]
+            f.write(";".join(f'"{valor}"' for valor in valores) + "\n")
+            geradas.append((registro, cnpj, razao))
+    return geradas
+
+
+def gerar_buscas(geradas, quantidade=BUSCAS, semente=7):
+    """Sorteia buscas por palavra inteira, prefixo, várias palavras, CNPJ formatado e Registro ANS."""
+    aleatorio = random.Random(semente)
+    buscas = []
+    for _ in range(quantidade):
+        registro, cnpj, razao = aleatorio.choice(geradas)
+        palavras = [p for p in razao.split() if not p.isdigit()]
+        tipo = aleatorio.randrange(5)
+        if tipo == 0:
+            buscas.append(aleatorio.choice(PALAVRAS).lower())
+        elif tipo == 1:
+            buscas.append(aleatorio.choice(PALAVRAS)[:aleatorio.randint(1, 4)])
+        elif tipo == 2:
+            buscas.append(" ".join(palavras[:2]) + " " + palavras[-1][:3])
+        elif tipo == 3:
+            buscas.append(f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}")
+        else:
+            buscas.append(registro)
+    return buscas
+
+
+def percentil(valores, p):
+    """Percentil p (0 a 100) de uma lista já ordenada, pelo posto mais próximo."""
+    return valores[min(len(valores) - 1, max(0, round(p / 100 * len(valores)) - 1))]
+
+
+def buscar_por_varredura(linhas, consulta):
+    """A busca de hoje: procura o texto dentro da Razão Social e do Nome Fantasia de cada operadora."""
+    texto = consulta.lower()
+    return [valores for valores in linhas.values()
+            if texto in (valores[2] or "").lower() or texto in (valores[3] or "").lower()]
+
+
+def executar_benchmark(operadoras=OPERADORAS, buscas=BUSCAS):
+    """
+    Mede a criação, a gravação, a carga e as buscas do índice num cadastro sintético.
+
+    Parâmetros:
+    - operadoras: Quantidade de operadoras do cadastro.
+    - buscas: Quantidade de buscas medidas.
+
+    Retorna:
+    - Dicionário com os tempos, em milissegundos, de cada etapa e das buscas (p50, p99 e máximo).
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        cadop = os.path.join(pasta, "Relatorio_cadop.csv")
+        indice_path = os.path.join(pasta, "indice_operadoras.pkl")
+        geradas = gerar_cadop_sintetico(cadop, operadoras)
+        linhas = data_loading_py.ler_cadop(cadop)
+
+        inicio = time.perf_counter()
+        indice = operator_search_py.IndiceOperadoras()
+        indice.atualizar(linhas)
+        criacao = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        indice.salvar(indice_path)
+        gravacao = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        indice = operator_search_py.IndiceOperadoras.carregar(indice_path)
+        carga = time.perf_counter() - inicio
+
+        # Reindexação incremental: 1% das operadoras muda de nome
+        alteradas = dict(linhas)
+        for chave in list(alteradas)[::100]:
+            alteradas[chave] = alteradas[chave][:2] + [f"{alteradas[chave][2]} NOVA"] + alteradas[chave][3:]
+        inicio = time.perf_counter()
+        indice.atualizar(alteradas)
+        incremental = time.perf_counter() - inicio
+
+    consultas = gerar_buscas(geradas, buscas)
+    tempos = []
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        indice.buscar(consulta)
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+
+    inicio = time.perf_counter()
+    for consulta in consultas[:200]:
+        buscar_por_varredura(alteradas, consulta)
+    varredura = (time.perf_counter() - inicio) / 200
+
+    resultado = {
+        "criacao_ms": criacao * 1000,
+        "gravacao_ms": gravacao * 1000,
+        "carga_ms": carga * 1000,
+        "incremental_ms": incremental * 1000,
+        "busca_p50_ms": percentil(tempos, 50) * 1000,
+        "busca_p99_ms": percentil(tempos, 99) * 1000,
+        "busca_max_ms": tempos[-1] * 1000,
+        "varredura_media_ms": varredura * 1000,
+    }
+    print(f"{operadoras} operadoras | criação {resultado['criacao_ms']:.0f} ms | carga do disco {resultado['carga_ms']:.0f} ms | "
+          f"reindexação de 1% {resultado['incremental_ms']:.1f} ms")
+    print(f"{buscas} buscas | p50 {resultado['busca_p50_ms']:.3f} ms | p99 {resultado['busca_p99_ms']:.3f} ms | "
+          f"máximo {resultado['busca_max_ms']:.3f} ms | varredura {resultado['varredura_media_ms']:.3f} ms por busca")
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede a latência do índice de busca de operadoras num cadastro sintético.")
+    parser.add_argument("--operadoras", type=int, default=OPERADORAS)
+    parser.add_argument("--buscas", type=int, default=BUSCAS)
+    args = parser.parse_args()
+    executar_benchmark(args.operadoras, args.buscas)
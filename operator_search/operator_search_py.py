@@ -0,0 +1,291 @@
+import os
+import re
+import heapq
+from collections import Counter
+import pickle
+import argparse
+import unicodedata
+
+from data_loading import data_loading_py
+
+# Cadastro de operadoras e índice gravado em disco
+CADOP_PATH = data_loading_py.CADOP_PATH
+INDICE_PATH = os.path.join(data_loading_py.DADOS_DIR, "indice_operadoras.pkl")
+
+# Versão do formato do índice gravado; índices de outra versão são recriados
+VERSAO_INDICE = 2
+
+# Colunas indexadas para a busca por nome
+COLUNAS_BUSCA = ("Razao_Social", "Nome_Fantasia")
+
+# Quantidade de resultados devolvidos por busca
+LIMITE_RESULTADOS = 10
+
+# Tamanho do Registro ANS (a busca só com dígitos até esse tamanho é tratada como registro)
+DIGITOS_REGISTRO = 6
+
+
+def dobrar_texto(texto):
+    """Remove acentos, passa para minúsculas e troca pontuação por espaço ("Saúde S/A." -> "saude s a")."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).casefold()
+    return re.sub(r"[\W_]+", " ", texto).strip()
+
+
+def tokenizar(texto):
+    """Divide o texto já dobrado em palavras."""
+    return dobrar_texto(texto).split()
+
+
+def somente_digitos(texto):
+    """Mantém só os dígitos (CNPJ "12.345.678/0001-90" -> "12345678000190")."""
+    return re.sub(r"\D", "", texto or "")
+
+
+class IndiceOperadoras:
+    """
+    Índice em memória do cadastro de operadoras para a busca por Razão Social e Nome Fantasia.
+
+    Guarda um índice invertido (palavra -> chaves das operadoras) para as palavras inteiras e uma
+    árvore de prefixos em que cada nó já sabe quais operadoras têm alguma palavra começando por ele,
+    de modo que a busca por prefixo é só uma descida na árvore. As operadoras são identificadas
+    pela chave "Registro_ANS|CNPJ", a mesma de data_loading_py.ler_cadop.
+    """
+
+    def __init__(self):
+        self.documentos = {}
+        self.hashes = {}
+        self.invertido = {}
+        self.arvore = [{}, {}]
+        self.por_cnpj = {}
+        self.por_registro = {}
+        self.ordem = {}
+        self.ranking = None
+
+    def __len__(self):
+        return len(self.documentos)
+
+    def _adicionar(self, chave, valores):
+        documento = dict(zip(data_loading_py.COLUNAS_EMPRESAS, valores))
+        self.documentos[chave] = documento
+        self.hashes[chave] = data_loading_py.calcular_hash_linha(valores)
+        self.por_cnpj.setdefault(somente_digitos(documento["CNPJ"]), set()).add(chave)
+        self.por_registro.setdefault(documento["Registro_ANS"], set()).add(chave)
+        nome = documento["Razao_Social"] or ""
+        self.ordem[chave] = (len(nome), nome, chave)
+        self.ranking = None
+
+        for palavra in {p for coluna in COLUNAS_BUSCA for p in tokenizar(documento[coluna])}:
+            self.invertido.setdefault(palavra, set()).add(chave)
+            no = self.arvore
+            for letra in palavra:
+                no = no[0].setdefault(letra, [{}, {}])
+                no[1][chave] = no[1].get(chave, 0) + 1
+
+    def _remover(self, chave):
+        documento = self.documentos.pop(chave)
+        del self.hashes[chave]
+        del self.ordem[chave]
+        self.ranking = None
+        cnpjs = self.por_cnpj[somente_digitos(documento["CNPJ"])]
+        cnpjs.discard(chave)
+        if not cnpjs:
+            del self.por_cnpj[somente_digitos(documento["CNPJ"])]
+        registros = self.por_registro[documento["Registro_ANS"]]
+        registros.discard(chave)
+        if not registros:
+            del self.por_registro[documento["Registro_ANS"]]
+
+        for palavra in {p for coluna in COLUNAS_BUSCA for p in tokenizar(documento[coluna])}:
+            self.invertido[palavra].discard(chave)
+            if not self.invertido[palavra]:
+                del self.invertido[palavra]
+            caminho = [self.arvore]
+            for letra in palavra:
+                caminho.append(caminho[-1][0][letra])
+            for no in caminho[1:]:
+                no[1][chave] -= 1
+                if not no[1][chave]:
+                    del no[1][chave]
+            # Poda os nós que ficaram sem operadoras, de baixo para cima
+            for pai, letra, no in reversed(list(zip(caminho, palavra, caminho[1:]))):
+                if no[1]:
+                    break
+                del pai[0][letra]
+
+    def atualizar(self, linhas):
+        """
+        Atualiza o índice para o cadastro atual, reindexando só as operadoras que mudaram.
+
+        Parâmetros:
+        - linhas: Dicionário chave -> valores, gerado por data_loading_py.ler_cadop (ou ler_empresas).
+
+        Retorna:
+        - Uma tupla (inseridas, alteradas, removidas) com a quantidade de operadoras de cada tipo.
+        """
+        inseridas, alteradas, removidas, _ = data_loading_py.comparar_cadop(linhas, self.hashes)
+        for chave in alteradas + removidas:
+            self._remover(chave)
+        for chave in inseridas + alteradas:
+            self._adicionar(chave, linhas[chave])
+        return len(inseridas), len(alteradas), len(removidas)
+
+    def _prefixo(self, palavra):
+        no = self.arvore
+        for letra in palavra:
+            no = no[0].get(letra)
+            if no is None:
+                return {}
+        return no[1]
+
+    def _primeiras(self, chaves, quantidade):
+        """As primeiras operadoras do conjunto na ordem dos resultados (nome mais curto, depois alfabética)."""
+        if len(chaves) * 8 < len(self.ordem):
+            return heapq.nsmallest(quantidade, chaves, key=self.ordem.__getitem__)
+        # Conjuntos grandes (prefixos de uma ou duas letras): percorre a ordem de todas as
+        # operadoras, recalculada só depois de alguma mudança no índice
+        if self.ranking is None:
+            self.ranking = [ordem[2] for ordem in sorted(self.ordem.values())]
+        primeiras = []
+        for chave in self.ranking:
+            if chave in chaves:
+                primeiras.append(chave)
+                if len(primeiras) == quantidade:
+                    break
+        return primeiras
+
+    def buscar_cnpj(self, cnpj):
+        """Devolve as operadoras do CNPJ (com ou sem pontuação); o mesmo CNPJ pode ter mais de um Registro ANS."""
+        return [self.documentos[chave] for chave in sorted(self.por_cnpj.get(somente_digitos(cnpj), ()))]
+
+    def buscar_registro(self, registro_ans):
+        """Devolve as operadoras do Registro ANS."""
+        return [self.documentos[chave] for chave in sorted(self.por_registro.get(str(registro_ans).strip(), ()))]
+
+    def buscar(self, consulta, limite=LIMITE_RESULTADOS):
+        """
+        Busca operadoras pelo nome, CNPJ ou Registro ANS.
+
+        Todas as palavras da consulta precisam aparecer na Razão Social ou no Nome Fantasia, inteiras
+        ou como começo de palavra; as operadoras são ordenadas pelos pontos (palavra inteira vale mais
+        que prefixo), depois pelo nome mais curto e pela Razão Social. Consultas só com dígitos (e
+        pontuação de CNPJ) são buscadas como CNPJ ou Registro ANS.
+
+        Parâmetros:
+        - consulta: Texto digitado pelo usuário.
+        - limite: Quantidade máxima de resultados.
+
+        Retorna:
+        - Lista de dicionários coluna -> valor das operadoras encontradas.
+        """
+        digitos = somente_digitos(consulta)
+        if digitos and not re.search(r"[^\d\s./-]", consulta):
+            if len(digitos) <= DIGITOS_REGISTRO:
+                return self.buscar_registro(digitos)[:limite]
+            return self.buscar_cnpj(digitos)[:limite]
+
+        palavras = tokenizar(consulta)
+        if not palavras:
+            return []
+        prefixos = sorted((self._prefixo(palavra) for palavra in palavras), key=len)
+        if not prefixos[0]:
+            return []
+        candidatas = prefixos[0].keys()
+        for outras in prefixos[1:]:
+            candidatas = candidatas & outras.keys()
+
+        # Todas as candidatas casam todas as palavras ao menos como prefixo; os pontos são as
+        # palavras casadas inteiras. Os grupos de mesmos pontos saem de operações de conjunto.
+        inteiras = [candidatas & self.invertido.get(palavra, set()) for palavra in palavras]
+        if len(inteiras) == 1:
+            grupos = {1: inteiras[0]}
+        else:
+            grupos = {}
+            for chave, pontos in Counter(chave for conjunto in inteiras for chave in conjunto).items():
+                grupos.setdefault(pontos, set()).add(chave)
+        grupos[0] = candidatas - set().union(*inteiras)
+
+        # Só ordena os grupos necessários para completar o limite
+        resultado = []
+        for quantidade in sorted(grupos, reverse=True):
+            resultado += self._primeiras(grupos[quantidade], limite - len(resultado))
+            if len(resultado) >= limite:
+                break
+        return [self.documentos[chave] for chave in resultado]
+
+    def salvar(self, indice_path=INDICE_PATH):
+        """Grava o índice em disco de forma atômica."""
+        with open(f"{indice_path}.tmp", "wb") as f:
+            pickle.dump((VERSAO_INDICE, self.__dict__), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{indice_path}.tmp", indice_path)
+
+    @classmethod
+    def carregar(cls, indice_path=INDICE_PATH):
+        """Carrega um índice gravado por salvar, ou devolve um índice vazio se ele não existir ou for de outra versão."""
+        indice = cls()
+        try:
+            with open(indice_path, "rb") as f:
+                versao, estado = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return indice
+        if versao == VERSAO_INDICE:
+            indice.__dict__.update(estado)
+        return indice
+
+
+def ler_empresas(conexao, tabela=data_loading_py.TABELA_EMPRESAS):
+    """
+    Lê o cadastro de operadoras da tabela Empresas, no mesmo formato de data_loading_py.ler_cadop.
+
+    Retorna:
+    - Dicionário chave ("Registro_ANS|CNPJ") -> lista de valores como texto.
+    """
+    cursor = conexao.cursor()
+    cursor.execute(f"SELECT {', '.join(data_loading_py.COLUNAS_EMPRESAS)} FROM {tabela}")
+    linhas = {}
+    for linha in cursor.fetchall():
+        valores = [None if valor is None else str(valor) for valor in linha]
+        linhas[f"{valores[0]}|{valores[1]}"] = valores
+    return linhas
+
+
+def indexar_operadoras(cadop_path=CADOP_PATH, indice_path=INDICE_PATH, conexao=None):
+    """
+    Cria ou atualiza o índice gravado em disco a partir do Relatorio_cadop.csv ou da tabela Empresas.
+
+    Só as operadoras inseridas, alteradas ou removidas desde a última indexação são reindexadas.
+
+    Parâmetros:
+    - cadop_path: Caminho do Relatorio_cadop.csv (ignorado se conexao for informada).
+    - indice_path: Caminho do índice gravado.
+    - conexao: Conexão DB-API com a tabela Empresas.
+
+    Retorna:
+    - O índice atualizado.
+    """
+    try:
+        indice = IndiceOperadoras.carregar(indice_path)
+        linhas = ler_empresas(conexao) if conexao else data_loading_py.ler_cadop(cadop_path)
+        inseridas, alteradas, removidas = indice.atualizar(linhas)
+        if inseridas or alteradas or removidas:
+            indice.salvar(indice_path)
+        print(f"Índice de operadoras atualizado: {inseridas} inseridas, {alteradas} alteradas, "
+              f"{removidas} removidas, {len(indice)} no total.")
+        return indice
+    except Exception as e:
+        raise Exception(f"Erro ao indexar as operadoras: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indexa o cadastro de operadoras e faz buscas por nome, CNPJ ou Registro ANS.")
+    parser.add_argument("busca", nargs="*", help="Texto buscado; sem busca, só atualiza o índice.")
+    parser.add_argument("--cadop", default=CADOP_PATH, help="Relatorio_cadop.csv usado para criar o índice.")
+    parser.add_argument("--sqlite", default=None, help="Lê a tabela Empresas deste banco SQLite em vez do CSV.")
+    parser.add_argument("--indice", default=INDICE_PATH)
+    parser.add_argument("--limite", type=int, default=LIMITE_RESULTADOS)
+    args = parser.parse_args()
+    conexao = data_loading_py.conexao_sqlite(args.sqlite)() if args.sqlite else None
+    indice = indexar_operadoras(args.cadop, args.indice, conexao)
+    if args.busca:
+        for documento in indice.buscar(" ".join(args.busca), args.limite):
+            print(f"{documento['Registro_ANS']} | {documento['CNPJ']} | {documento['Razao_Social']} | {documento['Nome_Fantasia'] or ''}")
@@ -0,0 +1,12 @@
+-- Dimensão das contas contábeis: cada par (código, descrição normalizada) recebe uma chave inteira,
+-- usada nas linhas de demonstracoes_contabeis e de despesas_trimestrais.
+-- A descrição é normalizada pelo carregador (data_loading/data_loading_py.py): espaços repetidos viram
+-- um só e os das pontas são removidos, então diferenças de espaçamento entre trimestres não criam contas novas.
+
+CREATE TABLE contas (
+    ID_CONTA INT PRIMARY KEY,
+    CD_CONTA_CONTABIL VARCHAR(50) NOT NULL,
+    DESCRICAO TEXT NOT NULL,
+    -- O índice da restrição começa pelo código, e atende também os relatórios, que filtram por CD_CONTA_CONTABIL
+    UNIQUE (CD_CONTA_CONTABIL, DESCRICAO)
+);
@@ -0,0 +1,17 @@
+-- Resumo das despesas de cada operadora por trimestre e conta (ID_CONTA da tabela contas),
+-- com a soma de saldo final - saldo inicial.
+-- É atualizado pelo carregador (data_loading/data_loading_py.py) na mesma transação em que cada
+-- trimestre é carregado, recalculando só aquele trimestre; para preencher o resumo de uma tabela que
+-- já estava carregada, rode o carregador com --rollup.
+-- TRIMESTRE é a primeira data do trimestre: os CSVs da ANS têm uma única DATA por trimestre.
+
+CREATE TABLE despesas_trimestrais (
+    REG_ANS VARCHAR(50) NOT NULL,
+    TRIMESTRE DATE NOT NULL,
+    ID_CONTA INT NOT NULL,
+    DESPESA NUMERIC,
+    LINHAS INT NOT NULL,
+    PRIMARY KEY (TRIMESTRE, REG_ANS, ID_CONTA)
+);
+
+CREATE INDEX idx_despesas_trimestrais_conta ON despesas_trimestrais (ID_CONTA, TRIMESTRE);
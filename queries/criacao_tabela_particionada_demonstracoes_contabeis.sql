@@ -0,0 +1,25 @@
+-- demonstracoes_contabeis particionada por trimestre (PostgreSQL 11+).
+-- Com uma partição por trimestre, o filtro "DATA >= (SELECT MAX(DATA) ...) - INTERVAL" dos relatórios
+-- só lê as partições do período pedido, por mais anos de histórico que a tabela tenha.
+--
+-- As partições (demonstracoes_contabeis_2023t1, demonstracoes_contabeis_2023t2, ...) são criadas pelo
+-- carregador (data_loading/data_loading_py.py) antes de carregar cada trimestre novo. Para criar uma à mão:
+-- CREATE TABLE demonstracoes_contabeis_2023t1 PARTITION OF demonstracoes_contabeis FOR VALUES FROM ('2023-01-01') TO ('2023-04-01');
+--
+-- Para particionar uma tabela já carregada: renomeie-a para demonstracoes_contabeis_antiga, rode este script,
+-- carregue os CSVs com o carregador (ou crie as partições e copie as linhas com INSERT INTO ... SELECT)
+-- e apague a tabela antiga.
+
+CREATE TABLE demonstracoes_contabeis (
+    DATA DATE NOT NULL,
+    REG_ANS VARCHAR(50) NOT NULL,
+    ID_CONTA INT NOT NULL,
+    VL_SALDO_INICIAL NUMERIC,
+    VL_SALDO_FINAL NUMERIC,
+    PRIMARY KEY (DATA, REG_ANS, ID_CONTA)
+) PARTITION BY RANGE (DATA);
+
+-- O índice é o mesmo de criacao_tabela_postgre_demonstracoes_contabeis.sql e é criado também em cada partição,
+-- inclusive nas futuras. O filtro por data dos relatórios escolhe as partições; dentro delas, o índice acha as
+-- linhas da conta.
+CREATE INDEX idx_demonstracoes_conta ON demonstracoes_contabeis (ID_CONTA, DATA);
@@ -1,9 +1,13 @@
+-- A conta de cada linha é a chave inteira da tabela contas (criacao_tabela_contas.sql), que guarda o
+-- código e a descrição normalizada: a descrição não é repetida em cada linha e os filtros por conta
+-- comparam inteiros, pelo índice idx_demonstracoes_conta.
 CREATE TABLE demonstracoes_contabeis (
     DATA DATE NOT NULL,
     REG_ANS VARCHAR(50) NOT NULL,
-    CD_CONTA_CONTABIL VARCHAR(50) NOT NULL,
-    DESCRICAO TEXT,
-    VL_SALDO_INICIAL TEXT,
-    VL_SALDO_FINAL TEXT,
-    PRIMARY KEY (DATA, REG_ANS, CD_CONTA_CONTABIL)
+    ID_CONTA INT NOT NULL,
+    VL_SALDO_INICIAL NUMERIC,
+    VL_SALDO_FINAL NUMERIC,
+    PRIMARY KEY (DATA, REG_ANS, ID_CONTA)
 );
+
+CREATE INDEX idx_demonstracoes_conta ON demonstracoes_contabeis (ID_CONTA, DATA);
@@ -1,31 +1,27 @@
 --item 3.5, ultimo trimestre
+-- VL_SALDO_INICIAL e VL_SALDO_FINAL são NUMERIC (veja data_loading/data_loading_py.py, migrar_para_numerico),
+-- então a despesa é calculada direto nas colunas, sem converter o texto de cada linha.
+-- A conta 411 (EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR) é achada
+-- pelo código na tabela contas, e as linhas são filtradas pela chave inteira ID_CONTA, sem comparar texto.
+-- O código é o mesmo de CONTA_DESPESAS em data_loading/data_loading_py.py, usado também pelo cálculo direto dos CSVs;
+-- ao trocá-lo, troque nos dois lugares (e em query_maiores_despesas_resumo.sql).
+-- As mesmas consultas, lidas do resumo por trimestre, estão em query_maiores_despesas_resumo.sql.
 
 
-WITH dados_convertidos AS (
-    SELECT 
-        e.Razao_Social,
-        e.Nome_Fantasia,
-        e.Registro_ANS,
-        dc.DATA,
-        CAST(REPLACE(dc.VL_SALDO_FINAL, ',', '.') AS NUMERIC) AS saldo_final,
-        CAST(REPLACE(dc.VL_SALDO_INICIAL, ',', '.') AS NUMERIC) AS saldo_inicial
-    FROM 
-        demonstracoes_contabeis dc
-    JOIN 
-        Empresas e ON dc.REG_ANS = e.Registro_ANS
-    WHERE 
-        dc.DESCRICAO = 'EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS  DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR '
-        AND dc.DATA >= (SELECT MAX(DATA) FROM demonstracoes_contabeis) - INTERVAL '3 months'
-)
 SELECT 
-    Registro_ANS,
-    Razao_Social,
-    Nome_Fantasia,
-    SUM(saldo_final - saldo_inicial) AS despesa_total
+    e.Registro_ANS,
+    e.Razao_Social,
+    e.Nome_Fantasia,
+    SUM(dc.VL_SALDO_FINAL - dc.VL_SALDO_INICIAL) AS despesa_total
 FROM 
-    dados_convertidos
+    demonstracoes_contabeis dc
+JOIN 
+    Empresas e ON dc.REG_ANS = e.Registro_ANS
+WHERE 
+    dc.ID_CONTA IN (SELECT ID_CONTA FROM contas WHERE CD_CONTA_CONTABIL = '411')
+    AND dc.DATA >= (SELECT MAX(DATA) FROM demonstracoes_contabeis) - INTERVAL '3 months'
 GROUP BY 
-    Registro_ANS, Razao_Social, Nome_Fantasia
+    e.Registro_ANS, e.Razao_Social, e.Nome_Fantasia
 ORDER BY 
     despesa_total DESC
 LIMIT 10;
@@ -37,31 +33,20 @@ LIMIT 10;
 ---------- 1 ano
 
 
-WITH dados_convertidos AS (
-    SELECT 
-        e.Razao_Social,
-        e.Nome_Fantasia,
-        e.Registro_ANS,
-        dc.DATA,
-        CAST(REPLACE(dc.VL_SALDO_FINAL, ',', '.') AS NUMERIC) AS saldo_final,
-        CAST(REPLACE(dc.VL_SALDO_INICIAL, ',', '.') AS NUMERIC) AS saldo_inicial
-    FROM 
-        demonstracoes_contabeis dc
-    JOIN 
-        Empresas e ON dc.REG_ANS = e.Registro_ANS
-    WHERE 
-        dc.DESCRICAO = 'EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS  DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR '
-        AND dc.DATA >= (SELECT MAX(DATA) FROM demonstracoes_contabeis) - INTERVAL '1 year'
-)
 SELECT 
-    Registro_ANS,
-    Razao_Social,
-    Nome_Fantasia,
-    SUM(saldo_final - saldo_inicial) AS despesa_total
+    e.Registro_ANS,
+    e.Razao_Social,
+    e.Nome_Fantasia,
+    SUM(dc.VL_SALDO_FINAL - dc.VL_SALDO_INICIAL) AS despesa_total
 FROM 
-    dados_convertidos
+    demonstracoes_contabeis dc
+JOIN 
+    Empresas e ON dc.REG_ANS = e.Registro_ANS
+WHERE 
+    dc.ID_CONTA IN (SELECT ID_CONTA FROM contas WHERE CD_CONTA_CONTABIL = '411')
+    AND dc.DATA >= (SELECT MAX(DATA) FROM demonstracoes_contabeis) - INTERVAL '1 year'
 GROUP BY 
-    Registro_ANS, Razao_Social, Nome_Fantasia
+    e.Registro_ANS, e.Razao_Social, e.Nome_Fantasia
 ORDER BY 
     despesa_total DESC
-LIMIT 10;
\ No newline at end of file
+LIMIT 10;
@@ -1,3 +1,8 @@
+-- Para carregar todos os trimestres de uma pasta em paralelo, com os valores já convertidos
+-- para o formato numérico e pulando os arquivos já carregados, use data_loading/data_loading_py.py.
+-- Os COPY abaixo só funcionam na tabela antiga, com os valores em TEXT: o COPY não converte "1234,56"
+-- para NUMERIC.
+
 COPY demonstracoes_contabeis(DATA, REG_ANS, CD_CONTA_CONTABIL, DESCRICAO, VL_SALDO_INICIAL, VL_SALDO_FINAL)
 FROM 'C:/tmp/1T2023.csv' 
 WITH (FORMAT csv, DELIMITER ';', HEADER true, QUOTE '"');
@@ -1,3 +1,7 @@
+-- Para recarregar o cadastro aplicando só as operadoras inseridas, alteradas e removidas desde a última
+-- carga (este COPY falha se a tabela já tiver as linhas, pela chave primária), use
+-- data_loading/data_loading_py.py --cadop Relatorio_cadop.csv.
+
 COPY Empresas (
     Registro_ANS, 
     CNPJ, 
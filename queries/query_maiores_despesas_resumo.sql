@@ -0,0 +1,48 @@
+--item 3.5, ultimo trimestre
+-- Mesmos relatórios de "desafio - query_maiores_despesas.sql", lidos do resumo despesas_trimestrais:
+-- cada operadora tem uma linha por trimestre e conta, então o tempo não cresce com o histórico.
+-- A conta é a de código CONTA_DESPESAS (data_loading/data_loading_py.py).
+
+
+SELECT 
+    e.Registro_ANS,
+    e.Razao_Social,
+    e.Nome_Fantasia,
+    SUM(r.DESPESA) AS despesa_total
+FROM 
+    despesas_trimestrais r
+JOIN 
+    Empresas e ON r.REG_ANS = e.Registro_ANS
+WHERE 
+    r.ID_CONTA IN (SELECT ID_CONTA FROM contas WHERE CD_CONTA_CONTABIL = '411')
+    AND r.TRIMESTRE >= (SELECT MAX(TRIMESTRE) FROM despesas_trimestrais) - INTERVAL '3 months'
+GROUP BY 
+    e.Registro_ANS, e.Razao_Social, e.Nome_Fantasia
+ORDER BY 
+    despesa_total DESC
+LIMIT 10;
+
+
+
+
+
+---------- 1 ano
+
+
+SELECT 
+    e.Registro_ANS,
+    e.Razao_Social,
+    e.Nome_Fantasia,
+    SUM(r.DESPESA) AS despesa_total
+FROM 
+    despesas_trimestrais r
+JOIN 
+    Empresas e ON r.REG_ANS = e.Registro_ANS
+WHERE 
+    r.ID_CONTA IN (SELECT ID_CONTA FROM contas WHERE CD_CONTA_CONTABIL = '411')
+    AND r.TRIMESTRE >= (SELECT MAX(TRIMESTRE) FROM despesas_trimestrais) - INTERVAL '1 year'
+GROUP BY 
+    e.Registro_ANS, e.Razao_Social, e.Nome_Fantasia
+ORDER BY 
+    despesa_total DESC
+LIMIT 10;
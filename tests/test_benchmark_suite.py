@@ -0,0 +1,58 @@
+import json
+import pytest
+
+from benchmark_suite.benchmark_suite_py import executar_suite, comparar_resultados, main
+from benchmark_suite.dados_sinteticos import gerar_pagina_html
+from web_scraping.web_scraping_py import extrair_links_pdfs
+
+PARAMETROS = {"paginas": 2, "linhas_por_pagina": 3, "blocos_html": 100, "operadoras": 12, "contas": 3, "trimestres": 4}
+
+
+def resultados(**tempos):
+    return {"parametros": PARAMETROS, "medicoes": {etapa: {"minimo": tempo, "mediana": tempo} for etapa, tempo in tempos.items()}}
+
+
+## 1. Testes para os dados sintéticos
+def test_gerar_pagina_html():
+    """Testa se os links dos anexos da página sintética são encontrados pelo scraper"""
+    html = gerar_pagina_html({"Anexo I": "/a1.pdf", "Anexo II": "/a2.pdf"}, blocos=10)
+    assert extrair_links_pdfs(html, "http://local") == {"Anexo I": "http://local/a1.pdf", "Anexo II": "http://local/a2.pdf"}
+
+
+## 2. Testes para a suíte de benchmark
+def test_executar_suite(tmp_path):
+    """Testa uma execução pequena da suíte com todas as etapas medidas"""
+    resultado = executar_suite(str(tmp_path), repeticoes=1, **PARAMETROS)
+    assert resultado["parametros"] == PARAMETROS
+    assert set(resultado["medicoes"]) == {
+        "obter_conteudo", "extrair_links_pdfs", "descobrir_links_pdfs", "baixar_pdf", "compactar_pdfs",
+        "extrair_tabela_pdf", "salvar_csv", "compactar_csv", "relatorios_sql", "relatorios_csv",
+    }
+    assert all(medicao["minimo"] > 0 for medicao in resultado["medicoes"].values())
+    json.dumps(resultado)
+
+
+def test_comparar_resultados():
+    """Testa a detecção das etapas que ficaram mais lentas que o limite"""
+    referencia = resultados(baixar_pdf=1.0, compactar_csv=1.0)
+    assert comparar_resultados(resultados(baixar_pdf=1.15, compactar_csv=0.5), referencia) == []
+    assert comparar_resultados(resultados(baixar_pdf=1.5, compactar_csv=1.0, nova=9.0), referencia) == [("baixar_pdf", 1.0, 1.5)]
+
+    # Diferenças de poucos milissegundos não contam, mesmo acima do limite relativo
+    assert comparar_resultados(resultados(baixar_pdf=0.008), resultados(baixar_pdf=0.005)) == []
+
+    outra = dict(referencia, parametros=dict(PARAMETROS, paginas=50))
+    with pytest.raises(Exception, match="outros parâmetros"):
+        comparar_resultados(resultados(baixar_pdf=1.0), outra)
+
+
+def test_main_sai_com_erro_na_regressao(tmp_path):
+    """Testa o código de saída com e sem referência"""
+    saida, referencia = tmp_path / "atual.json", tmp_path / "referencia.json"
+    assert main(str(saida), str(referencia), repeticoes=1, **PARAMETROS) == 0
+
+    gravado = json.loads(saida.read_text(encoding="utf-8"))
+    for medicao in gravado["medicoes"].values():
+        medicao["minimo"] /= 100
+    referencia.write_text(json.dumps(gravado), encoding="utf-8")
+    assert main(str(saida), str(referencia), repeticoes=1, **PARAMETROS) == 1
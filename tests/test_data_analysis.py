@@ -0,0 +1,136 @@
+import os
+import pytest
+import pandas as pd
+from datetime import date
+from decimal import Decimal
+
+from data_analysis.data_analysis_py import (
+    converter_centavos,
+    subtrair_meses,
+    ler_operadoras,
+    maiores_despesas,
+)
+from data_analysis.benchmark_relatorio import executar_benchmark
+from data_loading.data_loading_py import carregar_trimestres, conexao_sqlite, CONSULTAS_PATH
+from tests.test_data_loading import (
+    DESCRICAO_DESPESAS,
+    gerar_csv_trimestral,
+    criar_banco_sqlite,
+    criar_tabelas_relatorio,
+    executar_consultas,
+)
+
+
+def gerar_cadop(caminho, operadoras, repetidas=()):
+    """Gera um Relatorio_cadop.csv com as operadoras 300000, 300001, ...; as repetidas aparecem duas vezes."""
+    linhas = ['"Registro_ANS";"CNPJ";"Razao_Social";"Nome_Fantasia";"Modalidade"']
+    for i in list(range(operadoras)) + list(repetidas):
+        linhas.append(f'"{300000 + i}";"{i:014d}";"OPERADORA {i}";"PLANO {i}";"Cooperativa Médica"')
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+    return caminho
+
+
+## 1. Testes para as conversões
+def test_converter_centavos():
+    """Testa a conversão vetorizada dos valores para inteiros em centavos"""
+    valores = converter_centavos(pd.Series(["1234,56", "1.234,5", "-0,05", "", "10", "7.25"]))
+    
+    assert valores.tolist()[:3] == [123456, 123450, -5]
+    assert pd.isna(valores[3])
+    assert valores.tolist()[4:] == [1000, 725]
+
+def test_converter_centavos_casas_demais():
+    """Testa se valores com mais casas decimais que a escala são recusados"""
+    with pytest.raises(Exception, match="casas decimais"):
+        converter_centavos(pd.Series(["1,234"]))
+
+def test_subtrair_meses():
+    """Testa a subtração de meses no fim do mês, como no PostgreSQL"""
+    assert subtrair_meses(date(2024, 5, 31), 3) == date(2024, 2, 29)
+    assert subtrair_meses(date(2024, 1, 1), 12) == date(2023, 1, 1)
+
+## 2. Testes para os relatórios
+def test_maiores_despesas_igual_sql(tmp_path):
+    """Testa se os relatórios calculados dos CSVs, lidos em blocos, são iguais aos das consultas SQL"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    for ano, trimestre in [(2023, 1), (2023, 2), (2023, 3), (2023, 4), (2024, 1)]:
+        gerar_csv_trimestral(str(dados / f"{trimestre}T{ano}.csv"), ano, trimestre, operadoras=14,
+                             formato_data="br" if trimestre == 2 else "iso")
+    cadop = gerar_cadop(str(dados / "Relatorio_cadop.csv"), operadoras=14)
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    criar_tabelas_relatorio(banco, operadoras=14, resumo=False)
+    carregar_trimestres(conexao_sqlite(banco), str(dados), str(dados / "manifesto_carga.json"))
+    
+    relatorios = maiores_despesas(str(dados), cadop, tamanho_bloco=7)
+    
+    sql = executar_consultas(banco, CONSULTAS_PATH)
+    assert [[linha[:3] + (float(linha[3]),) for linha in relatorio] for relatorio in relatorios] == sql
+    assert all(isinstance(linha[3], Decimal) for relatorio in relatorios for linha in relatorio)
+
+def test_maiores_despesas_valores_exatos(tmp_path):
+    """Testa a soma exata, os valores vazios, as operadoras fora do cadastro e as repetidas no cadastro"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    (dados / "4T2023.csv").write_text(
+        '"DATA";"REG_ANS";"CD_CONTA_CONTABIL";"DESCRICAO";"VL_SALDO_INICIAL";"VL_SALDO_FINAL"\n'
+        f'"2023-10-01";"300000";"411";"{DESCRICAO_DESPESAS}";"0,10";"0,30"\n'
+        f'"2023-10-01";"300000";"411";"{DESCRICAO_DESPESAS}";"0,10";""\n'
+        f'"2023-10-01";"300001";"411";"{DESCRICAO_DESPESAS}";"1,00";"1.001,01"\n'
+        f'"2023-10-01";"300002";"411";"{DESCRICAO_DESPESAS}";"";""\n'
+        f'"2023-10-01";"399999";"411";"{DESCRICAO_DESPESAS}";"0";"99999"\n'
+        '"2023-10-01";"300001";"411";"EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS";"0";"0,99"\n'
+        f'"2023-10-01";"300003";"4111";"{DESCRICAO_DESPESAS}";"0";"7000"\n'
+        '"2023-10-01";"300003";"101";"ATIVO";"0";"5000"\n',
+        encoding="utf-8",
+    )
+    cadop = gerar_cadop(str(dados / "Relatorio_cadop.csv"), operadoras=4, repetidas=[0])
+    
+    tres_meses, um_ano = maiores_despesas(str(dados), cadop)
+    
+    assert tres_meses == um_ano == [
+        ("300002", "OPERADORA 2", "PLANO 2", None),
+        ("300001", "OPERADORA 1", "PLANO 1", Decimal("1001.00")),
+        ("300000", "OPERADORA 0", "PLANO 0", Decimal("0.40")),
+    ]
+
+def test_maiores_despesas_conta_pelo_codigo_igual_sql(tmp_path):
+    """Testa que a conta é escolhida pelo código, como no SQL, quando o código e a descrição não batem"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    (dados / "1T2024.csv").write_text(
+        '"DATA";"REG_ANS";"CD_CONTA_CONTABIL";"DESCRICAO";"VL_SALDO_INICIAL";"VL_SALDO_FINAL"\n'
+        f'"2024-01-01";"300000";"411";"{DESCRICAO_DESPESAS.strip()} - CARTEIRA";"0";"100"\n'
+        f'"2024-01-01";"300001";"4111";"{DESCRICAO_DESPESAS}";"0";"50"\n'
+        f'"2024-01-01";"300002";"411";"{DESCRICAO_DESPESAS}";"10";"30"\n',
+        encoding="utf-8",
+    )
+    cadop = gerar_cadop(str(dados / "Relatorio_cadop.csv"), operadoras=3)
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    criar_tabelas_relatorio(banco, operadoras=3, resumo=False)
+    carregar_trimestres(conexao_sqlite(banco), str(dados), str(dados / "manifesto_carga.json"))
+    
+    relatorios = maiores_despesas(str(dados), cadop)
+    
+    assert relatorios[0] == [
+        ("300000", "OPERADORA 0", "PLANO 0", Decimal("100.00")),
+        ("300002", "OPERADORA 2", "PLANO 2", Decimal("20.00")),
+    ]
+    sql = executar_consultas(banco, CONSULTAS_PATH)
+    assert [[linha[:3] + (float(linha[3]),) for linha in relatorio] for relatorio in relatorios] == sql
+
+def test_ler_operadoras(tmp_path):
+    """Testa a leitura do cadastro, com uma entrada por linha do registro"""
+    cadop = gerar_cadop(str(tmp_path / "Relatorio_cadop.csv"), operadoras=2, repetidas=[1])
+    
+    assert ler_operadoras(cadop) == {
+        "300000": [("OPERADORA 0", "PLANO 0")],
+        "300001": [("OPERADORA 1", "PLANO 1"), ("OPERADORA 1", "PLANO 1")],
+    }
+
+def test_benchmark_relatorio():
+    """Testa se o benchmark compara os dois caminhos e registra os tempos"""
+    tempos = executar_benchmark(operadoras=30, contas=3, trimestres=5)
+    
+    assert set(tempos) == {"sem_banco", "carga", "consultas"}
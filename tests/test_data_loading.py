@@ -0,0 +1,566 @@
+import os
+import json
+import sqlite3
+import pytest
+from datetime import date
+
+from data_loading.data_loading_py import (
+    trimestre_do_arquivo,
+    intervalo_trimestre,
+    encontrar_arquivos_trimestrais,
+    converter_decimal,
+    converter_data,
+    ler_linhas_convertidas,
+    copiar_linhas,
+    carregar_trimestres,
+    conexao_sqlite,
+    migrar_para_numerico,
+    migrar_para_contas,
+    normalizar_descricao,
+    internar_contas,
+    ler_consultas,
+    adaptar_para_sqlite,
+    nome_particao,
+    criar_particoes,
+    particoes_lidas,
+    atualizar_resumo,
+    ler_cadop,
+    sincronizar_empresas,
+    COLUNAS_EMPRESAS,
+    CONSULTAS_PATH,
+    CONSULTAS_RESUMO_PATH,
+    CONTA_DESPESAS,
+)
+from data_loading.benchmark_consultas import DDL_TEXTO, consultas_em_texto, executar_benchmark
+
+QUERIES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "queries")
+
+DESCRICAO_DESPESAS = "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS  DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR "
+
+
+def gerar_csv_trimestral(caminho, ano, trimestre, operadoras=5, contas=4, formato_data="iso"):
+    """
+    Gera um CSV trimestral no formato publicado pela ANS (separado por ";", valores com vírgula).
+    Cada operadora tem uma linha por conta; a conta 411 é a de despesas com eventos/sinistros.
+    """
+    mes = 3 * (trimestre - 1) + 1
+    data = f"{ano}-{mes:02d}-01" if formato_data == "iso" else f"01/{mes:02d}/{ano}"
+    linhas = ['"DATA";"REG_ANS";"CD_CONTA_CONTABIL";"DESCRICAO";"VL_SALDO_INICIAL";"VL_SALDO_FINAL"']
+    for operadora in range(operadoras):
+        reg_ans = 300000 + operadora
+        for conta in range(contas):
+            codigo = 411 if conta == 0 else 100 + conta
+            descricao = DESCRICAO_DESPESAS if conta == 0 else f"CONTA {conta}"
+            inicial = f"{operadora * 1000 + conta * 10 + trimestre},{operadora % 100:02d}"
+            final = f"{operadora * 1500 + conta * 25 + ano % 100 * trimestre},5"
+            linhas.append(f'"{data}";"{reg_ans}";"{codigo}";"{descricao}";"{inicial}";"{final}"')
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+    return caminho
+
+
+def criar_banco_sqlite(caminho, esquema_antigo=False):
+    """
+    Cria o banco SQLite com as mesmas tabelas dos scripts de criação do PostgreSQL.
+    Com esquema_antigo, usa o esquema anterior à migração: código e descrição da conta em cada linha
+    e VL_SALDO_* em TEXT.
+    """
+    ddl = DDL_TEXTO + ";\n"
+    if not esquema_antigo:
+        with open(os.path.join(QUERIES_DIR, "criacao_tabela_postgre_demonstracoes_contabeis.sql"), encoding="utf-8") as f:
+            ddl = f.read() + ";\n"
+    with open(os.path.join(QUERIES_DIR, "criacao_tabela_contas.sql"), encoding="utf-8") as f:
+        ddl += f.read()
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(ddl)
+    conexao.close()
+    return caminho
+
+
+def criar_tabelas_relatorio(caminho, operadoras=5, resumo=True):
+    """Cria no banco SQLite a tabela Empresas, com as operadoras dos CSVs gerados, e a tabela de resumo."""
+    with open(os.path.join(QUERIES_DIR, "query_criacao_tabela_empresas.sql"), encoding="utf-8") as f:
+        ddl = f.read()
+    if resumo:
+        with open(os.path.join(QUERIES_DIR, "criacao_tabela_despesas_trimestrais.sql"), encoding="utf-8") as f:
+            ddl += ";\n" + f.read()
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(ddl)
+    conexao.executemany(
+        "INSERT INTO Empresas (Registro_ANS, CNPJ, Razao_Social, Nome_Fantasia) VALUES (?, ?, ?, ?)",
+        [(str(300000 + i), f"{i:014d}", f"OPERADORA {i}", f"PLANO {i}") for i in range(operadoras)],
+    )
+    conexao.commit()
+    conexao.close()
+
+
+def executar_consultas(caminho, arquivo_consultas):
+    """Executa no banco SQLite as consultas do arquivo, adaptadas ao SQLite, e retorna os resultados."""
+    conexao = sqlite3.connect(caminho)
+    resultados = [conexao.execute(adaptar_para_sqlite(consulta)).fetchall() for consulta in ler_consultas(arquivo_consultas)]
+    conexao.close()
+    return [[linha[:-1] + (round(linha[-1], 2),) for linha in resultado] for resultado in resultados]
+
+
+## 1. Testes para as conversões
+def test_converter_decimal():
+    """Testa a conversão dos valores no formato brasileiro"""
+    assert converter_decimal("1234,56") == "1234.56"
+    assert converter_decimal("1.234,56") == "1234.56"
+    assert converter_decimal("-0,5") == "-0.5"
+    assert converter_decimal("10.5") == "10.5"
+    assert converter_decimal(" ") is None
+
+def test_converter_data():
+    """Testa a conversão das datas para o formato ISO"""
+    assert converter_data("01/04/2023") == "2023-04-01"
+    assert converter_data("2023-04-01") == "2023-04-01"
+
+def test_trimestre_do_arquivo():
+    """Testa a identificação do trimestre pelo nome do arquivo"""
+    assert trimestre_do_arquivo("1T2023.csv") == (2023, 1)
+    assert trimestre_do_arquivo("/tmp/2t2024.csv") == (2024, 2)
+    assert trimestre_do_arquivo("Relatorio_cadop.csv") is None
+    assert intervalo_trimestre(2023, 4) == (date(2023, 10, 1), date(2024, 1, 1))
+
+def test_encontrar_arquivos_trimestrais(tmp_path):
+    """Testa se só os CSVs trimestrais são encontrados, em ordem cronológica"""
+    for nome in ["1T2024.csv", "4T2023.csv", "2t2023.csv", "Relatorio_cadop.csv", "notas.txt"]:
+        (tmp_path / nome).write_text("")
+    
+    arquivos = encontrar_arquivos_trimestrais(str(tmp_path))
+    
+    assert [os.path.basename(a) for a in arquivos] == ["2t2023.csv", "4T2023.csv", "1T2024.csv"]
+
+def test_ler_linhas_convertidas(tmp_path):
+    """Testa se as linhas são lidas com datas e valores convertidos"""
+    caminho = gerar_csv_trimestral(str(tmp_path / "2T2023.csv"), 2023, 2, operadoras=2, contas=2, formato_data="br")
+    
+    linhas = list(ler_linhas_convertidas(caminho))
+    
+    assert len(linhas) == 4
+    assert linhas[0] == ["2023-04-01", "300000", "411", DESCRICAO_DESPESAS, "2.00", "46.5"]
+
+## 2. Testes para o envio das linhas
+def test_copiar_linhas_copy_expert():
+    """Testa se, com o psycopg2, as linhas são enviadas por COPY FROM STDIN em CSV"""
+    recebido = {}
+    
+    class CursorCopy:
+        def copy_expert(self, sql, arquivo):
+            recebido["sql"] = sql
+            recebido["texto"] = "".join(iter(lambda: arquivo.read(7), ""))
+    
+    class ConexaoCopy:
+        def cursor(self):
+            return CursorCopy()
+    
+    total = copiar_linhas(ConexaoCopy(), [["2023-01-01", "1", "411", 'A;"B"', "1.5", None]] * 3)
+    
+    assert total == 3
+    assert recebido["sql"].startswith("COPY demonstracoes_contabeis (DATA, REG_ANS")
+    assert "FROM STDIN" in recebido["sql"]
+    assert recebido["texto"] == '2023-01-01;1;411;"A;""B""";1.5;\n' * 3
+
+## 3. Testes para a carga dos trimestres
+def test_carregar_trimestres_sqlite(tmp_path):
+    """Testa a carga paralela no SQLite, o relatório de linhas/s e o manifesto"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    for ano, trimestre in [(2023, 1), (2023, 2), (2023, 3), (2024, 1)]:
+        gerar_csv_trimestral(str(dados / f"{trimestre}T{ano}.csv"), ano, trimestre)
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    manifesto = str(dados / "manifesto_carga.json")
+    
+    resumo = carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto, num_conexoes=3)
+    
+    assert resumo["linhas"] == 4 * 5 * 4
+    assert len(resumo["carregados"]) == 4 and resumo["pulados"] == []
+    assert resumo["linhas_por_segundo"] > 0
+    conexao = sqlite3.connect(banco)
+    assert conexao.execute("SELECT COUNT(*) FROM demonstracoes_contabeis").fetchone()[0] == 80
+    assert conexao.execute(
+        "SELECT VL_SALDO_INICIAL FROM demonstracoes_contabeis JOIN contas USING (ID_CONTA) "
+        "WHERE DATA = '2023-04-01' AND REG_ANS = '300001' AND CD_CONTA_CONTABIL = '101'"
+    ).fetchone()[0] == 1012.01
+    conexao.close()
+    with open(manifesto, encoding="utf-8") as f:
+        assert set(json.load(f)) == {"1T2023.csv", "2T2023.csv", "3T2023.csv", "1T2024.csv"}
+
+def test_carregar_trimestres_pula_arquivos_carregados(tmp_path):
+    """Testa se arquivos já carregados são pulados e se um arquivo alterado substitui o seu trimestre"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    gerar_csv_trimestral(str(dados / "1T2023.csv"), 2023, 1)
+    gerar_csv_trimestral(str(dados / "2T2023.csv"), 2023, 2)
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    manifesto = str(dados / "manifesto_carga.json")
+    carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto)
+    
+    # Sem mudanças, nada é carregado de novo (a chave primária impediria uma segunda carga)
+    resumo = carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto)
+    assert resumo["linhas"] == 0 and len(resumo["pulados"]) == 2
+    
+    # O 2º trimestre foi republicado com mais operadoras; um novo trimestre chegou
+    gerar_csv_trimestral(str(dados / "2T2023.csv"), 2023, 2, operadoras=7)
+    gerar_csv_trimestral(str(dados / "3T2023.csv"), 2023, 3)
+    resumo = carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto)
+    
+    assert [os.path.basename(c) for c in resumo["carregados"]] == ["2T2023.csv", "3T2023.csv"]
+    conexao = sqlite3.connect(banco)
+    contagem = dict(conexao.execute("SELECT DATA, COUNT(*) FROM demonstracoes_contabeis GROUP BY DATA").fetchall())
+    conexao.close()
+    assert contagem == {"2023-01-01": 20, "2023-04-01": 28, "2023-07-01": 20}
+
+def test_carregar_trimestres_falha_desfaz_arquivo(tmp_path):
+    """Testa se um arquivo com erro não deixa linhas pela metade nem entra no manifesto"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    (dados / "1T2023.csv").write_text('"DATA";"REG_ANS"\n"2023-01-01";"1"\n', encoding="utf-8")
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    manifesto = str(dados / "manifesto_carga.json")
+    
+    with pytest.raises(Exception, match="Colunas ausentes"):
+        carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto)
+    
+    assert not os.path.exists(manifesto)
+
+## 4. Testes para a migração para NUMERIC
+def test_migrar_para_numerico(tmp_path):
+    """Testa a conversão em lotes das colunas de valores, sem perder linhas, e a segunda execução sem efeito"""
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"), esquema_antigo=True)
+    conexao = sqlite3.connect(banco)
+    conexao.executemany(
+        "INSERT INTO demonstracoes_contabeis VALUES (?, ?, ?, ?, ?, ?)",
+        [("2023-01-01", str(300000 + i), "411", "CONTA", f"{i},5", "" if i == 3 else f"-{i}0,25") for i in range(25)],
+    )
+    conexao.commit()
+    conexao.close()
+    
+    convertidas = migrar_para_numerico(conexao_sqlite(banco), tamanho_lote=7)
+    
+    assert convertidas == 25
+    conexao = sqlite3.connect(banco)
+    tipos = {linha[1]: linha[2] for linha in conexao.execute("PRAGMA table_info(demonstracoes_contabeis)")}
+    assert tipos["VL_SALDO_INICIAL"] == tipos["VL_SALDO_FINAL"] == "NUMERIC"
+    assert "VL_SALDO_INICIAL_NUM" not in tipos
+    linhas = dict((reg, (inicial, final)) for reg, inicial, final in conexao.execute(
+        "SELECT REG_ANS, VL_SALDO_INICIAL, VL_SALDO_FINAL FROM demonstracoes_contabeis"))
+    conexao.close()
+    assert len(linhas) == 25
+    assert linhas["300002"] == (2.5, -20.25)
+    assert linhas["300003"] == (3.5, None)
+    assert migrar_para_numerico(conexao_sqlite(banco)) == 0
+
+def test_migrar_para_numerico_retoma(tmp_path):
+    """Testa se a migração interrompida é retomada, convertendo também as linhas gravadas depois"""
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"), esquema_antigo=True)
+    conexao = sqlite3.connect(banco)
+    conexao.executemany(
+        "INSERT INTO demonstracoes_contabeis VALUES (?, ?, ?, ?, ?, ?)",
+        [("2023-01-01", str(i), "411", "CONTA", "1,5", "2,5") for i in range(10)],
+    )
+    # Estado de uma migração interrompida: as novas colunas existem e só parte delas foi preenchida
+    conexao.execute("ALTER TABLE demonstracoes_contabeis ADD COLUMN VL_SALDO_INICIAL_NUM NUMERIC")
+    conexao.execute("ALTER TABLE demonstracoes_contabeis ADD COLUMN VL_SALDO_FINAL_NUM NUMERIC")
+    conexao.execute("UPDATE demonstracoes_contabeis SET VL_SALDO_INICIAL_NUM = 1.5, VL_SALDO_FINAL_NUM = 2.5 WHERE REG_ANS < '5'")
+    conexao.execute("INSERT INTO demonstracoes_contabeis (DATA, REG_ANS, CD_CONTA_CONTABIL, VL_SALDO_INICIAL, VL_SALDO_FINAL) "
+                    "VALUES ('2023-04-01', '1', '411', '7,0', '9,0')")
+    conexao.commit()
+    conexao.close()
+    
+    assert migrar_para_numerico(conexao_sqlite(banco), tamanho_lote=4) == 6
+    
+    conexao = sqlite3.connect(banco)
+    assert conexao.execute("SELECT SUM(VL_SALDO_FINAL - VL_SALDO_INICIAL) FROM demonstracoes_contabeis").fetchone()[0] == 12.0
+    conexao.close()
+
+def test_consultas_maiores_despesas():
+    """Testa a leitura das duas consultas do relatório e a adaptação para o SQLite"""
+    consultas = ler_consultas()
+    
+    assert len(consultas) == 2
+    assert all("CAST(" not in consulta and "LIMIT 10" in consulta for consulta in consultas)
+    assert "DATE((SELECT MAX(DATA) FROM demonstracoes_contabeis), '-1 year')" in adaptar_para_sqlite(consultas[1])
+    assert all("ID_CONTA IN (SELECT ID_CONTA FROM contas" in consulta for consulta in consultas)
+    assert "INTERVAL '3 months'" in consultas_em_texto()[0] and "INTERVAL '1 year'" in consultas_em_texto()[1]
+
+def test_consultas_filtram_pelo_codigo_da_conta():
+    """Testa se todas as consultas dos relatórios escolhem a conta pelo código de CONTA_DESPESAS, e não pela descrição"""
+    consultas = ler_consultas() + ler_consultas(CONSULTAS_RESUMO_PATH) + consultas_em_texto()
+    
+    assert all(f"CD_CONTA_CONTABIL = '{CONTA_DESPESAS}'" in consulta for consulta in consultas)
+    assert not any("DESCRICAO =" in consulta for consulta in consultas)
+
+def test_benchmark_consultas_resultados_iguais(tmp_path):
+    """Testa se as consultas sobre o esquema atual dão o mesmo top 10 das consultas sobre o esquema antigo"""
+    resultados = executar_benchmark(conexao_sqlite(str(tmp_path / "bench.db")), operadoras=40, contas=3, trimestres=6, repeticoes=1)
+    
+    assert [nome for nome, _, _ in resultados] == ["3 meses", "1 ano"]
+
+## 5. Testes para o particionamento por trimestre
+class CursorPostgresFalso:
+    """Cursor que imita as respostas do PostgreSQL usadas na criação das partições."""
+    
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.resposta = None
+    
+    def execute(self, sql, parametros=()):
+        self.conexao.comandos.append((sql, parametros))
+        if "pg_partitioned_table" in sql:
+            self.resposta = (1 if self.conexao.particionada else 0,)
+        elif "to_regclass" in sql:
+            self.resposta = (parametros[0] not in self.conexao.existentes,)
+        elif sql.startswith("EXPLAIN"):
+            self.resposta = (self.conexao.plano,)
+    
+    def fetchone(self):
+        return self.resposta
+
+
+class ConexaoPostgresFalsa:
+    def __init__(self, particionada=True, existentes=(), plano=None):
+        self.particionada = particionada
+        self.existentes = set(existentes)
+        self.plano = plano
+        self.comandos = []
+        self.commits = 0
+    
+    def cursor(self):
+        return CursorPostgresFalso(self)
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        pass
+    
+    def close(self):
+        pass
+
+def test_criar_particoes():
+    """Testa se só as partições dos trimestres novos são criadas, com os limites do trimestre"""
+    conexao = ConexaoPostgresFalsa(existentes={"demonstracoes_contabeis_2023t1"})
+    
+    criadas = criar_particoes(lambda: conexao, [(2023, 1), (2023, 4), (2023, 4)])
+    
+    assert criadas == [nome_particao(2023, 4)] == ["demonstracoes_contabeis_2023t4"]
+    creates = [sql for sql, _ in conexao.comandos if sql.startswith("CREATE TABLE")]
+    assert creates == [
+        "CREATE TABLE demonstracoes_contabeis_2023t4 PARTITION OF demonstracoes_contabeis "
+        "FOR VALUES FROM ('2023-10-01') TO ('2024-01-01')"
+    ]
+    assert conexao.commits == 1
+
+def test_criar_particoes_tabela_sem_particionamento(tmp_path):
+    """Testa se nada é criado numa tabela comum ou no SQLite"""
+    conexao = ConexaoPostgresFalsa(particionada=False)
+    
+    assert criar_particoes(lambda: conexao, [(2023, 1)]) == []
+    assert not any(sql.startswith("CREATE") for sql, _ in conexao.comandos)
+    assert criar_particoes(conexao_sqlite(str(tmp_path / "ans.db")), [(2023, 1)]) == []
+
+def test_particoes_lidas():
+    """Testa a leitura das partições efetivamente lidas no plano da consulta"""
+    plano = [{"Plan": {"Node Type": "Limit", "Plans": [{"Node Type": "Append", "Plans": [
+        {"Node Type": "Index Scan", "Relation Name": "demonstracoes_contabeis_2024t3", "Actual Loops": 1},
+        {"Node Type": "Index Scan", "Relation Name": "demonstracoes_contabeis_2024t4", "Actual Loops": 1},
+        {"Node Type": "Seq Scan", "Relation Name": "demonstracoes_contabeis_2023t1", "Actual Loops": 0},
+    ]}]}}]
+    conexao = ConexaoPostgresFalsa(plano=json.dumps(plano))
+    
+    lidas = particoes_lidas(conexao, ler_consultas()[0])
+    
+    assert lidas == {"demonstracoes_contabeis_2024t3", "demonstracoes_contabeis_2024t4"}
+    assert conexao.comandos[0][0].startswith("EXPLAIN (ANALYZE, FORMAT JSON) SELECT")
+
+## 6. Testes para o resumo de despesas por trimestre
+def test_resumo_atualizado_a_cada_carga(tmp_path):
+    """Testa se o resumo é atualizado trimestre a trimestre e dá os mesmos relatórios que a tabela"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    for ano, trimestre in [(2023, 1), (2023, 2), (2023, 3), (2023, 4), (2024, 1)]:
+        gerar_csv_trimestral(str(dados / f"{trimestre}T{ano}.csv"), ano, trimestre, operadoras=12)
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    criar_tabelas_relatorio(banco, operadoras=12)
+    manifesto = str(dados / "manifesto_carga.json")
+    
+    carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto, num_conexoes=3)
+    
+    resumo = executar_consultas(banco, CONSULTAS_RESUMO_PATH)
+    assert resumo == executar_consultas(banco, CONSULTAS_PATH)
+    assert [len(resultado) for resultado in resumo] == [10, 10]
+    
+    # Um trimestre novo só insere as linhas dele no resumo
+    conexao = sqlite3.connect(banco)
+    antes = conexao.execute("SELECT * FROM despesas_trimestrais ORDER BY TRIMESTRE, REG_ANS, ID_CONTA").fetchall()
+    conexao.close()
+    gerar_csv_trimestral(str(dados / "2T2024.csv"), 2024, 2, operadoras=15)
+    carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto)
+    
+    conexao = sqlite3.connect(banco)
+    depois = conexao.execute("SELECT * FROM despesas_trimestrais ORDER BY TRIMESTRE, REG_ANS, ID_CONTA").fetchall()
+    conexao.close()
+    assert depois[:len(antes)] == antes
+    assert len(depois) == len(antes) + 15 * 4
+    assert executar_consultas(banco, CONSULTAS_RESUMO_PATH) != resumo
+
+def test_atualizar_resumo_tabela_ja_carregada(tmp_path):
+    """Testa o preenchimento do resumo a partir de uma tabela que já estava carregada"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    for ano, trimestre in [(2023, 3), (2023, 4), (2024, 1)]:
+        gerar_csv_trimestral(str(dados / f"{trimestre}T{ano}.csv"), ano, trimestre, operadoras=8)
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    criar_tabelas_relatorio(banco, operadoras=8, resumo=False)
+    carregar_trimestres(conexao_sqlite(banco), str(dados), str(dados / "manifesto_carga.json"))
+    with open(os.path.join(QUERIES_DIR, "criacao_tabela_despesas_trimestrais.sql"), encoding="utf-8") as f:
+        conexao = sqlite3.connect(banco)
+        conexao.executescript(f.read())
+        conexao.close()
+    
+    linhas = atualizar_resumo(conexao_sqlite(banco))
+    
+    assert linhas == 3 * 8 * 4
+    assert executar_consultas(banco, CONSULTAS_RESUMO_PATH) == executar_consultas(banco, CONSULTAS_PATH)
+
+## 7. Testes para a dimensão de contas
+def test_normalizar_descricao():
+    """Testa a normalização dos espaços da descrição"""
+    assert normalizar_descricao(DESCRICAO_DESPESAS) == "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR"
+    assert normalizar_descricao(None) == ""
+
+def test_internar_contas(tmp_path):
+    """Testa se cada conta recebe uma chave estável e se só as contas novas são gravadas"""
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    
+    primeiras = internar_contas(conexao_sqlite(banco), {("411", "EVENTOS"), ("101", "ATIVO")})
+    segundas = internar_contas(conexao_sqlite(banco), {("411", "EVENTOS"), ("102", "PASSIVO")})
+    
+    assert primeiras == {("101", "ATIVO"): 1, ("411", "EVENTOS"): 2}
+    assert segundas == {("101", "ATIVO"): 1, ("411", "EVENTOS"): 2, ("102", "PASSIVO"): 3}
+    conexao = sqlite3.connect(banco)
+    assert conexao.execute("SELECT COUNT(*) FROM contas").fetchone()[0] == 3
+    conexao.close()
+
+def test_carga_grava_chave_da_conta(tmp_path):
+    """Testa se a tabela guarda só a chave da conta e se espaços diferentes na descrição caem na mesma conta"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    gerar_csv_trimestral(str(dados / "1T2023.csv"), 2023, 1)
+    caminho = gerar_csv_trimestral(str(dados / "2T2023.csv"), 2023, 2)
+    with open(caminho, encoding="utf-8") as f:
+        texto = f.read().replace(DESCRICAO_DESPESAS, "  " + DESCRICAO_DESPESAS.replace("  ", "   "))
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(texto)
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"))
+    
+    carregar_trimestres(conexao_sqlite(banco), str(dados), str(dados / "manifesto_carga.json"))
+    
+    conexao = sqlite3.connect(banco)
+    colunas = [linha[1] for linha in conexao.execute("PRAGMA table_info(demonstracoes_contabeis)")]
+    contas = conexao.execute("SELECT CD_CONTA_CONTABIL, DESCRICAO FROM contas ORDER BY ID_CONTA").fetchall()
+    conexao.close()
+    assert colunas == ["DATA", "REG_ANS", "ID_CONTA", "VL_SALDO_INICIAL", "VL_SALDO_FINAL"]
+    assert len(contas) == 4
+    assert ("411", normalizar_descricao(DESCRICAO_DESPESAS)) in contas
+
+def test_migrar_para_contas(tmp_path):
+    """Testa a conversão de uma tabela no esquema antigo e a recusa da carga antes dela"""
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    gerar_csv_trimestral(str(dados / "1T2023.csv"), 2023, 1, operadoras=6)
+    banco = criar_banco_sqlite(str(tmp_path / "ans.db"), esquema_antigo=True)
+    criar_tabelas_relatorio(banco, operadoras=6, resumo=False)
+    conexao = sqlite3.connect(banco)
+    conexao.executemany(
+        "INSERT INTO demonstracoes_contabeis VALUES (?, ?, ?, ?, ?, ?)",
+        [("2022-10-01", str(300000 + i), "411", DESCRICAO_DESPESAS, f"{i},5", f"{i * 3},75") for i in range(6)]
+        + [("2022-10-01", str(300000 + i), "101", None, "1,0", "2,0") for i in range(6)],
+    )
+    conexao.commit()
+    conexao.close()
+    manifesto = str(dados / "manifesto_carga.json")
+    
+    with pytest.raises(Exception, match="--migrate"):
+        carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto)
+    
+    migrar_para_numerico(conexao_sqlite(banco))
+    assert migrar_para_contas(conexao_sqlite(banco)) == 12
+    assert migrar_para_contas(conexao_sqlite(banco)) == 0
+    carregar_trimestres(conexao_sqlite(banco), str(dados), manifesto)
+    
+    conexao = sqlite3.connect(banco)
+    assert conexao.execute("SELECT COUNT(*) FROM demonstracoes_contabeis").fetchone()[0] == 12 + 6 * 4
+    assert conexao.execute("SELECT COUNT(*) FROM contas WHERE CD_CONTA_CONTABIL = '411'").fetchone()[0] == 1
+    conexao.close()
+    assert executar_consultas(banco, CONSULTAS_PATH)[1][0][:3] == ("300005", "OPERADORA 5", "PLANO 5")
+
+
+## 8. Testes para a sincronização incremental da tabela Empresas
+def gerar_cadop_completo(caminho, operadoras):
+    """Gera um Relatorio_cadop.csv com todas as colunas da tabela Empresas; operadoras é uma lista de (registro, razão social)."""
+    linhas = [";".join(f'"{coluna}"' for coluna in COLUNAS_EMPRESAS)]
+    for registro, razao in operadoras:
+        valores = [registro, f"{registro:0>14}", razao, "", "Cooperativa Médica", "RUA A", "10", "", "CENTRO",
+                   "Curitiba", "PR", "80000000", "41", "33330000", "", "contato@operadora.com.br",
+                   "FULANO", "DIRETOR", "4", "15/03/2001"]
+        linhas.append(";".join(f'"{valor}"' for valor in valores))
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+    return caminho
+
+
+def criar_tabela_empresas(caminho):
+    """Cria a tabela Empresas no SQLite com o script de criação do PostgreSQL"""
+    with open(os.path.join(QUERIES_DIR, "query_criacao_tabela_empresas.sql"), "r", encoding="utf-8") as f:
+        ddl = f.read()
+    conexao = sqlite3.connect(caminho)
+    conexao.execute(ddl)
+    conexao.commit()
+    conexao.close()
+    return caminho
+
+
+def ler_empresas(caminho):
+    conexao = sqlite3.connect(caminho)
+    linhas = conexao.execute("SELECT Registro_ANS, Razao_Social, Nome_Fantasia, Data_Registro_ANS FROM Empresas ORDER BY Registro_ANS").fetchall()
+    conexao.close()
+    return linhas
+
+
+def test_ler_cadop(tmp_path):
+    """Testa a leitura do cadastro: vazios como NULL, datas em ISO e a última linha de cada chave"""
+    cadop = gerar_cadop_completo(str(tmp_path / "Relatorio_cadop.csv"), [("1", "A"), ("2", "B"), ("1", "A2")])
+    linhas = ler_cadop(cadop)
+    assert sorted(linhas) == ["1|00000000000001", "2|00000000000002"]
+    assert linhas["1|00000000000001"][2] == "A2"
+    assert linhas["1|00000000000001"][3] is None
+    assert linhas["1|00000000000001"][-1] == "2001-03-15"
+
+
+def test_sincronizar_empresas(tmp_path):
+    """Testa a primeira carga, a aplicação só das diferenças e uma nova execução sem mudanças"""
+    banco = criar_tabela_empresas(str(tmp_path / "ans.db"))
+    cadop = str(tmp_path / "Relatorio_cadop.csv")
+    snapshot = str(tmp_path / "snapshot_empresas.json")
+    
+    gerar_cadop_completo(cadop, [("1", "A"), ("2", "B"), ("3", "C")])
+    resumo = sincronizar_empresas(conexao_sqlite(banco), cadop, snapshot)
+    assert resumo == {"inseridas": 3, "alteradas": 0, "removidas": 0, "inalteradas": 0}
+    assert ler_empresas(banco)[0] == ("1", "A", None, "2001-03-15")
+    
+    # Uma linha inalterada mexida direto no banco prova que só as diferenças são aplicadas
+    conexao = sqlite3.connect(banco)
+    conexao.execute("UPDATE Empresas SET Nome_Fantasia = 'MEXIDA' WHERE Registro_ANS = '1'")
+    conexao.commit()
+    conexao.close()
+    
+    gerar_cadop_completo(cadop, [("1", "A"), ("2", "B NOVA"), ("4", "D")])
+    resumo = sincronizar_empresas(conexao_sqlite(banco), cadop, snapshot)
+    assert resumo == {"inseridas": 1, "alteradas": 1, "removidas": 1, "inalteradas": 1}
+    assert [linha[:3] for linha in ler_empresas(banco)] == [("1", "A", "MEXIDA"), ("2", "B NOVA", None), ("4", "D", None)]
+    
+    resumo = sincronizar_empresas(conexao_sqlite(banco), cadop, snapshot)
+    assert resumo == {"inseridas": 0, "alteradas": 0, "removidas": 0, "inalteradas": 3}
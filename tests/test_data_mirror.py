@@ -0,0 +1,120 @@
+import io
+import os
+import zipfile
+import pytest
+
+from data_loading.data_loading_py import encontrar_arquivos_trimestrais
+from data_mirror.data_mirror_py import listar_links, extrair_zip, espelhar_dados_abertos
+from benchmark_suite.dados_sinteticos import servidor_local
+
+RAIZ = "/FTP/PDA/demonstracoes_contabeis/"
+CADOP = "/FTP/PDA/operadoras_de_plano_de_saude_ativas/Relatorio_cadop.csv"
+
+
+def listagem(diretorio, nomes):
+    """Gera uma listagem de diretório no formato do Apache, como a do servidor de dados abertos da ANS."""
+    linhas = ['<a href="?C=N;O=D">Name</a>', '<a href="/FTP/PDA/">Parent Directory</a>']
+    linhas += [f'<a href="{nome}">{nome}</a>' for nome in nomes]
+    return f"<html><head><title>Index of {diretorio}</title></head><body><h1>Index of {diretorio}</h1><pre>{'<br>'.join(linhas)}</pre></body></html>".encode()
+
+
+def zip_trimestral(nome_csv):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr(nome_csv, '"DATA";"REG_ANS";"CD_CONTA_CONTABIL";"DESCRICAO";"VL_SALDO_INICIAL";"VL_SALDO_FINAL"\n' * 50)
+    return buffer.getvalue()
+
+
+def servidor_ans(trimestres):
+    """Arquivos do servidor: a listagem raiz com as pastas de ano, a listagem de cada ano, os ZIPs e o cadastro."""
+    anos = sorted({t[2:] for t in trimestres})
+    arquivos = {RAIZ: listagem(RAIZ, [f"{ano}/" for ano in anos] + ["leiame.txt"]), CADOP: b'"Registro_ANS";"CNPJ"\n'}
+    for ano in anos:
+        do_ano = [t for t in trimestres if t[2:] == ano]
+        arquivos[f"{RAIZ}{ano}/"] = listagem(f"{RAIZ}{ano}/", [f"{t}.zip" for t in do_ano])
+        for t in do_ano:
+            arquivos[f"{RAIZ}{ano}/{t}.zip"] = zip_trimestral(f"{t}.csv")
+    return arquivos
+
+
+def baixados(requisicoes):
+    return sorted(os.path.basename(caminho) for caminho, _ in requisicoes if caminho.endswith(".zip"))
+
+
+## 1. Testes para a leitura das listagens e dos ZIPs
+def test_listar_links():
+    """Testa que só os itens do diretório listado são devolvidos, sem ordenação nem diretório pai"""
+    html = listagem(RAIZ, ["2023/", "1T2023.zip", "sub/arquivo.zip"]).decode()
+    assert listar_links(html, f"http://ans{RAIZ}") == [
+        ("2023/", f"http://ans{RAIZ}2023/"),
+        ("1T2023.zip", f"http://ans{RAIZ}1T2023.zip"),
+    ]
+
+
+def test_extrair_zip_descarta_caminhos(tmp_path):
+    """Testa que os CSVs são extraídos só pelo nome, mesmo com caminhos internos ou '..' no ZIP"""
+    zip_path = tmp_path / "1T2023.zip"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("pasta/1T2023.csv", "a;b\n")
+        zipf.writestr("../fora.csv", "c;d\n")
+        zipf.writestr("leiame.txt", "texto")
+    destino = tmp_path / "dados"
+    destino.mkdir()
+    assert extrair_zip(str(zip_path), str(destino)) == ["1T2023.csv", "fora.csv"]
+    assert sorted(os.listdir(destino)) == ["1T2023.csv", "fora.csv"]
+
+
+## 2. Testes para o espelhamento
+def test_espelhar_so_trimestres_novos(tmp_path):
+    """Testa a primeira carga, uma nova execução sem novidades e a publicação de um novo trimestre"""
+    dados = tmp_path / "dados"
+    arquivos = servidor_ans(["3T2023", "4T2023", "1T2024"])
+    with servidor_local(arquivos) as (url, requisicoes):
+        opcoes = {"url_demonstracoes": f"{url}{RAIZ}", "url_cadop": f"{url}{CADOP}"}
+        resumo = espelhar_dados_abertos(str(dados), **opcoes)
+        assert resumo == {"baixados": ["3T2023", "4T2023", "1T2024"], "pulados": 0, "cadop": True}
+        assert [os.path.basename(c) for c in encontrar_arquivos_trimestrais(str(dados))] == ["3T2023.csv", "4T2023.csv", "1T2024.csv"]
+        assert os.path.exists(dados / "Relatorio_cadop.csv")
+        assert not [nome for nome in os.listdir(dados) if nome.endswith((".part", ".tmp"))]
+
+        requisicoes.clear()
+        assert espelhar_dados_abertos(str(dados), **opcoes) == {"baixados": [], "pulados": 3, "cadop": False}
+        assert baixados(requisicoes) == []
+        assert any(caminho == CADOP and "If-None-Match" in cabecalhos for caminho, cabecalhos in requisicoes)
+
+        # Um trimestre novo e um CSV apagado da pasta: só os dois são baixados
+        arquivos.update(servidor_ans(["3T2023", "4T2023", "1T2024", "2T2024"]))
+        os.remove(dados / "3T2023.csv")
+        requisicoes.clear()
+        resumo = espelhar_dados_abertos(str(dados), **opcoes)
+        assert resumo["baixados"] == ["3T2023", "2T2024"]
+        assert baixados(requisicoes) == ["2T2024.zip", "3T2023.zip"]
+
+
+def test_espelhar_desde_ano(tmp_path):
+    """Testa que as pastas dos anos anteriores nem são listadas"""
+    with servidor_local(servidor_ans(["4T2022", "1T2023"])) as (url, requisicoes):
+        resumo = espelhar_dados_abertos(str(tmp_path), f"{url}{RAIZ}", None, desde=2023)
+    assert resumo == {"baixados": ["1T2023"], "pulados": 0, "cadop": False}
+    assert f"{RAIZ}2022/" not in [caminho for caminho, _ in requisicoes]
+
+
+def test_espelhar_limite_concorrencia(tmp_path):
+    """Testa que as requisições simultâneas não passam do limite"""
+    estatisticas = {}
+    trimestres = [f"{t}T{ano}" for ano in (2023, 2024) for t in range(1, 5)]
+    with servidor_local(servidor_ans(trimestres), atraso=0.1, estatisticas=estatisticas) as (url, _):
+        resumo = espelhar_dados_abertos(str(tmp_path), f"{url}{RAIZ}", f"{url}{CADOP}", max_concorrencia=3)
+    assert len(resumo["baixados"]) == 8
+    assert 1 < estatisticas["pico"] <= 3
+
+
+def test_espelhar_falha_mantem_trimestres_baixados(tmp_path):
+    """Testa que um ZIP que falha não impede os demais, que ficam no manifesto"""
+    arquivos = servidor_ans(["1T2023", "2T2023"])
+    del arquivos[f"{RAIZ}2023/2T2023.zip"]
+    with servidor_local(arquivos) as (url, _):
+        with pytest.raises(Exception, match="2T2023"):
+            espelhar_dados_abertos(str(tmp_path), f"{url}{RAIZ}", None)
+        arquivos.update(servidor_ans(["1T2023", "2T2023"]))
+        assert espelhar_dados_abertos(str(tmp_path), f"{url}{RAIZ}", None)["baixados"] == ["2T2023"]
@@ -3,8 +3,9 @@ from unittest.mock import patch, MagicMock, call
 import os
 import zipfile
 import pandas as pd
-import subprocess
+import time
 import pdfplumber
+import pytest
 
 # Importando todas as funções a serem testadas
 from data_transformation.data_transformation_py import (
@@ -16,34 +17,55 @@ from data_transformation.data_transformation_py import (
     extrair_tabela_pdf,
     salvar_csv,
     compactar_csv,
+    dividir_paginas,
+    mapear_em_ordem,
+    normalizar_cabecalho,
+    gerar_linhas_pdf,
+    salvar_csv_streaming,
+    ler_pdf_do_zip,
+    salvar_csv_no_zip,
+    CachePaginas,
+    normalizar_tabela,
+    selecionar_motor,
+    gerar_tabelas_motor,
+    MOTORES,
+    detectar_modelo_tabela,
+    pos_processar_tabela,
+    medir_memoria,
+    salvar_colunar,
+    salvar_colunar_streaming,
+    carregar_colunar,
+    executar_pipeline,
+    carregar_estado,
+    etapa_download,
+    etapa_processamento,
+    etapa_extracao,
+    etapa_transformacao,
+    etapa_gravacao,
     ZIP_PATH, PDF_PATH, CSV_PATH, ZIP_CSV_PATH, WEB_SCRAPING_PATH
 )
+from benchmark_suite.dados_sinteticos import gerar_pdf_tabela
+
 
 ## 1. Testes para executar_web_scraping
-@patch("subprocess.run")
-def test_executar_web_scraping_success(mock_run):
-    """Testa execução bem-sucedida do web scraping"""
-    mock_run.return_value = MagicMock(returncode=0)
-    
+@patch("web_scraping.web_scraping_py.main")
+def test_executar_web_scraping_success(mock_main):
+    """Testa execução bem-sucedida do web scraping no próprio processo"""
     try:
         executar_web_scraping()
-        mock_run.assert_called_once_with(
-            ["python", os.path.join(WEB_SCRAPING_PATH, "web_scraping_py.py")],
-            check=True,
-            cwd=WEB_SCRAPING_PATH
-        )
+        mock_main.assert_called_once_with(ZIP_PATH)
     except Exception as e:
         assert False, f"Falha inesperada: {e}"
 
-@patch("subprocess.run")
-def test_executar_web_scraping_failure(mock_run):
+@patch("web_scraping.web_scraping_py.main")
+def test_executar_web_scraping_failure(mock_main):
     """Testa falha na execução do web scraping"""
-    mock_run.side_effect = subprocess.CalledProcessError(1, 'cmd')
+    mock_main.side_effect = Exception("falha de rede")
     
     with unittest.TestCase().assertRaises(Exception) as context:
         executar_web_scraping()
     
-    assert "Erro ao executar o script web_scraping_py.py" in str(context.exception)
+    assert "Erro ao executar o web scraping" in str(context.exception)
 
 ## 2. Testes para extrair_pdf_do_zip
 @patch("zipfile.ZipFile")
@@ -158,19 +180,23 @@ def test_salvar_csv_success(mock_to_csv):
     )
 
 ## 8. Testes para compactar_csv
-@patch("zipfile.ZipFile")
-@patch("os.path.exists", return_value=True)
-def test_compactar_csv_success(mock_exists, mock_zip):
-    """Testa compactação bem-sucedida"""
-    mock_instance = MagicMock()
-    mock_zip.return_value.__enter__.return_value = mock_instance
+@pytest.mark.parametrize("codec, tipo", [
+    ("deflate", zipfile.ZIP_DEFLATED),
+    ("bzip2", zipfile.ZIP_BZIP2),
+    ("xz", zipfile.ZIP_LZMA),
+])
+def test_compactar_csv_success(tmp_path, codec, tipo):
+    """Testa compactação bem-sucedida com cada codec"""
+    csv_path = tmp_path / "Rol_de_Procedimentos.csv"
+    csv_path.write_text("PROCEDIMENTO;RN;OD;AMB\n" + "CONSULTA;2019;Seg. Odontológica;Seg. Ambulatorial\n" * 500, encoding="utf-8")
+    zip_path = tmp_path / "Teste.zip"
     
-    compactar_csv(CSV_PATH, ZIP_CSV_PATH)
+    compactar_csv(str(csv_path), str(zip_path), codec=codec, nivel=None if codec == "xz" else 1)
     
-    mock_instance.write.assert_called_once_with(
-        CSV_PATH,
-        os.path.basename(CSV_PATH)
-    )
+    with zipfile.ZipFile(zip_path) as zipf:
+        assert zipf.testzip() is None
+        assert zipf.getinfo(csv_path.name).compress_type == tipo
+        assert zipf.read(csv_path.name) == csv_path.read_bytes()
 
 @patch("zipfile.ZipFile")
 @patch("os.path.exists", return_value=False)
@@ -185,5 +211,483 @@ def test_compactar_csv_file_not_found(mock_exists, mock_zip):
     # Garante que o ZipFile não foi chamado
     mock_zip.assert_not_called()
 
+## 9. Testes para a extração paralela
+def test_dividir_paginas():
+    """Testa a divisão das páginas em intervalos contíguos e ordenados"""
+    intervalos = dividir_paginas(10, 2)
+    
+    assert [p for intervalo in intervalos for p in intervalo] == list(range(10))
+    assert dividir_paginas(0, 4) == []
+
+def test_extrair_tabela_pdf_paralelo_igual_serial(tmp_path):
+    """Testa se a extração paralela gera exatamente o mesmo CSV da extração serial"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=7)
+    
+    serial = extrair_tabela_pdf(pdf_path)
+    paralelo = extrair_tabela_pdf(pdf_path, num_workers=3)
+    
+    assert len(serial) == 7 * 3  # Cabeçalhos repetidos das páginas seguintes removidos
+    assert paralelo.to_csv(index=False).encode('utf-8-sig') == serial.to_csv(index=False).encode('utf-8-sig')
+
+def test_mapear_em_ordem_limita_tarefas_pendentes():
+    """Testa se só max_pendentes tarefas são submetidas antes de o primeiro resultado ser consumido"""
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with patch.object(executor, "submit", wraps=executor.submit) as mock_submit:
+            resultados = mapear_em_ordem(executor, pow, [(i, 2) for i in range(20)], 4)
+            assert next(resultados) == 0
+            assert mock_submit.call_count == 4
+            assert list(resultados) == [i ** 2 for i in range(1, 20)]
+        assert mock_submit.call_count == 20
+
+## 10. Testes para o pipeline em streaming
+def test_normalizar_cabecalho():
+    """Testa a normalização do cabeçalho sem DataFrame"""
+    assert normalizar_cabecalho([" Código ", "RN\n(alteração)", "OD", "AMB", None]) == [
+        "Código", "RN (alteração)", "Seg. Odontológica", "Seg. Ambulatorial", ""
+    ]
+
+@patch("pdfplumber.open")
+def test_gerar_linhas_pdf(mock_pdf):
+    """Testa se o gerador produz o cabeçalho normalizado e libera cada página após a leitura"""
+    mock_instance = MagicMock()
+    mock_page = MagicMock()
+    mock_page.extract_table.return_value = [
+        ["Código", "OD", "AMB"],
+        ["123", "OD", ""]
+    ]
+    mock_instance.pages = [mock_page]
+    mock_pdf.return_value.__enter__.return_value = mock_instance
+    
+    linhas = list(gerar_linhas_pdf(PDF_PATH))
+    
+    assert linhas == [["Código", "Seg. Odontológica", "Seg. Ambulatorial"], ["123", "OD", ""]]
+    mock_page.close.assert_called_once()
+
+def test_salvar_csv_streaming_igual_salvar_csv(tmp_path):
+    """Testa se o CSV gravado em streaming é idêntico ao gerado a partir do DataFrame"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=3)
+    csv_df = str(tmp_path / "df.csv")
+    csv_stream = str(tmp_path / "stream.csv")
+    
+    salvar_csv(extrair_tabela_pdf(pdf_path), csv_df)
+    total = salvar_csv_streaming(gerar_linhas_pdf(pdf_path), csv_stream)
+    
+    assert total == 3 * 3
+    with open(csv_df, "rb") as a, open(csv_stream, "rb") as b:
+        assert a.read() == b.read()
+
+## 11. Testes para a leitura e gravação direto nos arquivos ZIP
+def test_ler_pdf_do_zip_file_not_found(tmp_path):
+    """Testa quando o PDF não está no arquivo ZIP"""
+    zip_path = str(tmp_path / "Anexos.zip")
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("outro_arquivo.txt", "conteúdo")
+    
+    with unittest.TestCase().assertRaises(Exception) as context:
+        ler_pdf_do_zip(zip_path)
+    
+    assert "O arquivo Anexo_I.pdf não foi encontrado" in str(context.exception)
+
+def test_salvar_csv_no_zip_sem_temporarios(tmp_path):
+    """Testa se o CSV gravado direto entre os ZIPs é idêntico ao gerado pelo fluxo com arquivos temporários"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=3)
+    zip_path = str(tmp_path / "Anexos.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        zipf.write(pdf_path, "Anexo_I.pdf")
+    csv_path = str(tmp_path / "dados_rol_procedimentos.csv")
+    salvar_csv(extrair_tabela_pdf(pdf_path), csv_path)
+    os.remove(pdf_path)
+    zip_csv_path = str(tmp_path / "Teste_Gabriel.zip")
+    
+    total = salvar_csv_no_zip(gerar_linhas_pdf((zip_path, "Anexo_I.pdf")), zip_csv_path, "dados_rol_procedimentos.csv")
+    
+    assert total == 3 * 3
+    assert sorted(os.listdir(tmp_path)) == ["Anexos.zip", "Teste_Gabriel.zip", "dados_rol_procedimentos.csv"]
+    with zipfile.ZipFile(zip_csv_path) as zipf, open(csv_path, "rb") as f:
+        assert zipf.read("dados_rol_procedimentos.csv") == f.read()
+
+## 12. Testes para o cache de páginas
+def test_cache_paginas_reprocessa_apenas_paginas_alteradas(tmp_path):
+    """Testa se uma nova execução só extrai as páginas que mudaram e gera o mesmo resultado"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=4)
+    cache_dir = str(tmp_path / "cache")
+    
+    primeira = CachePaginas(cache_dir)
+    esperado = list(gerar_linhas_pdf(pdf_path, cache=primeira))
+    assert primeira.relatorio()["falhas"] == 4
+    
+    segunda = CachePaginas(cache_dir)
+    with patch("pdfplumber.open") as mock_pdf:
+        assert list(gerar_linhas_pdf(pdf_path, cache=segunda)) == esperado
+        mock_pdf.assert_not_called()  # PDF inalterado é carregado sem ser aberto
+    assert segunda.relatorio() == {"acertos": 4, "falhas": 0, "taxa_acerto": 1.0}
+    
+    gerar_pdf_tabela(pdf_path, paginas=4, paginas_alteradas=(2,))
+    terceira = CachePaginas(cache_dir)
+    linhas = list(gerar_linhas_pdf(pdf_path, cache=terceira))
+    assert terceira.relatorio()["acertos"] == 3
+    assert terceira.relatorio()["falhas"] == 1
+    assert linhas == list(gerar_linhas_pdf(pdf_path))
+
+def test_cache_paginas_paralelo_igual_serial(tmp_path):
+    """Testa se a extração paralela com cache gera o mesmo resultado da extração serial"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=6)
+    cache = CachePaginas(str(tmp_path / "cache"))
+    
+    assert list(gerar_linhas_pdf(pdf_path, num_workers=2, cache=cache)) == list(gerar_linhas_pdf(pdf_path))
+    assert cache.relatorio()["falhas"] == 6
+
+def test_cache_paginas_remove_entradas_mais_antigas(tmp_path):
+    """Testa a remoção LRU quando o cache passa do limite de tamanho"""
+    cache = CachePaginas(str(tmp_path / "cache"), limite_bytes=100)
+    for i in range(5):
+        cache.salvar_pagina(f"pagina-{i}", [["x" * 30]])
+        os.utime(os.path.join(cache.cache_dir, f"pagina-{i}.json"), (i, i))
+    cache.obter_pagina("pagina-0")  # Acesso recente: não deve ser removida
+    
+    removidos = cache.limitar_tamanho()
+    
+    assert removidos == 3
+    assert cache.contem("pagina-0")
+    assert cache.contem("pagina-4")
+    assert not cache.contem("pagina-1")
+
+def gerar_pdf_xobject(caminho, texto):
+    """Gera um PDF cuja página só desenha um XObject de formulário com o texto informado."""
+    formulario = f"BT /F1 12 Tf 50 700 Td ({texto}) Tj ET".encode("latin-1")
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /XObject << /X1 6 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Length 12 >>\nstream\nq /X1 Do Q \nendstream",
+        f"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Length {len(formulario)} >>\nstream\n".encode() + formulario + b"\nendstream",
+    ]
+    saida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for numero, corpo in enumerate(objetos, 1):
+        offsets.append(len(saida))
+        saida.extend(f"{numero} 0 obj\n".encode() + corpo + b"\nendobj\n")
+    xref = len(saida)
+    saida.extend(f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode())
+    saida.extend(b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets))
+    saida.extend(f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    with open(caminho, "wb") as f:
+        f.write(saida)
+    return caminho
+
+def test_cache_paginas_chave_inclui_recursos(tmp_path):
+    """Testa se a chave da página muda quando só o XObject muda, com o mesmo fluxo de conteúdo"""
+    cache = CachePaginas(str(tmp_path / "cache"))
+    chaves = []
+    for nome, texto in [("a.pdf", "Texto antigo"), ("b.pdf", "Texto antigo"), ("c.pdf", "Texto novo")]:
+        with pdfplumber.open(gerar_pdf_xobject(str(tmp_path / nome), texto)) as pdf:
+            page = pdf.pages[0]
+            assert page.extract_text() == texto
+            chaves.append(cache.chave_pagina(page))
+    
+    assert chaves[0] == chaves[1]
+    assert chaves[0] != chaves[2]
+
+## 13. Testes para os motores de extração
+def test_normalizar_tabela():
+    """Testa a normalização das células vindas dos diferentes motores"""
+    assert normalizar_tabela([["A\r\nB", None, float("nan"), 1]]) == [["A\nB", "", "", "1"]]
+    assert normalizar_tabela(None) is None
+    assert normalizar_tabela([]) is None
+
+def test_motor_pymupdf_igual_pdfplumber(tmp_path):
+    """Testa se o motor PyMuPDF gera as mesmas tabelas que o pdfplumber"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=3)
+    
+    assert list(gerar_tabelas_motor(pdf_path, "pymupdf")) == list(gerar_tabelas_motor(pdf_path, "pdfplumber"))
+
+def test_motor_tabula_le_todas_as_paginas_numa_chamada(tmp_path):
+    """Testa se o motor tabula extrai o PDF do ZIP uma vez e lê as páginas numa única chamada"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=4)
+    zip_path = str(tmp_path / "Anexos.zip")
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.write(pdf_path, "Anexo_I.pdf")
+    
+    def celulas(*linhas):
+        return [[{"text": texto} for texto in linha] for linha in linhas]
+    
+    tabula = MagicMock()
+    tabula.read_pdf.return_value = [
+        {"page_number": 2, "data": celulas(["A", "B"])},
+        {"page_number": 2, "data": celulas(["A", "B"], ["1", ""])},
+        {"page_number": 4, "data": celulas(["C"])},
+    ]
+    with patch.dict("sys.modules", {"tabula": tabula}), \
+         patch("data_transformation.data_transformation_py.ler_pdf_do_zip", wraps=ler_pdf_do_zip) as mock_ler:
+        resultado = list(gerar_tabelas_motor((zip_path, "Anexo_I.pdf"), "tabula", [1, 2, 3]))
+    
+    assert resultado == [[["A", "B"], ["1", ""]], None, [["C"]]]
+    mock_ler.assert_called_once()
+    tabula.read_pdf.assert_called_once()
+    assert tabula.read_pdf.call_args.kwargs["pages"] == [2, 3, 4]
+    assert not os.path.exists(tabula.read_pdf.call_args.args[0])
+
+def test_selecionar_motor_escolhe_mais_rapido_que_concorda(tmp_path):
+    """Testa se o modo auto ignora o motor mais rápido quando a saída dele diverge dos demais"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=4)
+    
+    def motor_fake(atraso, tabela):
+        def motor(pdf_path, paginas=None):
+            for _ in paginas:
+                time.sleep(atraso)
+                yield tabela
+        return motor
+    
+    def motor_quebrado(pdf_path, paginas=None):
+        raise ImportError("pacote ausente")
+    
+    motores = {
+        "lento": motor_fake(0.02, [["A", "B"]]),
+        "rapido": motor_fake(0.005, [["A", "B"]]),
+        "errado": motor_fake(0.0, [["A", "X"]]),
+        "quebrado": motor_quebrado,
+    }
+    with patch.dict(MOTORES, motores, clear=True):
+        assert selecionar_motor(pdf_path, amostra=2) == "rapido"
+
+## 14. Testes para o modelo de layout da tabela
+def test_motor_modelo_igual_pdfplumber(tmp_path):
+    """Testa se o motor com modelo de layout gera as mesmas tabelas, pulando páginas sem tabela e redetectando grades diferentes"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=6, paginas_sem_tabela=(0, 3), paginas_largas=(4,))
+    
+    with patch("data_transformation.data_transformation_py.detectar_modelo_tabela",
+               wraps=detectar_modelo_tabela) as mock_detectar:
+        resultado = list(gerar_tabelas_motor(pdf_path, "pdfplumber_modelo"))
+    
+    assert resultado == list(gerar_tabelas_motor(pdf_path, "pdfplumber"))
+    assert resultado[0] is None and resultado[3] is None
+    assert resultado[4][1][0] == "Proc 4-0"
+    # Detecção completa só na primeira página com tabela e quando a grade muda (páginas 4 e 5)
+    assert mock_detectar.call_count == 3
+
+## 15. Testes para o pós-processamento vetorizado
+def test_pos_processar_tabela():
+    """Testa a remoção de cabeçalhos repetidos, a limpeza das células e a conversão para category"""
+    cabecalho = ["PROCEDIMENTO", "RN\n(alteração)", "OD", "AMB"]
+    linhas = [[f"Procedimento\n  {i} ", "RN 465/2021", "OD" if i % 2 else "", "AMB"] for i in range(200)]
+    linhas.insert(100, list(cabecalho))
+    df = pd.DataFrame(linhas, columns=cabecalho)
+    
+    result = pos_processar_tabela(df)
+    
+    assert len(result) == 200
+    assert result.iloc[0, 0] == "Procedimento 0"
+    assert not (result["PROCEDIMENTO"] == "PROCEDIMENTO").any()
+    assert result["PROCEDIMENTO"].dtype != "category"
+    for coluna in ["RN\n(alteração)", "OD", "AMB"]:
+        assert result[coluna].dtype == "category"
+    assert medir_memoria(result) < medir_memoria(df)
+
+## 16. Testes para a saída colunar (Parquet/Arrow)
+def test_salvar_colunar_mantem_tipos(tmp_path):
+    """Testa se o Parquet e o Arrow preservam os dados e gravam as colunas category como dicionário"""
+    df = pd.DataFrame({"Procedimento": ["A", "B", "C", "D"], "Seg. Odontológica": ["OD", "", "OD", "OD"]})
+    df["Seg. Odontológica"] = df["Seg. Odontológica"].astype("category")
+    
+    for formato, codec in [("parquet", "snappy"), ("arrow", "zstd")]:
+        caminho = str(tmp_path / f"dados.{formato}")
+        salvar_colunar(df, caminho, formato, codec)
+        tabela = carregar_colunar(caminho)
+        
+        assert str(tabela.schema.field("Seg. Odontológica").type).startswith("dictionary")
+        assert tabela.to_pandas()["Procedimento"].tolist() == ["A", "B", "C", "D"]
+
+def test_salvar_colunar_streaming_em_grupos(tmp_path):
+    """Testa a gravação em streaming em grupos de linhas"""
+    import pyarrow.parquet as pq
+    linhas = [["Código", "Seg. Odontológica"]] + [[str(i), "OD"] for i in range(10)]
+    caminho = str(tmp_path / "dados.parquet")
+    
+    total = salvar_colunar_streaming(iter(linhas), caminho, "parquet", "zstd", linhas_por_grupo=4)
+    
+    assert total == 10
+    assert pq.ParquetFile(caminho).metadata.num_row_groups == 3
+    assert carregar_colunar(caminho).to_pylist()[9] == {"Código": "9", "Seg. Odontológica": "OD"}
+
+def test_salvar_colunar_streaming_tipos_iguais_ao_dataframe(tmp_path):
+    """Testa se o streaming grava como dicionário as mesmas colunas que viram category no DataFrame"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=4)
+    df = extrair_tabela_pdf(pdf_path)
+    categoricas = [str(coluna) for coluna in df.columns if df[coluna].dtype == "category"]
+    assert categoricas and len(categoricas) < len(df.columns)
+    
+    for formato in ("parquet", "arrow"):
+        caminho = str(tmp_path / f"dados.{formato}")
+        salvar_colunar_streaming(gerar_linhas_pdf(pdf_path), caminho, formato, linhas_por_grupo=5)
+        tabela = carregar_colunar(caminho)
+        
+        dicionarios = [campo.name for campo in tabela.schema if str(campo.type).startswith("dictionary")]
+        assert dicionarios == categoricas
+        assert tabela.to_pandas().astype(str).values.tolist() == df.astype(str).values.tolist()
+
+def test_salvar_colunar_arrow_codec_invalido(tmp_path):
+    """Testa se o Arrow recusa codecs que o formato IPC não suporta"""
+    df = pd.DataFrame({"col1": ["a"]})
+    
+    with unittest.TestCase().assertRaises(Exception) as context:
+        salvar_colunar(df, str(tmp_path / "dados.arrow"), "arrow", "snappy")
+    
+    assert "apenas os codecs zstd e lz4" in str(context.exception)
+
+## 17. Testes para o orquestrador com checkpoints
+def test_executar_pipeline_retoma_da_etapa_que_falhou(tmp_path):
+    """Testa se uma nova execução retoma da etapa que falhou, sem repetir as anteriores"""
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    chamadas = []
+    
+    def etapa_a(entrada):
+        chamadas.append("a")
+        caminho = str(tmp_path / "a.txt")
+        with open(caminho, "w") as f:
+            f.write("a")
+        return caminho
+    
+    falhar = [True]
+    def etapa_b(entrada):
+        chamadas.append("b")
+        if falhar[0]:
+            raise Exception("página corrompida")
+        return entrada
+    
+    with unittest.TestCase().assertRaises(Exception) as context:
+        executar_pipeline([("a", etapa_a), ("b", etapa_b)], checkpoint_dir, max_tentativas=2, espera_inicial=0)
+    assert "Etapa b falhou após 2 tentativas" in str(context.exception)
+    assert chamadas == ["a", "b", "b"]
+    
+    falhar[0] = False
+    tempos = executar_pipeline([("a", etapa_a), ("b", etapa_b)], checkpoint_dir, max_tentativas=2, espera_inicial=0)
+    
+    assert chamadas == ["a", "b", "b", "b"]
+    assert list(tempos) == ["b"]
+
+def test_executar_pipeline_duracao_soma_as_tentativas(tmp_path):
+    """Testa se a duração da etapa conta as tentativas que falharam e as esperas, não só a última tentativa"""
+    relogio = [0.0]
+    def esperar(segundos):
+        relogio[0] += segundos
+    
+    falhas = [2]
+    def etapa(entrada):
+        relogio[0] += 1
+        if falhas[0]:
+            falhas[0] -= 1
+            raise Exception("servidor fora do ar")
+        return str(tmp_path)
+    
+    with patch("data_transformation.data_transformation_py.time.perf_counter", lambda: relogio[0]), \
+         patch("data_transformation.data_transformation_py.time.sleep", esperar):
+        tempos = executar_pipeline([("a", etapa)], str(tmp_path / "checkpoints"), max_tentativas=3, espera_inicial=10)
+    
+    # 3 tentativas de 1s cada, mais as esperas de 10s e 20s
+    assert tempos == {"a": 33.0}
+    registro = carregar_estado(str(tmp_path / "checkpoints"))["a"]
+    assert registro["duracao"] == 33.0 and registro["tentativas"] == 3
+
+@patch("data_transformation.data_transformation_py.executar_web_scraping")
+def test_etapa_download_atualiza_zip_e_usa_o_anterior_sem_rede(mock_scraping, tmp_path):
+    """Testa se a etapa de download sempre consulta o site e, se ele falha, reaproveita um Anexos.zip íntegro"""
+    zip_path = str(tmp_path / "Anexos.zip")
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("Anexo_I.pdf", b"%PDF-1.4")
+    
+    mock_scraping.return_value = False
+    assert etapa_download(None, zip_path) == zip_path
+    mock_scraping.assert_called_once_with(zip_path)
+    
+    mock_scraping.side_effect = Exception("sem rede")
+    assert etapa_download(None, zip_path) == zip_path
+    
+    os.remove(zip_path)
+    with pytest.raises(Exception, match="sem rede"):
+        etapa_download(None, zip_path)
+
+def test_executar_pipeline_pula_processamento_sem_mudancas(tmp_path):
+    """Testa se, com a entrada e os parâmetros iguais, só as etapas de sempre_executar rodam de novo"""
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    anexos = tmp_path / "Anexos.zip"
+    anexos.write_bytes(b"v1")
+    chamadas = []
+    
+    def download(_entrada):
+        chamadas.append("download")
+        return str(anexos)
+    
+    def processamento(entrada):
+        chamadas.append("processamento")
+        return entrada
+    
+    def executar(motor="pdfplumber"):
+        etapas = [("download", download), ("processamento", processamento, {"motor": motor})]
+        return executar_pipeline(etapas, checkpoint_dir, espera_inicial=0, sempre_executar=("download",))
+    
+    executar()
+    assert list(executar()) == ["download"]
+    assert list(executar(motor="pymupdf")) == ["download", "processamento"]
+    anexos.write_bytes(b"v2 com outro tamanho")
+    assert list(executar(motor="pymupdf")) == ["download", "processamento"]
+    assert chamadas.count("processamento") == 3
+
+def test_executar_pipeline_completo(tmp_path):
+    """Testa as etapas de extração, transformação e gravação encadeadas pelo orquestrador"""
+    from functools import partial
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=3)
+    zip_path = str(tmp_path / "Anexos.zip")
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.write(pdf_path, "Anexo_I.pdf")
+    csv_path = str(tmp_path / "esperado.csv")
+    salvar_csv(extrair_tabela_pdf(pdf_path), csv_path)
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    os.makedirs(checkpoint_dir)
+    zip_csv_path = str(tmp_path / "Teste_Gabriel.zip")
+    
+    executar_pipeline([
+        ("download", lambda _: zip_path),
+        ("extracao", partial(etapa_extracao, checkpoint_dir=checkpoint_dir)),
+        ("transformacao", partial(etapa_transformacao, checkpoint_dir=checkpoint_dir)),
+        ("gravacao", partial(etapa_gravacao, zip_csv_path=zip_csv_path)),
+    ], checkpoint_dir)
+    
+    with zipfile.ZipFile(zip_csv_path) as zipf, open(csv_path, "rb") as f:
+        assert zipf.read(os.path.basename(CSV_PATH)) == f.read()
+
+@pytest.mark.parametrize("direto_zip,streaming", [(True, True), (False, True), (False, False)])
+def test_etapa_processamento_modos_geram_mesmo_csv(tmp_path, direto_zip, streaming):
+    """Testa se os três modos de processamento geram o mesmo CSV compactado, sem deixar temporários"""
+    pdf_path = gerar_pdf_tabela(str(tmp_path / "Anexo_I.pdf"), paginas=3)
+    zip_path = str(tmp_path / "Anexos.zip")
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.write(pdf_path, "Anexo_I.pdf")
+    csv_path = str(tmp_path / "esperado.csv")
+    salvar_csv(extrair_tabela_pdf(pdf_path), csv_path)
+    os.remove(pdf_path)
+    zip_csv_path = str(tmp_path / "Teste_Gabriel.zip")
+    
+    with patch.multiple("data_transformation.data_transformation_py",
+                        PDF_PATH=str(tmp_path / "web_scraping" / "Anexo_I.pdf"),
+                        CSV_PATH=str(tmp_path / "dados_rol_procedimentos.csv")):
+        os.makedirs(tmp_path / "web_scraping")
+        assert etapa_processamento(zip_path, zip_csv_path, direto_zip=direto_zip, streaming=streaming) == zip_csv_path
+    
+    assert sorted(os.listdir(tmp_path)) == ["Anexos.zip", "Teste_Gabriel.zip", "esperado.csv", "web_scraping"]
+    assert os.listdir(tmp_path / "web_scraping") == []
+    with zipfile.ZipFile(zip_csv_path) as zipf, open(csv_path, "rb") as f:
+        assert zipf.read("dados_rol_procedimentos.csv") == f.read()
+
+def test_script_roda_da_propria_pasta():
+    """Testa se o script pode ser executado da própria pasta, como no README"""
+    import subprocess
+    import sys
+    from data_transformation import data_transformation_py
+    pasta = os.path.dirname(data_transformation_py.__file__)
+    resultado = subprocess.run([sys.executable, "data_transformation_py.py", "--help"], cwd=pasta, capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
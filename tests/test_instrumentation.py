@@ -0,0 +1,84 @@
+import json
+import pstats
+import pytest
+
+from web_scraping import web_scraping_py
+from data_transformation import data_transformation_py
+from instrumentation.instrumentation_py import ativar, desativar, instrumentar
+from benchmark_suite.dados_sinteticos import gerar_pdf_tabela, servidor_local
+
+
+def executar_transformacao(pasta, paginas=3):
+    """Extrai a tabela de um PDF sintético, grava o CSV e o compacta, como no pipeline."""
+    pdf_path = gerar_pdf_tabela(str(pasta / "Anexo_I.pdf"), paginas=paginas)
+    df = data_transformation_py.extrair_tabela_pdf(pdf_path)
+    data_transformation_py.salvar_csv(df, str(pasta / "dados.csv"))
+    data_transformation_py.compactar_csv(str(pasta / "dados.csv"), str(pasta / "dados.zip"))
+
+
+## 1. Testes para ligar e desligar a instrumentação
+def test_desligada_nao_troca_funcoes():
+    """Testa que, desligada, as funções e os motores são os originais"""
+    originais = (web_scraping_py.baixar_pdf, data_transformation_py.extrair_tabela_pdf, dict(data_transformation_py.MOTORES))
+    with instrumentar() as coletor:
+        assert web_scraping_py.baixar_pdf is not originais[0]
+        with pytest.raises(Exception, match="já está ativa"):
+            ativar()
+    assert (web_scraping_py.baixar_pdf, data_transformation_py.extrair_tabela_pdf, data_transformation_py.MOTORES) == originais
+    assert coletor.etapas == {}
+    assert desativar() is None
+
+
+## 2. Testes para as métricas
+def test_metricas_jsonl(tmp_path):
+    """Testa os tempos, contadores, memória e o histograma por página gravados em JSON Lines"""
+    saida = tmp_path / "metricas.jsonl"
+    with instrumentar(saida=str(saida), memoria=True) as coletor:
+        executar_transformacao(tmp_path)
+
+    etapas = coletor.etapas
+    assert etapas["data_transformation.extrair_tabela_pdf"]["linhas"] == 9
+    assert etapas["data_transformation.gerar_tabelas_pdf"]["linhas"] == 12
+    assert etapas["data_transformation.salvar_csv"]["bytes"] == (tmp_path / "dados.csv").stat().st_size
+    assert etapas["web_scraping.compactar_arquivos"]["bytes"] == (tmp_path / "dados.zip").stat().st_size
+    assert etapas["data_transformation.extrair_tabela_pdf"]["memoria_pico"] > 0
+    assert etapas["data_transformation.extrair_tabela_pdf"]["segundos"] >= etapas["data_transformation.gerar_tabelas_pdf"]["segundos"]
+    assert coletor.histogramas["pdfplumber"]["total"] == 3
+
+    eventos = [json.loads(linha) for linha in saida.read_text(encoding="utf-8").splitlines()]
+    chamadas = [evento["etapa"] for evento in eventos if "tipo" not in evento]
+    assert chamadas.index("web_scraping.compactar_arquivos") < chamadas.index("data_transformation.compactar_csv")
+    assert {"tipo": "histograma", "motor": "pdfplumber"}.items() <= eventos[-1].items()
+
+
+def test_metricas_prometheus(tmp_path):
+    """Testa a exportação no formato do Prometheus, sem medir a memória"""
+    saida = tmp_path / "metricas.prom"
+    with instrumentar(saida=str(saida), formato="prometheus") as coletor:
+        executar_transformacao(tmp_path)
+
+    texto = saida.read_text(encoding="utf-8")
+    assert 'pipeline_etapa_linhas_total{etapa="data_transformation.extrair_tabela_pdf"} 9' in texto
+    assert 'pipeline_pagina_segundos_bucket{motor="pdfplumber",le="+Inf"} 3' in texto
+    assert 'pipeline_pagina_segundos_count{motor="pdfplumber"} 3' in texto
+    assert "pipeline_etapa_memoria_pico_bytes{" not in texto
+    assert coletor.etapas["data_transformation.salvar_csv"]["chamadas"] == 1
+
+
+def test_metricas_registram_erros(tmp_path):
+    """Testa que etapas com erro são contadas e o erro continua sendo lançado"""
+    with servidor_local({}) as (url, _), instrumentar() as coletor:
+        with pytest.raises(Exception):
+            web_scraping_py.baixar_pdf(f"{url}/nao_existe.pdf", str(tmp_path / "a.pdf"), tentativas=1)
+    assert coletor.etapas["web_scraping.baixar_pdf"]["erros"] == 1
+
+
+## 3. Testes para o perfil de uma etapa
+def test_perfil_da_etapa(tmp_path):
+    """Testa o perfil do cProfile gravado só para a etapa escolhida"""
+    perfil_path = tmp_path / "extracao.prof"
+    with instrumentar(perfil="data_transformation.extrair_tabela_pdf", perfil_path=str(perfil_path)):
+        executar_transformacao(tmp_path)
+    funcoes = {funcao for _, _, funcao in pstats.Stats(str(perfil_path)).stats}
+    assert "extract_table" in funcoes
+    assert "compactar_arquivos" not in funcoes
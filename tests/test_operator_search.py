@@ -0,0 +1,117 @@
+import os
+import sqlite3
+
+from data_loading.data_loading_py import ler_cadop, sincronizar_empresas, conexao_sqlite
+from operator_search.operator_search_py import dobrar_texto, IndiceOperadoras, indexar_operadoras
+from operator_search.benchmark_busca import executar_benchmark
+from tests.test_data_loading import gerar_cadop_completo, criar_tabela_empresas
+
+OPERADORAS = [
+    ("300001", "UNIMED CURITIBA - SOCIEDADE COOPERATIVA DE MÉDICOS"),
+    ("300002", "ASSISTÊNCIA MÉDICA SÃO PAULO LTDA"),
+    ("300003", "SÃO FRANCISCO SAÚDE S/A"),
+    ("300004", "SAUDE"),
+]
+
+
+def criar_indice(tmp_path, operadoras=OPERADORAS):
+    cadop = gerar_cadop_completo(str(tmp_path / "Relatorio_cadop.csv"), operadoras)
+    indice = IndiceOperadoras()
+    indice.atualizar(ler_cadop(cadop))
+    return indice
+
+
+def registros(resultados):
+    return [documento["Registro_ANS"] for documento in resultados]
+
+
+## 1. Testes para a normalização do texto
+def test_dobrar_texto():
+    """Testa a remoção de acentos, caixa e pontuação"""
+    assert dobrar_texto("Assistência Médica S/A.") == "assistencia medica s a"
+    assert dobrar_texto(None) == ""
+
+
+## 2. Testes para a busca
+def test_buscar_sem_acento_e_por_prefixo(tmp_path):
+    """Testa a busca sem acento, em minúsculas, por começo de palavra e com todas as palavras obrigatórias"""
+    indice = criar_indice(tmp_path)
+    assert registros(indice.buscar("sao")) == ["300003", "300002"]
+    assert registros(indice.buscar("assist med")) == ["300002"]
+    assert registros(indice.buscar("unimed paulo")) == []
+    assert indice.buscar("xyz") == []
+    assert indice.buscar("  !! ") == []
+
+
+def test_buscar_ordem_dos_resultados(tmp_path):
+    """Testa que palavra inteira vem antes de prefixo e, com os mesmos pontos, o nome mais curto primeiro"""
+    indice = criar_indice(tmp_path)
+    assert registros(indice.buscar("saude")) == ["300004", "300003"]
+    assert registros(indice.buscar("sa")) == ["300004", "300003", "300002"]
+    assert registros(indice.buscar("sa", limite=1)) == ["300004"]
+
+
+def test_buscar_cnpj_e_registro(tmp_path):
+    """Testa a busca pelo CNPJ, com ou sem pontuação, e pelo Registro ANS"""
+    indice = criar_indice(tmp_path)
+    assert registros(indice.buscar("00.000.000/3000-02")) == ["300002"]
+    assert indice.buscar_cnpj("00000000300003")[0]["Razao_Social"] == "SÃO FRANCISCO SAÚDE S/A"
+    assert registros(indice.buscar("300001")) == ["300001"]
+    assert indice.buscar("99999999999999") == []
+
+
+## 3. Testes para a atualização e a gravação do índice
+def test_atualizar_incremental(tmp_path):
+    """Testa que mudanças no cadastro só reindexam as operadoras alteradas e apagam as palavras antigas"""
+    indice = criar_indice(tmp_path)
+    operadoras = [OPERADORAS[0], ("300002", "BRADESCO SAÚDE"), OPERADORAS[3]]
+    cadop = gerar_cadop_completo(str(tmp_path / "Relatorio_cadop.csv"), operadoras)
+    assert indice.atualizar(ler_cadop(cadop)) == (0, 1, 1)
+    assert registros(indice.buscar("sao")) == []
+    assert registros(indice.buscar("brad")) == ["300002"]
+    assert "f" not in indice.arvore[0]
+    assert indice.buscar_cnpj("00000000300003") == []
+    assert indice.atualizar(ler_cadop(cadop)) == (0, 0, 0)
+
+
+def test_atualizar_cnpj_compartilhado(tmp_path):
+    """Testa que remover uma operadora não tira do índice outra operadora com o mesmo CNPJ"""
+    cadop = gerar_cadop_completo(str(tmp_path / "Relatorio_cadop.csv"), OPERADORAS)
+    linhas = ler_cadop(cadop)
+    outra = list(linhas["300001|00000000300001"])
+    outra[0] = "300009"
+    indice = IndiceOperadoras()
+    indice.atualizar({**linhas, "300009|00000000300001": outra})
+    assert registros(indice.buscar("00.000.000/3000-01")) == ["300001", "300009"]
+
+    assert indice.atualizar(linhas) == (0, 0, 1)
+    assert registros(indice.buscar_cnpj("00000000300001")) == ["300001"]
+    indice.atualizar({})
+    assert indice.por_cnpj == {}
+
+
+def test_indexar_operadoras_grava_e_carrega(tmp_path):
+    """Testa o índice gravado em disco, lido do CSV e da tabela Empresas"""
+    cadop = gerar_cadop_completo(str(tmp_path / "Relatorio_cadop.csv"), OPERADORAS)
+    indice_path = str(tmp_path / "indice_operadoras.pkl")
+    indexar_operadoras(cadop, indice_path)
+    indice = IndiceOperadoras.carregar(indice_path)
+    assert len(indice) == 4
+    assert registros(indice.buscar("unimed")) == ["300001"]
+
+    banco = criar_tabela_empresas(str(tmp_path / "ans.db"))
+    sincronizar_empresas(conexao_sqlite(banco), cadop, str(tmp_path / "snapshot_empresas.json"))
+    conexao = sqlite3.connect(banco)
+    conexao.execute("UPDATE Empresas SET Razao_Social = 'UNIMED LONDRINA' WHERE Registro_ANS = '300001'")
+    indice = indexar_operadoras(indice_path=indice_path, conexao=conexao)
+    conexao.close()
+    assert registros(indice.buscar("londrina")) == ["300001"]
+    assert len(IndiceOperadoras.carregar(indice_path)) == 4
+
+    assert len(IndiceOperadoras.carregar(str(tmp_path / "nao_existe.pkl"))) == 0
+
+
+def test_benchmark_busca():
+    """Testa o benchmark num cadastro pequeno"""
+    resultado = executar_benchmark(operadoras=200, buscas=500)
+    assert resultado["busca_p50_ms"] <= resultado["busca_p99_ms"] <= resultado["busca_max_ms"]
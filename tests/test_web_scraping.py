@@ -1,6 +1,9 @@
 import os
+import zipfile
+import pytest
 from unittest.mock import patch, MagicMock, mock_open
-from web_scraping.web_scraping_py import obter_conteudo, extrair_links_pdfs, baixar_pdf, compactar_pdfs, excluir_arquivos
+from web_scraping.web_scraping_py import main, obter_conteudo, extrair_links_pdfs, descobrir_links_pdfs, baixar_pdf, baixar_pdfs, compactar_pdfs, compactar_arquivos, estimar_entropia, LIMITE_ENTROPIA, excluir_arquivos, _ParserLinks
+from benchmark_suite.dados_sinteticos import servidor_local
 
 # Testa a obtenção de conteúdo HTML de uma URL
 @patch("requests.get")
@@ -54,21 +57,45 @@ def test_baixar_pdf(mock_get):
         mock_file().write.assert_called_once_with(b"PDF CONTENT")
 
 # Testa a compactação de arquivos PDF
-@patch("zipfile.ZipFile")
-def test_compactar_pdfs(mock_zipfile):
+def test_compactar_pdfs(tmp_path):
     """Testa a compactação de arquivos PDF em um arquivo ZIP."""
-    arquivos = ["Anexo_I.pdf", "Anexo_II.pdf"]
-    
-    # Configura o mock do ZipFile
-    mock_zip = MagicMock()
-    mock_zipfile.return_value.__enter__.return_value = mock_zip
+    arquivos = [str(tmp_path / "Anexo_I.pdf"), str(tmp_path / "Anexo_II.pdf")]
+    with open(arquivos[0], "wb") as f:
+        f.write(b"%PDF-1.4\n" + b"BT /F1 12 Tf (Procedimento) Tj ET\n" * 2000)
+    with open(arquivos[1], "wb") as f:
+        f.write(b"%PDF-1.4\n" + os.urandom(200_000))
+    zip_path = tmp_path / "anexos.zip"
     
     # Chama a função para compactar os PDFs
-    compactar_pdfs(arquivos, "anexos.zip")
+    compactar_pdfs(arquivos, str(zip_path))
+    
+    # Verifica se os arquivos foram adicionados ao ZIP, na ordem e com o conteúdo original
+    with zipfile.ZipFile(zip_path) as zipf:
+        assert zipf.testzip() is None
+        assert zipf.namelist() == ["Anexo_I.pdf", "Anexo_II.pdf"]
+        for arquivo in arquivos:
+            with open(arquivo, "rb") as f:
+                assert zipf.read(os.path.basename(arquivo)) == f.read()
+        # O PDF de texto é comprimido; o de conteúdo já comprimido é guardado como está
+        assert zipf.getinfo("Anexo_I.pdf").compress_type == zipfile.ZIP_DEFLATED
+        assert zipf.getinfo("Anexo_II.pdf").compress_type == zipfile.ZIP_STORED
+
+# Testa a estimativa de entropia usada para decidir se um arquivo é comprimido
+def test_estimar_entropia(tmp_path):
+    """Testa se dados aleatórios têm entropia alta e texto repetitivo, baixa."""
+    aleatorio = tmp_path / "aleatorio.bin"
+    aleatorio.write_bytes(os.urandom(100_000))
+    texto = tmp_path / "texto.txt"
+    texto.write_bytes(b"CONSULTA MEDICA;RN;OD;AMB\n" * 4000)
     
-    # Verifica se os arquivos foram adicionados ao ZIP
-    mock_zip.write.assert_any_call("Anexo_I.pdf", arcname="Anexo_I.pdf")
-    mock_zip.write.assert_any_call("Anexo_II.pdf", arcname="Anexo_II.pdf")
+    assert estimar_entropia(str(aleatorio)) >= LIMITE_ENTROPIA
+    assert estimar_entropia(str(texto)) < LIMITE_ENTROPIA
+
+# Testa se um codec desconhecido é recusado
+def test_compactar_arquivos_codec_invalido(tmp_path):
+    """Testa se a compactação falha com um codec não suportado."""
+    with pytest.raises(Exception, match="Codec de compactação não suportado"):
+        compactar_arquivos([], str(tmp_path / "anexos.zip"), codec="rar")
 
 # Testa a exclusão de arquivos
 @patch("os.remove")
@@ -82,3 +109,117 @@ def test_excluir_arquivos(mock_remove):
     # Verifica se a função os.remove foi chamada para excluir os arquivos
     mock_remove.assert_any_call("Anexo_I.pdf")
     mock_remove.assert_any_call("Anexo_II.pdf")
+
+
+# Testa o download condicional com ETag
+def test_baixar_pdf_condicional(tmp_path):
+    """Testa se um arquivo não modificado não é baixado de novo (304)."""
+    conteudo = b"%PDF-1.4 " + b"x" * 5000
+    destino = str(tmp_path / "Anexo_I.pdf")
+    cache_path = str(tmp_path / "cache.json")
+    
+    with servidor_local({"/anexo1.pdf": conteudo}) as (url, requisicoes):
+        assert baixar_pdf(url + "/anexo1.pdf", destino, chunk_size=1024, cache_path=cache_path) is True
+        assert baixar_pdf(url + "/anexo1.pdf", destino, chunk_size=1024, cache_path=cache_path) is False
+    
+    assert "If-None-Match" in requisicoes[1][1]
+    with open(destino, "rb") as f:
+        assert f.read() == conteudo
+
+# Testa um anexo que não mudou, mas não está no ZIP anterior
+def test_main_baixa_de_novo_anexo_ausente_do_zip(tmp_path):
+    """Testa se um anexo não modificado (304), mas ausente do ZIP anterior, é baixado por inteiro."""
+    pagina = b'<html><body><a href="/anexo1.pdf">Anexo I</a><a href="/anexo2.pdf">Anexo II</a></body></html>'
+    arquivos = {"/rol.html": pagina, "/anexo1.pdf": b"%PDF-1.4 anexo 1", "/anexo2.pdf": b"%PDF-1.4 anexo 2"}
+    zip_path = str(tmp_path / "Anexos.zip")
+    
+    with servidor_local(arquivos) as (url, requisicoes), patch("web_scraping.web_scraping_py.BASE_URL", url + "/rol.html"):
+        assert main(zip_path) is True
+        # ZIP anterior sem o Anexo II (por exemplo, gerado antes de o anexo entrar na lista)
+        with zipfile.ZipFile(zip_path, "w") as zipf:
+            zipf.writestr("Anexo_I.pdf", arquivos["/anexo1.pdf"])
+        requisicoes.clear()
+        assert main(zip_path) is True
+    
+    anexo2 = [cabecalhos for caminho, cabecalhos in requisicoes if caminho == "/anexo2.pdf"]
+    assert "If-None-Match" in anexo2[0] and "If-None-Match" not in anexo2[1]
+    with zipfile.ZipFile(zip_path) as zipf:
+        assert zipf.read("Anexo_I.pdf") == arquivos["/anexo1.pdf"]
+        assert zipf.read("Anexo_II.pdf") == arquivos["/anexo2.pdf"]
+    assert sorted(os.listdir(tmp_path)) == [".cache_downloads.json", "Anexos.zip"]
+
+# Testa a retomada de um download interrompido
+def test_baixar_pdf_retoma_download_interrompido(tmp_path):
+    """Testa se um download interrompido é retomado com Range a partir do ponto em que parou."""
+    conteudo = bytes(range(256)) * 400
+    destino = str(tmp_path / "Anexo_I.pdf")
+    
+    with servidor_local({"/anexo1.pdf": conteudo}, interromper={"/anexo1.pdf"}) as (url, requisicoes):
+        assert baixar_pdf(url + "/anexo1.pdf", destino, chunk_size=4096, cache_path=str(tmp_path / "cache.json")) is True
+    
+    assert len(requisicoes) == 2
+    inicio = int(requisicoes[1][1]["Range"].split("=")[1].rstrip("-"))
+    assert 0 < inicio <= len(conteudo) // 2
+    with open(destino, "rb") as f:
+        assert f.read() == conteudo
+
+# Testa os downloads simultâneos
+def test_baixar_pdfs_simultaneos(tmp_path):
+    """Testa se vários anexos são baixados ao mesmo tempo: o servidor chega a atender todos de uma vez."""
+    arquivos = {f"/anexo{i}.pdf": f"%PDF conteúdo {i}".encode() * 100 for i in range(4)}
+    estatisticas = {}
+    
+    with servidor_local(arquivos, atraso=0.4, estatisticas=estatisticas) as (url, requisicoes):
+        downloads = [(f"{url}/anexo{i}.pdf", str(tmp_path / f"Anexo_{i}.pdf")) for i in range(4)]
+        resultados = baixar_pdfs(downloads, max_concorrencia=4)
+    
+    assert resultados == [True] * 4
+    assert estatisticas["pico"] == 4
+    for i, (_, destino) in enumerate(downloads):
+        with open(destino, "rb") as f:
+            assert f.read() == arquivos[f"/anexo{i}.pdf"]
+
+# Testa o limite de conexões por host
+def test_baixar_pdfs_limite_conexoes_por_host(tmp_path):
+    """Testa se o limite de conexões por host é respeitado e as conexões são reaproveitadas."""
+    arquivos = {f"/anexo{i}.pdf": b"%PDF" * 10 for i in range(4)}
+    estatisticas = {}
+    
+    with servidor_local(arquivos, atraso=0.05, estatisticas=estatisticas) as (url, requisicoes):
+        downloads = [(f"{url}/anexo{i}.pdf", str(tmp_path / f"Anexo_{i}.pdf")) for i in range(4)]
+        baixar_pdfs(downloads, max_concorrencia=4, max_conexoes_por_host=1)
+    
+    assert estatisticas["pico"] == 1
+    assert estatisticas["conexoes"] == 1
+
+# Testa a descoberta rápida de links
+def test_descobrir_links_pdfs_igual_extrair_links_pdfs():
+    """Testa se a descoberta rápida mantém a regra de que o primeiro link encontrado vale."""
+    html = """
+    <html><body>
+        <a name="topo">Anexo I sem href</a>
+        <a href="/outros/anexo2-antigo.pdf"><span>Anexo</span> <b>II</b> (antigo)</a>
+        <a href="/anexos/anexo1.pdf">  Anexo I &ndash; Rol  </a>
+        <a href="/anexos/anexo1-copia.pdf">Anexo I</a>
+        <a href="/anexos/anexo3.pdf">Anexo III</a>
+    </body></html>
+    """
+    base_url = "https://www.exemplo.com"
+    
+    for anexos in (None, ["Anexo I", "Anexo II", "Anexo III"]):
+        assert descobrir_links_pdfs(html, base_url, anexos) == extrair_links_pdfs(html, base_url, anexos)
+
+# Testa a parada antecipada numa página grande (o ganho de tempo é medido na benchmark_suite)
+def test_descobrir_links_pdfs_para_de_ler_pagina_grande():
+    """Testa se a descoberta rápida para de ler a página depois de encontrar os anexos."""
+    html = ('<html><body><a href="/anexo1.pdf">Anexo I</a><a href="/anexo2.pdf">Anexo II</a>'
+            + '<div class="item"><a href="/noticia">Notícia</a><p>Texto qualquer</p></div>' * 20000
+            + "</body></html>")
+    base_url = "https://www.exemplo.com"
+    
+    with patch.object(_ParserLinks, "feed", autospec=True, side_effect=_ParserLinks.feed) as mock_feed:
+        rapido = descobrir_links_pdfs(html, base_url, tamanho_bloco=64 * 1024)
+    
+    assert rapido == extrair_links_pdfs(html, base_url)
+    assert len(html) > 20 * 64 * 1024
+    assert mock_feed.call_count == 1  # Só o primeiro bloco do HTML foi lido
@@ -1,33 +1,91 @@
 import os
+import math
 import requests
 from bs4 import BeautifulSoup
+from html.parser import HTMLParser
 from urllib.parse import urljoin
+import json
 import zipfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 
 BASE_URL = "https://www.gov.br/ans/pt-br/acesso-a-informacao/participacao-da-sociedade/atualizacao-do-rol-de-procedimentos"
 
 ZIP_PATH = "Anexos.zip"  
 
+# Tamanho dos blocos lidos durante o download
+CHUNK_SIZE = 1024 * 1024
+
+# Arquivo com ETag, Last-Modified e Content-Length de cada URL baixada, usado para
+# requisições condicionais e para retomar downloads interrompidos
+CACHE_DOWNLOADS = ".cache_downloads.json"
+
+# Quantidade de vezes que um download interrompido é retomado
+TENTATIVAS_DOWNLOAD = 3
+
+# Protege o arquivo de cache quando vários downloads terminam ao mesmo tempo
+_LOCK_CACHE_DOWNLOADS = threading.Lock()
+
+# Limites dos downloads simultâneos: total de downloads em paralelo e conexões por host
+MAX_DOWNLOADS_SIMULTANEOS = 4
+MAX_CONEXOES_POR_HOST = 4
+
+# Codecs aceitos na compactação (zstd só existe no zipfile a partir do Python 3.14)
+CODECS_ZIP = {
+    "stored": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "xz": zipfile.ZIP_LZMA,
+}
+if hasattr(zipfile, "ZIP_ZSTANDARD"):
+    CODECS_ZIP["zstd"] = zipfile.ZIP_ZSTANDARD
+
+# Arquivos com entropia acima deste valor (bits por byte) já estão comprimidos e são
+# guardados sem compressão (ZIP_STORED)
+LIMITE_ENTROPIA = 7.5
+
 # Dicionário com os nomes dos anexos que serão baixados
 PDF_NAMES = {
     "Anexo I": "Anexo_I.pdf",
     "Anexo II": "Anexo_II.pdf"
 }
 
-def obter_conteudo(url):
+def criar_sessao(max_conexoes_por_host=MAX_CONEXOES_POR_HOST):
+    """
+    Cria uma sessão HTTP que reaproveita as conexões (TCP/TLS) entre as requisições.
+    
+    Parâmetros:
+    - max_conexoes_por_host: Quantidade máxima de conexões abertas com cada host; requisições
+      acima do limite esperam uma conexão ser liberada.
+    
+    Retorna:
+    - Uma requests.Session configurada.
+    """
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=max_conexoes_por_host, pool_maxsize=max_conexoes_por_host, pool_block=True)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    return sessao
+
+
+def obter_conteudo(url, sessao=None):
     """
     Realiza uma requisição HTTP GET para a URL informada e retorna o conteúdo HTML da página.
     
     Parâmetros:
     - url: String contendo a URL a ser acessada.
+    - sessao: Sessão HTTP opcional (veja criar_sessao) para reaproveitar conexões.
 
     Retorna:
     - O conteúdo HTML da página (string) se a requisição for bem-sucedida.
     - None se ocorrer algum erro.
     """
     try:
-        resposta = requests.get(url)
+        cliente = sessao if sessao is not None else requests
+        resposta = cliente.get(url)
         resposta.raise_for_status()  # Garantindo que uma exceção seja lançada em caso de erro
         print(f"Sucesso ao acessar {url}")
         return resposta.text
@@ -35,7 +93,7 @@ def obter_conteudo(url):
         raise requests.RequestException(f"Erro ao acessar {url}: {e}")
 
 
-def extrair_links_pdfs(html, base_url):
+def extrair_links_pdfs(html, base_url, anexos=None):
     """
     Extrai os links dos PDFs dos Anexos I e II a partir do HTML da página.
     
@@ -45,10 +103,12 @@ def extrair_links_pdfs(html, base_url):
     Parâmetros:
     - html: String contendo o conteúdo HTML da página.
     - base_url: URL base para converter links relativos em links absolutos.
+    - anexos: Nomes dos anexos procurados; por padrão, as chaves de PDF_NAMES.
 
     Retorna:
     - Um dicionário com os nomes dos anexos (chaves) e os links completos (valores).
     """
+    anexos = list(PDF_NAMES) if anexos is None else list(anexos)
     soup = BeautifulSoup(html, "html.parser")
     links_pdf = {}
 
@@ -57,7 +117,7 @@ def extrair_links_pdfs(html, base_url):
         # Pegando o texto do link e remove espaços desnecessários
         texto_link = link.get_text(strip=True)
         # Iterando sobre os nomes dos anexos que buscamos
-        for anexo in PDF_NAMES.keys():
+        for anexo in anexos:
             # Verificando se o texto contém o nome do anexo
             if anexo in texto_link:
                 # Pegando o valor do atributo href
@@ -75,42 +135,334 @@ def extrair_links_pdfs(html, base_url):
     return links_pdf
 
 
-def baixar_pdf(url, caminho_destino):
+def carregar_cache_downloads(cache_path):
+    """
+    Carrega os metadados dos downloads anteriores.
+    
+    Parâmetros:
+    - cache_path: Caminho do arquivo JSON com os metadados.
+    
+    Retorna:
+    - Um dicionário com os metadados de cada URL (vazio se o arquivo não existe).
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def salvar_cache_downloads(cache_path, url, metadados):
+    """
+    Atualiza os metadados de uma URL no arquivo de cache dos downloads.
+    
+    Parâmetros:
+    - cache_path: Caminho do arquivo JSON com os metadados.
+    - url: URL baixada.
+    - metadados: Dicionário com etag, last_modified, content_length e completo.
+    """
+    with _LOCK_CACHE_DOWNLOADS:
+        cache = carregar_cache_downloads(cache_path)
+        cache[url] = metadados
+        with open(f"{cache_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(f"{cache_path}.tmp", cache_path)
+
+
+def _cabecalho(resposta, nome):
+    """Retorna o valor do cabeçalho da resposta HTTP, ou None se ele não existe."""
+    valor = resposta.headers.get(nome)
+    return valor if isinstance(valor, str) else None
+
+
+def _tamanho_total(resposta):
+    """Retorna o tamanho total do arquivo informado pelo servidor, ou None se desconhecido."""
+    faixa = _cabecalho(resposta, "Content-Range")
+    if faixa and "/" in faixa:
+        total = faixa.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    tamanho = _cabecalho(resposta, "Content-Length")
+    return int(tamanho) if tamanho and tamanho.isdigit() else None
+
+
+def _cabecalhos_download(metadados, caminho_destino, condicional):
+    """
+    Monta os cabeçalhos da requisição de download.
+    
+    - Download incompleto no disco: pede só o restante com Range (e If-Range, para receber o
+      arquivo inteiro caso ele tenha mudado no servidor).
+    - Download completo anterior e requisição condicional: envia If-None-Match/If-Modified-Since.
+    """
+    tamanho_local = os.path.getsize(caminho_destino) if os.path.exists(caminho_destino) else 0
+    validador = metadados.get("etag") or metadados.get("last_modified")
+    total = metadados.get("content_length") or float("inf")
+    if metadados and not metadados.get("completo") and validador and 0 < tamanho_local < total:
+        return {"Range": f"bytes={tamanho_local}-", "If-Range": validador}
+
+    cabecalhos = {}
+    if metadados.get("completo") and condicional:
+        if metadados.get("etag"):
+            cabecalhos["If-None-Match"] = metadados["etag"]
+        if metadados.get("last_modified"):
+            cabecalhos["If-Modified-Since"] = metadados["last_modified"]
+    return cabecalhos
+
+
+class _BuscaConcluida(Exception):
+    """Interrompe a leitura do HTML quando todos os anexos já foram encontrados."""
+
+
+class _ParserLinks(HTMLParser):
+    """
+    Lê o HTML procurando apenas as tags <a> com href, sem montar a árvore do documento.
+    
+    Os links são avaliados na ordem em que as tags <a> abrem, com o texto concatenado da mesma
+    forma que o get_text(strip=True) do BeautifulSoup, mantendo a regra de que o primeiro
+    link encontrado para cada anexo é o que vale.
+    """
+
+    def __init__(self, anexos):
+        super().__init__(convert_charrefs=True)
+        self.anexos = anexos
+        self.links = {}
+        self.pendentes = []  # Links na ordem de abertura: [href, partes do texto, fechado]
+        self.abertos = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        atributos = dict(attrs)
+        link = [atributos.get("href"), [], False]
+        self.abertos.append(link)
+        if "href" in atributos:
+            self.pendentes.append(link)
+
+    def handle_endtag(self, tag):
+        if tag != "a" or not self.abertos:
+            return
+        self.abertos.pop()[2] = True
+        self._avaliar_pendentes()
+
+    def handle_data(self, data):
+        texto = data.strip()
+        if texto:
+            for link in self.abertos:
+                link[1].append(texto)
+
+    def _avaliar_pendentes(self, final=False):
+        while self.pendentes and (self.pendentes[0][2] or final):
+            href, partes, _ = self.pendentes.pop(0)
+            texto_link = "".join(partes)
+            for anexo in self.anexos:
+                if anexo in texto_link and anexo not in self.links:
+                    self.links[anexo] = href or ""
+        if len(self.links) == len(self.anexos):
+            raise _BuscaConcluida()
+
+    def finalizar(self):
+        self._avaliar_pendentes(final=True)
+
+
+def descobrir_links_pdfs(html, base_url, anexos=None, tamanho_bloco=64 * 1024):
+    """
+    Versão rápida de extrair_links_pdfs: lê só as tags <a> e para assim que todos os anexos
+    pedidos são encontrados, sem analisar o restante da página.
+    
+    Parâmetros:
+    - html: String contendo o conteúdo HTML da página.
+    - base_url: URL base para converter links relativos em links absolutos.
+    - anexos: Nomes dos anexos procurados; por padrão, as chaves de PDF_NAMES.
+    - tamanho_bloco: Quantidade de caracteres do HTML lidos por vez.
+
+    Retorna:
+    - Um dicionário com os nomes dos anexos (chaves) e os links completos (valores).
+    """
+    anexos = list(PDF_NAMES) if anexos is None else list(anexos)
+    parser = _ParserLinks(anexos)
+    try:
+        for inicio in range(0, len(html), tamanho_bloco):
+            parser.feed(html[inicio:inicio + tamanho_bloco])
+        parser.close()
+        parser.finalizar()
+    except _BuscaConcluida:
+        pass
+
+    links_pdf = {}
+    for anexo, href in parser.links.items():
+        links_pdf[anexo] = urljoin(base_url, href)
+        print(f"Link encontrado para {anexo}: {links_pdf[anexo]}")
+
+    if not links_pdf:
+        raise Exception("Nenhum link de PDF encontrado. Verifique a estrutura da página.")
+    return links_pdf
+
+
+def baixar_pdf(url, caminho_destino, chunk_size=CHUNK_SIZE, cache_path=None, condicional=None, tentativas=TENTATIVAS_DOWNLOAD, sessao=None):
     """
     Faz o download do arquivo PDF da URL informada e o salva no caminho especificado.
     
+    Com cache_path, os metadados do download (ETag, Last-Modified e Content-Length) são guardados
+    para que as próximas execuções façam requisições condicionais: se o servidor responder 304,
+    nada é baixado. Se a transferência for interrompida, ela é retomada do ponto em que parou com
+    uma requisição Range, tanto na mesma chamada quanto numa próxima execução.
+    
     Parâmetros:
     - url: URL do arquivo PDF.
     - caminho_destino: Caminho (incluindo o nome do arquivo) onde o PDF será salvo.
+    - chunk_size: Tamanho dos blocos lidos durante o download.
+    - cache_path: Caminho opcional do arquivo JSON com os metadados dos downloads.
+    - condicional: Se a requisição pode ser condicional (o chamador ainda tem uma cópia do arquivo).
+      Por padrão, é condicional quando o arquivo de destino já existe.
+    - tentativas: Quantidade de vezes que um download interrompido é retomado.
+    - sessao: Sessão HTTP opcional (veja criar_sessao) para reaproveitar conexões.
+    
+    Retorna:
+    - True se o arquivo foi baixado, ou False se o servidor informou que ele não mudou (304).
     """
+    metadados = carregar_cache_downloads(cache_path).get(url, {}) if cache_path else {}
+    if condicional is None:
+        condicional = os.path.exists(caminho_destino)
+    cliente = sessao if sessao is not None else requests
     try:
-        resposta = requests.get(url, stream=True)
-        resposta.raise_for_status()  # Verificando se o download foi bem-sucedido
-        # Abrindo o arquivo no modo de escrita binária e escreve o conteúdo em partes
-        with open(caminho_destino, "wb") as f:
-            for chunk in resposta.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-        print(f"PDF baixado e salvo em: {os.path.abspath(caminho_destino)}")  
+        for tentativa in range(1, tentativas + 1):
+            cabecalhos = _cabecalhos_download(metadados, caminho_destino, condicional)
+            resposta = cliente.get(url, stream=True, headers=cabecalhos)
+            if resposta.status_code == 304:
+                print(f"{url} não foi modificado desde o último download.")
+                return False
+            resposta.raise_for_status()  # Verificando se o download foi bem-sucedido
+
+            parcial = resposta.status_code == 206
+            metadados = {
+                "etag": _cabecalho(resposta, "ETag") or (metadados.get("etag") if parcial else None),
+                "last_modified": _cabecalho(resposta, "Last-Modified") or (metadados.get("last_modified") if parcial else None),
+                "content_length": _tamanho_total(resposta),
+                "completo": False,
+            }
+            if cache_path:
+                salvar_cache_downloads(cache_path, url, metadados)
+
+            try:
+                # Abrindo o arquivo no modo de escrita binária (ou de acréscimo, ao retomar) e escreve o conteúdo em partes
+                with open(caminho_destino, "ab" if parcial else "wb") as f:
+                    for chunk in resposta.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            f.write(chunk)
+            except (requests.exceptions.ChunkedEncodingError, requests.ConnectionError) as e:
+                if tentativa == tentativas:
+                    raise
+                print(f"Download de {url} interrompido ({e}), retomando...")
+                continue
+
+            metadados["completo"] = True
+            if cache_path:
+                salvar_cache_downloads(cache_path, url, metadados)
+            print(f"PDF baixado e salvo em: {os.path.abspath(caminho_destino)}")
+            return True
     except requests.RequestException as e:
         raise requests.RequestException(f"Erro ao baixar {url}: {e}")
 
 
-def compactar_pdfs(arquivos, arquivo_zip):
+def baixar_pdfs(downloads, max_concorrencia=MAX_DOWNLOADS_SIMULTANEOS, max_conexoes_por_host=MAX_CONEXOES_POR_HOST, sessao=None, **opcoes):
     """
-    Compacta todos os arquivos PDF fornecidos em um único arquivo ZIP.
+    Baixa vários arquivos ao mesmo tempo, compartilhando uma única sessão HTTP.
+    
+    O tempo total fica próximo ao do download mais lento, em vez da soma de todos.
     
     Parâmetros:
-    - arquivos: Lista de caminhos dos arquivos PDF a serem compactados.
+    - downloads: Lista de tuplas (url, caminho_destino).
+    - max_concorrencia: Quantidade máxima de downloads em andamento ao mesmo tempo.
+    - max_conexoes_por_host: Quantidade máxima de conexões abertas com cada host.
+    - sessao: Sessão HTTP opcional; por padrão, uma nova é criada com criar_sessao.
+    - opcoes: Demais parâmetros repassados para baixar_pdf (chunk_size, cache_path, condicional...).
+    
+    Retorna:
+    - Lista com o retorno de baixar_pdf para cada download, na ordem recebida.
+    """
+    sessao_propria = sessao is None
+    if sessao_propria:
+        sessao = criar_sessao(max_conexoes_por_host)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_concorrencia)) as executor:
+            futuros = [executor.submit(baixar_pdf, url, destino, sessao=sessao, **opcoes) for url, destino in downloads]
+            return [futuro.result() for futuro in futuros]
+    finally:
+        if sessao_propria:
+            sessao.close()
+
+
+def estimar_entropia(caminho, tamanho_amostra=16 * 1024, amostras=3):
+    """
+    Estima a entropia do arquivo (em bits por byte) a partir de amostras do início, do meio e do fim.
+    
+    Valores perto de 8 indicam dados já comprimidos (como a maioria dos PDFs), que quase não
+    diminuem ao serem comprimidos de novo.
+    
+    Parâmetros:
+    - caminho: Caminho do arquivo.
+    - tamanho_amostra: Tamanho de cada amostra, em bytes.
+    - amostras: Quantidade de amostras lidas.
+    
+    Retorna:
+    - A entropia estimada, entre 0 e 8.
+    """
+    tamanho = os.path.getsize(caminho)
+    contagem = Counter()
+    with open(caminho, "rb") as f:
+        for i in range(amostras):
+            f.seek(max(0, (tamanho - tamanho_amostra) * i // max(1, amostras - 1)))
+            contagem.update(f.read(tamanho_amostra))
+    total = sum(contagem.values())
+    if not total:
+        return 0.0
+    return -sum(n / total * math.log2(n / total) for n in contagem.values())
+
+
+def compactar_arquivos(arquivos, arquivo_zip, codec="deflate", nivel=None, adaptativo=True):
+    """
+    Compacta os arquivos em um único ZIP.
+    
+    Cada arquivo é lido e comprimido em blocos pelo próprio zipfile, sem ser carregado inteiro em memória.
+    No modo adaptativo, arquivos que já estão comprimidos (entropia acima de LIMITE_ENTROPIA)
+    são guardados sem compressão, sem gastar CPU para quase nenhum ganho de tamanho.
+    
+    Parâmetros:
+    - arquivos: Lista de caminhos dos arquivos a serem compactados.
     - arquivo_zip: Nome do arquivo ZIP a ser criado.
+    - codec: "deflate" (padrão), "bzip2", "xz", "stored" ou "zstd" (Python 3.14+). Confirme que
+      quem vai ler o ZIP suporta o codec escolhido.
+    - nivel: Nível de compressão; None usa o padrão do codec.
+    - adaptativo: Se arquivos já comprimidos devem ser guardados sem compressão.
     """
-    with zipfile.ZipFile(arquivo_zip, "w", zipfile.ZIP_DEFLATED) as zipf:
+    if codec not in CODECS_ZIP:
+        raise Exception(f"Codec de compactação não suportado: {codec}. Opções: {', '.join(CODECS_ZIP)}")
+    tipo = CODECS_ZIP[codec]
+
+    with zipfile.ZipFile(arquivo_zip, "w") as zipf:
         for arquivo in arquivos:
-            zipf.write(arquivo, arcname=os.path.basename(arquivo))
-            print(f"Arquivo {os.path.basename(arquivo)} adicionado ao ZIP.")
+            tipo_membro = tipo
+            if adaptativo and estimar_entropia(arquivo) >= LIMITE_ENTROPIA:
+                tipo_membro = zipfile.ZIP_STORED
+            nome = os.path.basename(arquivo)
+            zipf.write(arquivo, nome, compress_type=tipo_membro, compresslevel=nivel)
+            metodo = "sem compressão" if tipo_membro == zipfile.ZIP_STORED else codec
+            print(f"Arquivo {nome} adicionado ao ZIP ({metodo}).")
     print(f"Compactação concluída. Arquivo ZIP criado: {os.path.abspath(arquivo_zip)}")
 
 
+def compactar_pdfs(arquivos, arquivo_zip, codec="deflate", nivel=None):
+    """
+    Compacta todos os arquivos PDF fornecidos em um único arquivo ZIP.
+    
+    Parâmetros:
+    - arquivos: Lista de caminhos dos arquivos PDF a serem compactados.
+    - arquivo_zip: Nome do arquivo ZIP a ser criado.
+    - codec: Codec de compressão (veja compactar_arquivos).
+    - nivel: Nível de compressão; None usa o padrão do codec.
+    """
+    compactar_arquivos(arquivos, arquivo_zip, codec, nivel)
+
+
 def excluir_arquivos(arquivos):
     """
     Exclui os arquivos após a compactação.
@@ -126,7 +478,7 @@ def excluir_arquivos(arquivos):
             print(f"Erro ao excluir {arquivo}: {e}")
 
 
-def main():
+def main(zip_path=ZIP_PATH, anexos=PDF_NAMES):
     """
     Função principal que orquestra a execução dos passos do desafio:
     1. Acesso ao site e obtenção do HTML.
@@ -134,32 +486,76 @@ def main():
     3. Download dos PDFs dos Anexos I e II.
     4. Compactação dos PDFs em um único arquivo ZIP.
     5. Exclusão dos arquivos PDFs temporários após a compactação.
+    
+    Se nenhum anexo mudou desde o último download (respostas 304), o arquivo ZIP atual é mantido
+    e a compactação é pulada.
+    
+    Parâmetros:
+    - zip_path: Caminho do arquivo ZIP a ser criado; os PDFs são baixados na mesma pasta.
+    - anexos: Dicionário com os nomes dos anexos procurados na página e os nomes dos arquivos.
+    
+    Retorna:
+    - True se o arquivo ZIP foi (re)criado, ou False se nada mudou.
     """
+    sessao = criar_sessao()
+
     # Passo 1: Obter o conteúdo HTML da página
-    html = obter_conteudo(BASE_URL)
+    html = obter_conteudo(BASE_URL, sessao)
     if html is None:
         raise Exception("Não foi possível obter o conteúdo do site. Encerrando o script.")
     
     # Extraindo os links dos PDFs com base na análise do HTML
-    links_pdf = extrair_links_pdfs(html, BASE_URL)
+    links_pdf = descobrir_links_pdfs(html, BASE_URL, anexos)
     
-    # Verificando se os dois anexos foram encontrados
-    if not all(anexo in links_pdf for anexo in PDF_NAMES.keys()):
+    # Verificando se todos os anexos foram encontrados
+    if not all(anexo in links_pdf for anexo in anexos):
         print("Não foi possível encontrar todos os links dos anexos. Verifique a estrutura da página e ajuste os seletores se necessário.")
-        return
+        return False
+
+    # Fazendo o download de cada PDF encontrado; com o ZIP anterior disponível, as requisições
+    # são condicionais e os anexos que não mudaram não são baixados de novo
+    pasta = os.path.dirname(zip_path)
+    cache_path = os.path.join(pasta, CACHE_DOWNLOADS)
+    zip_existente = os.path.exists(zip_path)
+    downloads = [(url_pdf, os.path.join(pasta, anexos[anexo])) for anexo, url_pdf in links_pdf.items()]
+    with sessao:
+        resultados = baixar_pdfs(downloads, sessao=sessao, cache_path=cache_path, condicional=zip_existente)
+        arquivos_baixados = [destino for (_, destino), baixado in zip(downloads, resultados) if baixado]
+        nao_modificados = [destino for (_, destino), baixado in zip(downloads, resultados) if not baixado]
+
+        # Anexos que não mudaram, mas que não estão no ZIP anterior (ou ele não pode ser lido),
+        # são baixados de novo por inteiro
+        if nao_modificados:
+            try:
+                with zipfile.ZipFile(zip_path, "r") as zipf:
+                    no_zip = set(zipf.namelist())
+            except (OSError, zipfile.BadZipFile):
+                no_zip = set()
+            faltantes = [(url_pdf, destino) for url_pdf, destino in downloads
+                         if destino in nao_modificados and os.path.basename(destino) not in no_zip]
+            if faltantes:
+                print(f"Anexos ausentes do arquivo {zip_path}; baixando novamente: {', '.join(os.path.basename(d) for _, d in faltantes)}")
+                baixar_pdfs(faltantes, sessao=sessao, cache_path=cache_path, condicional=False)
+                arquivos_baixados.extend(destino for _, destino in faltantes)
+                nao_modificados = [destino for destino in nao_modificados if os.path.basename(destino) in no_zip]
+
+    if not arquivos_baixados:
+        print(f"Nenhum anexo foi modificado. O arquivo {zip_path} foi mantido.")
+        return False
 
-    # Fazendo o download de cada PDF encontrado
-    arquivos_baixados = []
-    for anexo, url_pdf in links_pdf.items():
-        caminho_destino = PDF_NAMES[anexo]
-        baixar_pdf(url_pdf, caminho_destino)
-        arquivos_baixados.append(caminho_destino)
+    # Recuperando do ZIP anterior os anexos que não mudaram
+    if nao_modificados:
+        with zipfile.ZipFile(zip_path, "r") as zipf:
+            for caminho in nao_modificados:
+                zipf.extract(os.path.basename(caminho), pasta or ".")
+        arquivos_baixados.extend(nao_modificados)
     
     # Compactando os PDFs baixados em um único arquivo ZIP
-    compactar_pdfs(arquivos_baixados, ZIP_PATH)
+    compactar_pdfs(arquivos_baixados, zip_path)
     
     # Excluindo os arquivos PDFs temporários após a compactação
     excluir_arquivos(arquivos_baixados)
+    return True
 
 
 if __name__ == "__main__":